@@ -0,0 +1,84 @@
+"""
+Startup/import-time check for both CLIs.
+
+Runs each short invocation under `python -X importtime`, sums the per-module
+self time, and fails (exit 1) if
+  - a heavy client library (gspread, google.genai, google-auth, requests,
+    rapidfuzz) is imported on a path that doesn't use it, or
+  - total import time exceeds the budget.
+
+    python bench_startup.py                 # check against the default budget
+    python bench_startup.py --budget-ms 400 --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SENTIMENT_DIR = os.path.join(ROOT, "sentiment-analysis")
+
+HEAVY = ("gspread", "google.genai", "google.oauth2", "google.auth", "requests", "rapidfuzz")
+
+# (label, argv after the interpreter, working directory)
+CASES = [
+    ("reviews: import", ["-c", "import reviews"], ROOT),
+    ("sentiment: --help", ["main.py", "--help"], SENTIMENT_DIR),
+    ("sentiment: import main", ["-c", "import main"], SENTIMENT_DIR),
+]
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def measure(argv, cwd):
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    return proc.returncode, wall_ms, parse_importtime(proc.stderr), proc.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression check")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="max total import time per case")
+    parser.add_argument("--top", type=int, default=8, help="slowest modules to list per case")
+    args = parser.parse_args()
+
+    failed = False
+    for label, argv, cwd in CASES:
+        code, wall_ms, rows, stderr = measure(argv, cwd)
+        total_ms = sum(r[1] for r in rows) / 1000
+        heavy = sorted({name for name, _, _ in rows if name.startswith(HEAVY)})
+        over = total_ms > args.budget_ms
+        ok = code == 0 and not heavy and not over
+        failed |= not ok
+
+        print(f"{'✅' if ok else '❌'} {label}: imports {total_ms:.0f} ms, wall {wall_ms:.0f} ms, "
+              f"{len(rows)} modules")
+        if code != 0:
+            print("   exited with", code, "\n   " + stderr.strip().splitlines()[-1])
+        if heavy:
+            print("   heavy imports on this path:", ", ".join(heavy))
+        if over:
+            print(f"   over budget ({args.budget_ms:.0f} ms)")
+        for name, self_us, cum_us in sorted(rows, key=lambda r: -r[2])[: args.top]:
+            print(f"   {cum_us / 1000:7.1f} ms cumulative  {self_us / 1000:6.1f} ms self  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
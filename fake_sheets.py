@@ -0,0 +1,329 @@
+"""
+In-memory stand-in for the Google Sheets v4 API, for exercising Sheets code
+without credentials or network.
+
+FakeSheetsSession is used as gspread's HTTP session. It stores spreadsheets as
+lists of rows and serves the endpoints this repo uses: spreadsheet metadata,
+addSheet/deleteDimension batchUpdate, values get/update/append/clear/batchGet/batchUpdate. Like
+the real API, it enforces per-minute read and write quotas and answers with 429
+RESOURCE_EXHAUSTED once a quota is spent. Time comes from an injectable clock,
+so SimClock can stand in for real minutes:
+
+    clock = SimClock()
+    service = FakeSheetsSession(clock=clock, writes_per_minute=60)
+    service.create("sheet-id", ["Sentiment - History"])
+    gc = authorize(None, session=service)          # sheets_governor.authorize
+
+`python fake_sheets.py` replays a 12-month backfill of history rows three ways:
+ungoverned (trips the quota), governed, and governed + coalesced. It then runs
+check(), which asserts the governor's separate read/write pacing, SheetWrites
+coalescing and 429 retry against the fake.
+"""
+
+import json
+import re
+import time
+from collections import deque
+from urllib.parse import unquote, urlparse
+
+_CELL_RE = re.compile(r"^([A-Z]*)(\d*)$")
+
+
+class SimClock:
+    """Simulated time: sleep() advances now() instantly."""
+
+    def __init__(self):
+        self.t = 0.0
+
+    def now(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += max(0.0, seconds)
+
+
+class FakeResponse:
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = headers or {}
+        self.text = json.dumps(body)
+        self.content = self.text.encode("utf-8")
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return self._body
+
+
+def _col_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _parse_range(a1):
+    """'Tab'!A1:C -> (title, row0, col0, row1, col1); open ends are None, indexes 0-based."""
+    if "!" in a1:
+        title, cells = a1.rsplit("!", 1)
+    else:
+        title, cells = a1, ""
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    bounds = []
+    for part in (cells.split(":") if cells else []):
+        letters, digits = _CELL_RE.match(part).groups()
+        bounds.append((int(digits) - 1 if digits else None, _col_index(letters) if letters else None))
+    if not bounds:
+        return title, 0, 0, None, None
+    (r0, c0), (r1, c1) = bounds[0], bounds[-1]
+    return title, r0 or 0, c0 or 0, r1, c1
+
+
+class FakeSheetsSession:
+    BASE = "/v4/spreadsheets/"
+
+    def __init__(self, clock=None, reads_per_minute=60, writes_per_minute=60):
+        self.clock = clock or SimClock()
+        self.limits = {"read": reads_per_minute, "write": writes_per_minute}
+        self.stamps = {"read": deque(), "write": deque()}
+        self.books = {}  # spreadsheet id -> {title: rows}
+        self.requests = {"read": 0, "write": 0}
+        self.rejected = 0
+        self.headers = {}  # gspread may set Authorization here
+
+    def create(self, sheet_id, titles=()):
+        self.books[sheet_id] = {t: [] for t in titles}
+
+    def rows(self, sheet_id, title):
+        return self.books[sheet_id][title]
+
+    # ---------- quota ----------
+    def _admit(self, kind):
+        now = self.clock.now()
+        stamps = self.stamps[kind]
+        while stamps and now - stamps[0] >= 60:
+            stamps.popleft()
+        if len(stamps) >= self.limits[kind]:
+            self.rejected += 1
+            return False
+        stamps.append(now)
+        self.requests[kind] += 1
+        return True
+
+    # ---------- HTTP ----------
+    def request(self, method, url, json=None, params=None, data=None, files=None, headers=None, timeout=None):
+        method = method.upper()
+        path = unquote(urlparse(url).path)[len(self.BASE):]
+        kind = "read" if method == "GET" else "write"
+        if not self._admit(kind):
+            return FakeResponse(429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED",
+                "message": f"Quota exceeded for quota metric '{kind.title()} requests per minute per user'",
+            }})
+        sheet_id, _, rest = path.partition("/")
+        if sheet_id.endswith(":batchUpdate"):
+            return self._batch_update(sheet_id[: -len(":batchUpdate")], json or {})
+        book = self.books.get(sheet_id)
+        if book is None:
+            return FakeResponse(404, {"error": {"code": 404, "message": "Requested entity was not found.", "status": "NOT_FOUND"}})
+        if not rest:
+            return FakeResponse(200, self._metadata(sheet_id))
+        params = params or {}
+        if rest == "values:batchGet":
+            ranges = params.get("ranges", [])
+            ranges = [ranges] if isinstance(ranges, str) else ranges
+            return FakeResponse(200, {"spreadsheetId": sheet_id, "valueRanges": [self._get(book, r, params) for r in ranges]})
+        if rest == "values:batchUpdate":
+            for d in (json or {}).get("data", []):
+                self._put(book, d["range"], d["values"])
+            return FakeResponse(200, {"spreadsheetId": sheet_id, "totalUpdatedRows": sum(len(d["values"]) for d in json["data"])})
+        a1 = rest[len("values/"):]
+        if a1.endswith(":append"):
+            title = _parse_range(a1[: -len(":append")])[0]
+            book[title].extend(list(r) for r in json["values"])
+            return FakeResponse(200, {"spreadsheetId": sheet_id, "updates": {"updatedRows": len(json["values"])}})
+        if a1.endswith(":clear"):
+            book[_parse_range(a1[: -len(":clear")])[0]].clear()
+            return FakeResponse(200, {"spreadsheetId": sheet_id, "clearedRange": a1})
+        if method == "PUT":
+            self._put(book, a1, json["values"])
+            return FakeResponse(200, {"spreadsheetId": sheet_id, "updatedRows": len(json["values"])})
+        return FakeResponse(200, self._get(book, a1, params))
+
+    # ---------- endpoints ----------
+    def _metadata(self, sheet_id):
+        return {
+            "spreadsheetId": sheet_id,
+            "properties": {"title": sheet_id},
+            "sheets": [
+                {"properties": {
+                    "sheetId": i, "title": title, "index": i, "sheetType": "GRID",
+                    "gridProperties": {"rowCount": max(1000, len(rows)), "columnCount": 26},
+                }}
+                for i, (title, rows) in enumerate(self.books[sheet_id].items())
+            ],
+        }
+
+    def _batch_update(self, sheet_id, body):
+        book = self.books[sheet_id]
+        replies = []
+        for req in body.get("requests", []):
+            if "addSheet" in req:
+                title = req["addSheet"]["properties"]["title"]
+                book[title] = []
+                props = next(s["properties"] for s in self._metadata(sheet_id)["sheets"] if s["properties"]["title"] == title)
+                replies.append({"addSheet": {"properties": props}})
+            elif "deleteDimension" in req and req["deleteDimension"]["range"]["dimension"] == "ROWS":
+                r = req["deleteDimension"]["range"]
+                del list(book.values())[r["sheetId"]][r["startIndex"] : r["endIndex"]]
+                replies.append({})
+            else:
+                replies.append({})  # formatting, metadata, resizes: accepted and ignored
+        return FakeResponse(200, {"spreadsheetId": sheet_id, "replies": replies})
+
+    def _get(self, book, a1, params):
+        title, r0, c0, r1, c1 = _parse_range(a1)
+        rows = book[title][r0 : None if r1 is None else r1 + 1]
+        rows = [row[c0 : None if c1 is None else c1 + 1] for row in rows]
+        while rows and not any(v not in ("", None) for v in rows[-1]):
+            rows.pop()
+        if params.get("majorDimension") == "COLUMNS":
+            width = max((len(r) for r in rows), default=0)
+            rows = [[r[i] if i < len(r) else "" for r in rows] for i in range(width)]
+        return {"range": a1, "majorDimension": params.get("majorDimension", "ROWS"), "values": rows}
+
+    def _put(self, book, a1, values):
+        title, r0, c0, _, _ = _parse_range(a1)
+        rows = book[title]
+        for i, new in enumerate(values):
+            while len(rows) <= r0 + i:
+                rows.append([])
+            row = rows[r0 + i]
+            row.extend([""] * max(0, c0 + len(new) - len(row)))
+            row[c0 : c0 + len(new)] = list(new)
+
+
+def main():
+    import gspread
+    from gspread.http_client import HTTPClient
+
+    from sheets_governor import GovernedHTTPClient, QuotaGovernor, SheetWrites, authorize
+
+    tab, months, locations = "Sentiment - History", 12, 19
+
+    def backfill(gc, coalesce):
+        sheet = gc.open_by_key("history")
+        ws = sheet.worksheet(tab)
+        for month in range(1, months + 1):
+            ws.get_all_values()  # append_history's duplicate check
+            rows = [[f"2025-{month:02d}", scope, month] for scope in ["Overall"] + [f"Loc {i}" for i in range(locations)]]
+            if coalesce:
+                writes = SheetWrites(sheet)
+                for row in rows:
+                    writes.append(tab, [row])
+                writes.flush()
+            else:
+                for row in rows:
+                    ws.append_row(row)
+
+    for label, governed, coalesce in [("ungoverned", False, False), ("governed", True, False), ("governed + coalesced", True, True)]:
+        clock = SimClock()
+        service = FakeSheetsSession(clock=clock)
+        service.create("history", [tab])
+
+        class Client(GovernedHTTPClient):
+            governor = QuotaGovernor(clock=clock.now, sleep=clock.sleep)
+
+        gc = authorize(None, session=service, http_client=Client if governed else HTTPClient)
+        started = time.perf_counter()
+        try:
+            backfill(gc, coalesce)
+            outcome = f"{len(service.rows('history', tab))} rows written"
+        except gspread.exceptions.APIError as e:
+            outcome = f"FAILED after {len(service.rows('history', tab))} rows: {e}"
+        print(f"{label:>22}: {outcome}; {service.requests['read']} reads, {service.requests['write']} writes, "
+              f"{service.rejected} rejected, {clock.now() / 60:.1f} simulated min, {time.perf_counter() - started:.2f}s real")
+
+
+def check():
+    """Assertions for sheets_governor against the fake; the governor sleeps on a SimClock."""
+    import gspread
+
+    from sheets_governor import GovernedHTTPClient, QuotaGovernor, SheetWrites, authorize
+
+    def setup(governed=True, reads=5, writes=5, service_reads=5, service_writes=5):
+        clock = SimClock()
+        service = FakeSheetsSession(clock=clock, reads_per_minute=service_reads, writes_per_minute=service_writes)
+        service.create("s", ["A", "B"])
+
+        class Client(GovernedHTTPClient):
+            governor = QuotaGovernor(reads_per_minute=reads, writes_per_minute=writes, clock=clock.now, sleep=clock.sleep)
+
+        gc = authorize(None, session=service, http_client=Client if governed else gspread.http_client.HTTPClient)
+        return clock, service, gc, gc.open_by_key("s")  # one metadata read
+
+    def read(sheet):
+        sheet.values_get("'A'!A1")
+
+    def write(sheet, tab="A"):
+        sheet.values_append(f"'{tab}'", {"valueInputOption": "RAW"}, {"values": [["x"]]})
+
+    # Reads and writes are paced separately: a full read window doesn't hold up writes
+    clock, service, gc, sheet = setup()
+    for _ in range(4):
+        read(sheet)
+    for _ in range(5):
+        write(sheet)
+    assert clock.now() == 0 and service.requests == {"read": 5, "write": 5}, (clock.now(), service.requests)
+    write(sheet)
+    assert clock.now() == 60 and service.rejected == 0, (clock.now(), service.rejected)
+    read(sheet)
+    assert clock.now() == 60 and service.requests == {"read": 6, "write": 6}, service.requests
+
+    # Ungoverned, the same traffic trips the quota
+    clock, service, gc, sheet = setup(governed=False)
+    for _ in range(5):
+        write(sheet)
+    try:
+        write(sheet)
+        raise AssertionError("ungoverned 6th write was not rejected")
+    except gspread.exceptions.APIError as e:
+        assert e.code == 429 and service.rejected == 1, (e.code, service.rejected)
+
+    # Adjacent appends to one tab and adjacent updates each become one request, in order
+    clock, service, gc, sheet = setup(writes=60, service_writes=60)
+    writes = SheetWrites(sheet)
+    writes.append("A", [["a1"]])
+    writes.append("A", [["a2"], ["a3"]])
+    writes.update("B", "A1", [["b1"]])
+    writes.update("B", "B2", [["b2"]])
+    writes.append("A", [["a4"]])
+    writes.append("B", [["b3"]])
+    assert writes.flush() == 4 and service.requests["write"] == 4, service.requests
+    assert service.rows("s", "A") == [["a1"], ["a2"], ["a3"], ["a4"]], service.rows("s", "A")
+    assert service.rows("s", "B") == [["b1"], ["", "b2"], ["b3"]], service.rows("s", "B")
+
+    # A 429 from the service (its quota tighter than the governor's) is retried with backoff
+    clock, service, gc, sheet = setup(writes=60, service_writes=2)
+    for _ in range(3):
+        write(sheet)
+    assert service.rejected > 0 and clock.now() >= 60, (service.rejected, clock.now())
+    assert service.requests["write"] == 3 and len(service.rows("s", "A")) == 3, service.requests
+
+    # Errors that aren't quota or server errors fail at once
+    clock, service, gc, sheet = setup()
+    try:
+        gc.open_by_key("missing")
+        raise AssertionError("missing spreadsheet opened")
+    except gspread.exceptions.SpreadsheetNotFound:
+        assert service.requests["read"] == 2 and clock.now() == 0, service.requests
+    print("fake_sheets checks passed")
+
+
+if __name__ == "__main__":
+    main()
+    check()
@@ -0,0 +1,16 @@
+"""
+Word lists shared by the weekly fetcher's quick sentiment summary (reviews.py)
+and the sentiment pipeline's fast-path classifier (sentiment-analysis/fastpath.py).
+"""
+
+import re
+
+POS_WORDS = set("""
+amazing awesome great excellent friendly clean quick fast helpful convenient best love loved efficient thorough shiny membership value
+""".split())
+NEG_WORDS = set("""
+bad rude slow dirty expensive broken confusing hard worse worst terrible awful disappointed streaks damage queue wait waiting scratch
+""".split())
+
+def tokenize(text: str):
+    return re.findall(r"[a-zA-Z']+", (text or "").lower())
@@ -0,0 +1,108 @@
+"""
+Location registry: every store we track, grouped into spreadsheet shards.
+
+locations.json replaces the inline LOCATIONS list and hard-coded SHEET_ID. Each
+shard names the spreadsheet that holds its locations' raw review rows and
+per-shard summary. rollup_sheet_id is the workbook that gets the fleet-wide
+summary and the sentiment tabs. With one shard whose sheet is the roll-up (the
+default), everything lands in a single spreadsheet exactly as before.
+
+New locations go to the first shard with room under max_locations_per_shard,
+which keeps each spreadsheet clear of the per-sheet cell limit and request quota:
+
+    python location_registry.py list
+    python location_registry.py add <place_id> "<name>" [--shard NAME]
+    python location_registry.py add-shard <name> <sheet_id>
+"""
+
+import argparse
+import json
+import os
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locations.json")
+
+
+class LocationRegistry:
+    def __init__(self, path=REGISTRY_FILE):
+        self.path = path
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.rollup_sheet_id = data["rollup_sheet_id"]
+        self.max_per_shard = data.get("max_locations_per_shard", 100)
+        self.shards = data["shards"]  # [{"name", "sheet_id", "locations": [{"place_id", "name"}]}]
+
+    def locations(self):
+        return [loc for shard in self.shards for loc in shard["locations"]]
+
+    def shard(self, name):
+        for shard in self.shards:
+            if shard["name"] == name:
+                return shard
+        raise KeyError(f"No shard named '{name}' in {self.path}")
+
+    def sheet_ids(self):
+        """Distinct shard spreadsheets, in registry order."""
+        return list(dict.fromkeys(shard["sheet_id"] for shard in self.shards))
+
+    def add(self, place_id, name, shard=None):
+        """Register a location; without an explicit shard, the first one with room takes it."""
+        if any(loc["place_id"] == place_id for loc in self.locations()):
+            raise ValueError(f"{place_id} is already registered")
+        if shard is not None:
+            target = self.shard(shard)
+        else:
+            target = next((s for s in self.shards if len(s["locations"]) < self.max_per_shard), None)
+            if target is None:
+                raise ValueError("Every shard is full — add a shard (add-shard) first")
+        target["locations"].append({"place_id": place_id, "name": name})
+        return target["name"]
+
+    def add_shard(self, name, sheet_id):
+        if any(s["name"] == name for s in self.shards):
+            raise ValueError(f"Shard '{name}' already exists")
+        self.shards.append({"name": name, "sheet_id": sheet_id, "locations": []})
+
+    def save(self):
+        data = {
+            "rollup_sheet_id": self.rollup_sheet_id,
+            "max_locations_per_shard": self.max_per_shard,
+            "shards": self.shards,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Location registry")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="list shards and their locations")
+    a = sub.add_parser("add", help="register a location")
+    a.add_argument("place_id")
+    a.add_argument("name")
+    a.add_argument("--shard")
+    s = sub.add_parser("add-shard", help="add a spreadsheet shard")
+    s.add_argument("name")
+    s.add_argument("sheet_id")
+    args = parser.parse_args()
+
+    registry = LocationRegistry()
+    if args.cmd == "list":
+        print(f"roll-up: {registry.rollup_sheet_id}")
+        for shard in registry.shards:
+            print(f"{shard['name']} ({shard['sheet_id']}): {len(shard['locations'])}/{registry.max_per_shard}")
+            for loc in shard["locations"]:
+                print(f"  {loc['place_id']}  {loc['name']}")
+        return
+    if args.cmd == "add":
+        shard = registry.add(args.place_id, args.name, args.shard)
+        print(f"✅ Added {args.name} to shard '{shard}'")
+    else:
+        registry.add_shard(args.name, args.sheet_id)
+        print(f"✅ Added shard '{args.name}'")
+    registry.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Append-only per-location time series of Google rating and review count.
+
+Replaces state_reviews.json (which only kept the latest count per place and was
+rewritten whole every week). Every weekly run appends one line per location to
+rating_history.tsv:
+
+    place_id <TAB> run timestamp (UTC ISO) <TAB> rating <TAB> userRatingCount <TAB> watermark
+
+watermark is the newest review publish time (unix seconds) ingested for the
+place so far, so the next run only has to process strictly newer reviews.
+
+The file only ever grows at the end, so the weekly commit-back is a small diff.
+rating_history.idx.json caches the latest record per place and each place's
+line offsets; it is rebuilt incrementally from the indexed size if the data file
+grew (or from scratch if the index is missing), so it is never a source of truth.
+It is local only: it grows with every line, so committing it would bring back
+the whole-file rewrite this format exists to avoid. CI rebuilds it each run.
+"""
+
+import datetime
+import json
+import os
+
+HISTORY_FILE = "rating_history.tsv"
+INDEX_FILE = "rating_history.idx.json"
+
+
+def _parse(line):
+    parts = line.rstrip("\n").split("\t")
+    pid, ts, rating, count = parts[:4]
+    watermark = parts[4] if len(parts) > 4 else ""
+    return (pid, ts, (float(rating) if rating else None), (int(count) if count else None),
+            (int(watermark) if watermark else None))
+
+
+class RatingHistory:
+    def __init__(self, path=HISTORY_FILE, index_path=INDEX_FILE):
+        self.path = path
+        self.index_path = index_path
+        self.latest_by_place = {}  # pid -> (ts, rating, count, watermark)
+        self.offsets = {}          # pid -> [byte offset of each line]
+        self.indexed_size = 0
+        self._load_index()
+        self._catch_up()
+
+    # ---------- index ----------
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                idx = json.load(f)
+            self.latest_by_place = {k: tuple(v) for k, v in idx["latest"].items()}
+            self.offsets = idx["offsets"]
+            self.indexed_size = idx["size"]
+        except (OSError, ValueError, KeyError):
+            self.latest_by_place, self.offsets, self.indexed_size = {}, {}, 0
+
+    def _catch_up(self):
+        """Index any lines appended since the index was last saved."""
+        if not os.path.exists(self.path):
+            return
+        size = os.path.getsize(self.path)
+        if size < self.indexed_size:  # file replaced/truncated — start over
+            self.latest_by_place, self.offsets, self.indexed_size = {}, {}, 0
+        if size == self.indexed_size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for raw in f:
+                line = raw.decode("utf-8")
+                if line.strip():
+                    self._index_line(_parse(line), offset)
+                offset += len(raw)
+        self.indexed_size = offset
+
+    def _index_line(self, rec, offset):
+        pid, ts, rating, count, watermark = rec
+        self.offsets.setdefault(pid, []).append(offset)
+        prev = self.latest_by_place.get(pid)
+        if prev is None or ts >= prev[0]:
+            self.latest_by_place[pid] = (ts, rating, count, watermark)
+
+    def save_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "size": self.indexed_size,
+                "latest": self.latest_by_place,
+                "offsets": self.offsets,
+            }, f, separators=(",", ":"))
+        os.replace(tmp, self.index_path)
+
+    # ---------- writes ----------
+    def append(self, place_id, rating, count, run_ts=None, watermark=None):
+        ts = run_ts or datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        line = (f"{place_id}\t{ts}\t{'' if rating is None else rating}\t{'' if count is None else int(count)}"
+                f"\t{'' if watermark is None else int(watermark)}\n")
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(line.encode("utf-8"))
+        self._index_line(_parse(line), offset)
+        self.indexed_size = offset + len(line.encode("utf-8"))
+
+    def seed_from_state(self, state_file):
+        """One-time migration: import lastRun/userRatingCount from the old state_reviews.json."""
+        if self.indexed_size or not os.path.exists(state_file):
+            return 0
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        for pid, entry in state.items():
+            run = entry.get("lastRun") or "1970-01-01"
+            self.append(pid, None, entry.get("userRatingCount"), run_ts=f"{run}T00:00:00Z")
+        return len(state)
+
+    # ---------- reads ----------
+    def latest(self, place_id):
+        """{"ts", "rating", "count", "watermark"} for the most recent run of this place, or None."""
+        rec = self.latest_by_place.get(place_id)
+        if rec is None:
+            return None
+        return {"ts": rec[0], "rating": rec[1], "count": rec[2], "watermark": rec[3] if len(rec) > 3 else None}
+
+    def series(self, place_id, since=None, until=None):
+        """[(ts, rating, count)] for one place, oldest first; since/until are ISO date(time) prefixes."""
+        out = []
+        offsets = self.offsets.get(place_id, [])
+        if not offsets:
+            return out
+        with open(self.path, "rb") as f:
+            for off in offsets:
+                f.seek(off)
+                _, ts, rating, count, _ = _parse(f.readline().decode("utf-8"))
+                if since and ts < since:
+                    continue
+                if until and ts[:len(until)] > until:
+                    continue
+                out.append((ts, rating, count))
+        out.sort()
+        return out
+
+    def deltas(self, place_id, since=None, until=None):
+        """[(ts, new_reviews_since_previous_run)] — the weekly 'new reviews' series."""
+        series = [(ts, c) for ts, _, c in self.series(place_id, since, until) if c is not None]
+        return [(ts, max(0, c - prev)) for (_, prev), (ts, c) in zip(series, series[1:])]
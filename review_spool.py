@@ -0,0 +1,167 @@
+"""
+Local, append-only spool of normalized reviews: the handoff from the weekly
+fetcher (reviews.py) to the sentiment pipeline (sentiment-analysis/main.py).
+
+reviews.py appends every new review it ingests as one JSON line. Lines go into
+numbered segments under spool/reviews/ (seg-000001.jsonl, ...). A segment is
+rolled once it passes SEGMENT_BYTES and is never rewritten after that. Each
+consumer keeps its own offset, stored as the segment number plus a byte
+position, in spool/reviews/offsets/<consumer>.json. It reads only what lies past
+that offset, so a run never has to download the whole "Reviews (raw)" tab back
+from Sheets.
+
+Segments hold full review text and author names, so they are not kept once
+read: prune() deletes every segment all consumers have read to the end. The
+weekly workflow prunes, then keeps spool/ (segments and offsets together) in the
+Actions cache. It is never committed to git.
+
+    spool = ReviewSpool()
+    spool.append(rows)                          # producer
+    records, pos = spool.read_unread("sentiment")
+    ...                                         # process records
+    spool.commit("sentiment", pos)              # only after processing succeeded
+    spool.prune()                               # drop fully consumed segments
+
+    python review_spool.py status               # segments + per-consumer lag
+    python review_spool.py prune
+"""
+
+import argparse
+import glob
+import json
+import os
+
+SPOOL_DIR = os.path.join("spool", "reviews")
+SEGMENT_BYTES = 1_000_000
+
+
+class ReviewSpool:
+    def __init__(self, root=SPOOL_DIR, segment_bytes=SEGMENT_BYTES):
+        self.root = root
+        self.segment_bytes = segment_bytes
+
+    # ---------- segments ----------
+    def _segment_path(self, n):
+        return os.path.join(self.root, f"seg-{n:06d}.jsonl")
+
+    def segments(self):
+        """Segment numbers, oldest first."""
+        names = glob.glob(os.path.join(self.root, "seg-*.jsonl"))
+        return sorted(int(os.path.basename(p)[4:10]) for p in names)
+
+    # ---------- producer ----------
+    def append(self, records):
+        """Append records (dicts) to the open segment, rolling to a new one when it's full."""
+        if not records:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        segs = self.segments()
+        # After a prune emptied the spool, carry on from where the consumers point
+        n = segs[-1] if segs else max([1] + [self.position(c)[0] for c in self.consumers()])
+        path = self._segment_path(n)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_bytes:
+            n += 1
+            path = self._segment_path(n)
+        data = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(records)
+
+    # ---------- consumers ----------
+    def _offset_path(self, consumer):
+        return os.path.join(self.root, "offsets", f"{consumer}.json")
+
+    def consumers(self):
+        names = glob.glob(os.path.join(self.root, "offsets", "*.json"))
+        return sorted(os.path.splitext(os.path.basename(p))[0] for p in names)
+
+    def position(self, consumer):
+        """(segment, byte offset) this consumer has committed; (0, 0) if it never read."""
+        try:
+            with open(self._offset_path(consumer), "r", encoding="utf-8") as f:
+                pos = json.load(f)
+            return int(pos["segment"]), int(pos["offset"])
+        except (OSError, ValueError, KeyError):
+            return 0, 0
+
+    def read_unread(self, consumer):
+        """All records past the consumer's offset, plus the position to commit once they're handled."""
+        seg, offset = self.position(consumer)
+        records, end = [], (seg, offset)
+        for n in self.segments():
+            if n < seg:
+                continue
+            start = offset if n == seg else 0
+            with open(self._segment_path(n), "rb") as f:
+                f.seek(start)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # partial line from an interrupted write — leave it for next time
+                    start += len(raw)
+                    if raw.strip():
+                        records.append(json.loads(raw))
+            end = (n, start)
+        return records, end
+
+    def commit(self, consumer, position):
+        path = self._offset_path(consumer)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segment": position[0], "offset": position[1]}, f)
+        os.replace(tmp, path)
+
+    def prune(self):
+        """Delete segments every consumer has read to the end; returns how many were removed.
+
+        A consumer whose offset sat at the end of a removed segment is moved to the
+        start of the next one. With no consumers nothing is known to be read, so
+        nothing is removed.
+        """
+        positions = {c: self.position(c) for c in self.consumers()}
+        if not positions:
+            return 0
+        removed = []
+        for n in self.segments():
+            size = os.path.getsize(self._segment_path(n))
+            if not all(seg > n or (seg == n and offset >= size) for seg, offset in positions.values()):
+                break
+            os.remove(self._segment_path(n))
+            removed.append(n)
+        for consumer, (seg, _) in positions.items():
+            if removed and seg <= removed[-1]:
+                self.commit(consumer, (removed[-1] + 1, 0))
+        return len(removed)
+
+    def lag(self, consumer):
+        """Unread bytes for a consumer."""
+        seg, offset = self.position(consumer)
+        return sum(
+            os.path.getsize(self._segment_path(n)) - (offset if n == seg else 0)
+            for n in self.segments() if n >= seg
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review spool")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("status", help="list segments and consumer lag")
+    sub.add_parser("prune", help="delete segments every consumer has read")
+    args = parser.parse_args()
+
+    spool = ReviewSpool()
+    if args.cmd == "status":
+        segs = spool.segments()
+        total = sum(os.path.getsize(spool._segment_path(n)) for n in segs)
+        print(f"{len(segs)} segment(s), {total} bytes in {spool.root}")
+        for consumer in spool.consumers():
+            seg, offset = spool.position(consumer)
+            print(f"  {consumer}: at seg {seg} +{offset}, {spool.lag(consumer)} bytes unread")
+    elif args.cmd == "prune":
+        print(f"Pruned {spool.prune()} consumed segment(s) from {spool.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,14 @@
-import os, sys, csv, re, math, json, pathlib, datetime, requests, gspread,  hashlib
+import os, sys, csv, re, math, json, pathlib, datetime, hashlib, string, argparse
+from concurrent.futures import ThreadPoolExecutor
 from collections import Counter
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
+from run_profile import count, profile, span, traced, write_profile
+from rating_history import RatingHistory
+from slack_queue import SlackQueue
+from summary_archive import archive_run
+from review_spool import ReviewSpool
+from location_registry import LocationRegistry
+from lexicon import NEG_WORDS, POS_WORDS, tokenize
 # ---------- Config ----------
 load_dotenv()  # loads .env in same folder
 
@@ -10,32 +17,11 @@ if hasattr(sys.stdout, "reconfigure"):
 
 API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")  # <-- put in .env
 SLACK_WEBHOOK = os.getenv("SLACK_WEBHOOK_URL")  # optional, for Slack posting
-STATE_FILE = "state_reviews.json"
-SHEET_ID = "1rAMV-_Xh2Q8wpgAJWzgzYbHu96UO9NmsD1xGHr2Xz1E"
-
-# List your locations here (Place ID + friendly name)
-LOCATIONS = [
-    {"place_id": "ChIJ-2-ZMugNU4cRXL9GFcRRrqM", "name": "Pleasant View"},
-    {"place_id": "ChIJMY4HT7ABU4cRy4c9fdaxWvs", "name": "Layton"},
-    {"place_id": "ChIJIUoOrwyNUocRUwzGQocvYUc", "name": "Kearns"},
-    {"place_id": "ChIJs-ajHLKNUocRkkO6bkNDqvw", "name": "West Valley"},
-    {"place_id": "ChIJZZ9Ay1qLUocRdx4fuIR4JO0", "name": "Murray"},
-    {"place_id": "ChIJRRGDHveHUocRUs0phtO91cA", "name": "Draper"},
-    {"place_id": "ChIJS-gO0piBTYcRQgGTvKmhWmw", "name": "Cedar Hills"},
-    {"place_id": "ChIJBU3KaAF_TYcRDXRnINFqVrc", "name": "Lehi"},
-    {"place_id": "ChIJr5Bc4XaXTYcRhiP8bvuO890", "name": "Provo"},
-    {"place_id": "ChIJpVZeaADdyIkRKcYGPT7ToQ0", "name": "Mechanicsburg"},
-    {"place_id": "ChIJuzMJq3vByIkR6G88vcr88B4", "name": "Lemoyne"},
-    {"place_id": "ChIJG0ygTT-5yIkR6mwGt6AHOLA", "name": "Lower Paxton"},
-    {"place_id": "ChIJbYGn7RvHyIkRdwfpTJLHpmY", "name": "Linglestown"},
-    {"place_id": "ChIJb82CdhoDxokRkN84hrDFo8M", "name": "Lebanon"},
-    {"place_id": "ChIJlzkojDM_z4kREheIVuR8Ke8", "name": "Selinsgrove"},
-    {"place_id": "ChIJq3MX6zWNyIkR2PJtX4UD1dg", "name": "West Manchester"},
-    {"place_id": "ChIJoXCCLyYtyIkRpTKJEcL335U", "name": "Mt. Airy"},
-    {"place_id": "ChIJdaPibmq9t4kR8nlIXd3l-pQ", "name": "Clinton"},
-    {"place_id": "ChIJMzZkas_9x4kRFjoJslJnhYk", "name": "Middle River"}
-    # Add more: {"place_id": "...", "name": "..."},
-]
+STATE_FILE = "state_reviews.json"  # legacy; only read once to seed rating_history.tsv
+
+# Locations and their spreadsheet shards live in locations.json (see location_registry.py)
+REGISTRY = LocationRegistry()
+LOCATIONS = REGISTRY.locations()
 
 SERVICE_ACCOUNT_PATH = os.getenv("GOOGLE_SERVICE_ACCOUNT", "service_account.json")
 
@@ -44,6 +30,10 @@ import json, base64
 
 @lru_cache(maxsize=1)
 def get_gspread_client():
+    # Client libraries load on first use, not at import
+    from google.oauth2.service_account import Credentials
+    from sheets_governor import authorize
+
     scope = ["https://www.googleapis.com/auth/spreadsheets"]
 
     # Prefer base64 secret if present (handy for GitHub Actions)
@@ -58,7 +48,8 @@ def get_gspread_client():
             )
         creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_PATH, scopes=scope)
 
-    return gspread.authorize(creds)
+    # Paced against the Sheets per-minute quotas, with 429s retried
+    return authorize(creds)
 
 
 # How many newest reviews to show in Slack & reports
@@ -69,16 +60,6 @@ def stars_to_sentiment(stars: float) -> float:
     # map 1..5 stars to -1..1
     return max(-1.0, min(1.0, (stars - 3.0) / 2.0))
 
-POS_WORDS = set("""
-amazing awesome great excellent friendly clean quick fast helpful convenient best love loved efficient thorough shiny membership value
-""".split())
-NEG_WORDS = set("""
-bad rude slow dirty expensive broken confusing hard worse worst terrible awful disappointed streaks damage queue wait waiting scratch
-""".split())
-
-def tokenize(text: str):
-    return re.findall(r"[a-zA-Z']+", (text or "").lower())
-
 def label_from_score(s):
     if s >= 0.25: return "Positive"
     if s <= -0.25: return "Negative"
@@ -93,20 +74,13 @@ def iso_utc_from_unix(ts):
 import json, datetime, os
 
 #--- helper to get count of reviews weekly ---#
-def load_state():
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-def save_state(state):
-    tmp = STATE_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(state, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, STATE_FILE)
+@traced("state.load")
+def load_history():
+    history = RatingHistory()
+    seeded = history.seed_from_state(STATE_FILE)
+    if seeded:
+        print(f"ℹ️ Seeded rating history with {seeded} place(s) from {STATE_FILE}")
+    return history
 
 def parse_iso_z(s):
     # "2025-08-16T00:45:46Z" -> aware datetime in UTC
@@ -130,107 +104,222 @@ def reviews_since(reviews, since_dt_utc):
 
 
 #--- google sheets upload helper ---#
-def upload_to_google_sheets(csv_path, worksheet_name="Google Reviews Data"):
-    # Always create a new authorized client
-    client = get_gspread_client()
-
-    # Open the right Google Sheet by ID
-    sh = client.open_by_key(SHEET_ID)
-
-    # Get (or create) the worksheet
-    try:
-        ws = sh.worksheet(worksheet_name)
-    except gspread.WorksheetNotFound:
-        ws = sh.add_worksheet(title=worksheet_name, rows=2000, cols=20)
-
-    # Read the CSV file
-    with open(csv_path, "r", encoding="utf-8") as f:
-        rows = list(csv.reader(f))
-    if not rows:
-        print("⚠️ No rows found in CSV to upload.")
-        return
-
-    header = rows[0]
-    data = rows[1:]
-
-    # Check if worksheet is empty
-    existing = ws.get_all_values()
-    if not existing:
-        ws.update([header] + data, "A1")
-        print(f"✅ Created new sheet with {len(data)} rows on tab '{worksheet_name}'")
-    else:
-        if data:
-            ws.append_rows(data, value_input_option="USER_ENTERED")
-            print(f"✅ Appended {len(data)} rows to tab '{worksheet_name}'")
-        else:
-            print("⚠️ No new data rows to append.")
-
-    # Format the first column as date (if your first column is 'date')
-    ws.format('A2:A', {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'}})
-
-
-def upsert_reviews_to_sheet(reviews_rows, worksheet_name="Reviews (raw)"):
-    # Always create a new authorized client
-    client = get_gspread_client()
-    sh = client.open_by_key(SHEET_ID)
+SUMMARY_TAB = "Google Reviews Data"
+RAW_TAB = "Reviews (raw)"
+RAW_HEADER = [
+    "date_run","place","place_id","author","rating",
+    "publishTime","relativeTime","text","dedupe_key"
+]
+DATE_FORMAT = {"numberFormat": {"type": "DATE", "pattern": "yyyy-mm-dd"}}
+# Developer-metadata key recording that a tab's column A already has DATE_FORMAT
+DATE_FORMAT_KEY = "reviews.date_format.A"
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+_SHEETS_EPOCH = datetime.date(1899, 12, 30)
+
+
+def _cell(value):
+    """CellData for one value, parsed the way USER_ENTERED would for our columns."""
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    value = str(value)
+    if _ISO_DATE.match(value):
+        serial = (datetime.date.fromisoformat(value) - _SHEETS_EPOCH).days
+        return {"userEnteredValue": {"numberValue": serial}}
+    if _NUMBER.match(value):
+        return {"userEnteredValue": {"numberValue": float(value)}}
+    return {"userEnteredValue": {"stringValue": value}}
+
+
+def _column(index):
+    """A1 column letters for a 0-based column index (8 -> "I", 26 -> "AA")."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def dedupe_key(r):
+    text = (r.get("text") or "").strip()
+    text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+    return f"{r.get('place_id')}\t{r.get('publishTime')}\t{text_hash}"
+
+
+class SheetsSink:
+    """Collects the summary + raw review rows for one run and writes them in one go.
+
+    flush() opens the spreadsheet once and makes a constant number of calls no
+    matter how many locations/reviews there are:
+      1. sheet metadata (tab ids + which tabs already carry the date format)
+      2. one values batchGet: A1 of the summary tab (emptiness probe), the raw
+         tab's header row and the column RAW_HEADER puts dedupe_key in (existing
+         keys). The column is resolved from the header by name; only if the tab's
+         dedupe_key sits elsewhere is that column read in a second batchGet
+      3. one batchUpdate: appendCells for both tabs, plus the column-A date
+         format only for tabs that don't have it yet
+    (plus one addSheet batchUpdate the first time a tab doesn't exist).
+    """
+
+    def __init__(self, sheet_id=None):
+        self.sheet_id = sheet_id or REGISTRY.rollup_sheet_id
+        self.summary_rows = []
+        self.review_rows = []
+
+    def add_summary(self, rows):
+        self.summary_rows.extend(rows)
+
+    def add_reviews(self, rows):
+        self.review_rows.extend(rows)
+
+    def _tabs(self, sh):
+        meta = sh.fetch_sheet_metadata({"fields": "sheets(properties(sheetId,title),developerMetadata)"})
+        count("sheets.reads")
+        tabs = {}
+        for sheet in meta.get("sheets", []):
+            props = sheet["properties"]
+            keys = {m.get("metadataKey") for m in sheet.get("developerMetadata", [])}
+            tabs[props["title"]] = (props["sheetId"], DATE_FORMAT_KEY in keys)
+        return tabs
+
+    def _ensure_tabs(self, sh, tabs, titles):
+        missing = [t for t in titles if t not in tabs]
+        if not missing:
+            return tabs
+        sh.batch_update({"requests": [
+            {"addSheet": {"properties": {"title": t, "gridProperties": {"rowCount": 2000, "columnCount": 20}}}}
+            for t in missing
+        ]})
+        count("sheets.writes")
+        return self._tabs(sh)
+
+    @traced("sheets.flush")
+    def flush(self):
+        if not self.summary_rows and not self.review_rows:
+            return
+        client = get_gspread_client()
+        sh = client.open_by_key(self.sheet_id)
+        # A roll-up workbook only gets summary rows; a shard workbook may only get raw rows
+        titles = ([SUMMARY_TAB] if self.summary_rows else []) + ([RAW_TAB] if self.review_rows else [])
+        tabs = self._ensure_tabs(sh, self._tabs(sh), titles)
+
+        expected = _column(RAW_HEADER.index("dedupe_key"))
+        ranges = [f"'{SUMMARY_TAB}'!A1"] if self.summary_rows else []
+        if self.review_rows:
+            ranges += [f"'{RAW_TAB}'!1:1", f"'{RAW_TAB}'!{expected}2:{expected}"]
+        with span("sheets.read", tab=", ".join(titles)):
+            got = sh.values_batch_get(ranges)
+        values = [vr.get("values", []) for vr in got.get("valueRanges", [])]
+        probe = values.pop(0) if self.summary_rows else []
+        raw_header = (values.pop(0) or [[]])[0] if self.review_rows else []
+        raw_keys = values.pop(0) if self.review_rows else []
+        count("sheets.reads")
+
+        # The raw tab's headers are maintained by hand, so find dedupe_key by name
+        if raw_header:
+            column = _column(raw_header.index("dedupe_key"))
+            if column != expected:
+                with span("sheets.read", tab=RAW_TAB):
+                    got = sh.values_batch_get([f"'{RAW_TAB}'!{column}2:{column}"])
+                raw_keys = got.get("valueRanges", [{}])[0].get("values", [])
+                count("sheets.reads")
+        count("sheets.rows_read", len(raw_keys))
+
+        requests_ = []
+
+        # Summary rows: header only when the tab is empty
+        summary = []
+        if self.summary_rows:
+            header = list(self.summary_rows[0].keys())
+            if not probe:
+                summary.append(header)
+            summary += [[r.get(k, "") for k in header] for r in self.summary_rows]
+            requests_.append(self._append(tabs[SUMMARY_TAB][0], summary))
+
+        # Raw reviews: skip anything whose dedupe_key is already on the tab
+        existing_keys = {row[0] for row in raw_keys if row}
+        raw = [] if raw_header or not self.review_rows else [RAW_HEADER]
+        for r in self.review_rows:
+            key = dedupe_key(r)
+            if key in existing_keys:
+                continue
+            existing_keys.add(key)
+            raw.append([
+                r.get("date_run",""),
+                r.get("place",""),
+                r.get("place_id",""),
+                r.get("author",""),
+                r.get("rating",""),
+                r.get("publishTime",""),
+                r.get("relativeTime",""),
+                (r.get("text") or "").strip(),
+                key
+            ])
+        new_raw = len(raw) - (1 if raw[:1] == [RAW_HEADER] else 0)
+        if raw:
+            requests_.append(self._append(tabs[RAW_TAB][0], raw))
+
+        # Date format on column A — applied once per tab, then remembered on the tab itself
+        for title in titles:
+            tab_id, formatted = tabs[title]
+            if not formatted:
+                requests_ += self._date_format(tab_id)
+
+        if requests_:
+            with span("sheets.write", tabs=len(tabs)):
+                sh.batch_update({"requests": requests_})
+            count("sheets.writes")
+            count("sheets.rows_written", len(summary) + len(raw))
+
+        if self.summary_rows:
+            print(f"✅ Appended {len(self.summary_rows)} rows to tab '{SUMMARY_TAB}'")
+        if new_raw:
+            print(f"✅ Appended {new_raw} review row(s) to '{RAW_TAB}'")
+        elif self.review_rows:
+            print(f"ℹ️ No new review rows to append (all were duplicates).")
+
+    @staticmethod
+    def _append(tab_id, rows):
+        return {"appendCells": {
+            "sheetId": tab_id,
+            "rows": [{"values": [_cell(v) for v in row]} for row in rows],
+            "fields": "userEnteredValue",
+        }}
+
+    @staticmethod
+    def _date_format(tab_id):
+        return [
+            {"repeatCell": {
+                "range": {"sheetId": tab_id, "startRowIndex": 1, "startColumnIndex": 0, "endColumnIndex": 1},
+                "cell": {"userEnteredFormat": DATE_FORMAT},
+                "fields": "userEnteredFormat.numberFormat",
+            }},
+            {"createDeveloperMetadata": {"developerMetadata": {
+                "metadataKey": DATE_FORMAT_KEY,
+                "metadataValue": DATE_FORMAT["numberFormat"]["pattern"],
+                "location": {"sheetId": tab_id},
+                "visibility": "DOCUMENT",
+            }}},
+        ]
 
-    header = [
-        "date_run","place","place_id","author","rating",
-        "publishTime","relativeTime","text","dedupe_key"
-    ]
 
-    try:
-        ws = sh.worksheet(worksheet_name)
-        existing = ws.get_all_values()
-        if not existing:
-            ws.update([header], "A1")
-            existing = [header]
-    except gspread.WorksheetNotFound:
-        ws = sh.add_worksheet(title=worksheet_name, rows=2000, cols=10)
-        ws.update([header], "A1")
-        existing = [header]
-
-    # Format the date_run column as date
-    ws.format('A2:A', {'numberFormat': {'type': 'DATE', 'pattern': 'yyyy-mm-dd'}})
-
-    # Build set of existing dedupe keys
-    existing_keys = set()
-    if len(existing) > 1:
-        dedupe_idx = existing[0].index("dedupe_key")
-        for row in existing[1:]:
-            if len(row) > dedupe_idx:
-                existing_keys.add(row[dedupe_idx])
-
-    # Prepare new rows
-    to_append = []
-    for r in reviews_rows:
-        text = (r.get("text") or "").strip()
-        text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
-        key = f"{r.get('place_id')}\t{r.get('publishTime')}\t{text_hash}"
-        if key in existing_keys:
-            continue
-        to_append.append([
-            r.get("date_run",""),
-            r.get("place",""),
-            r.get("place_id",""),
-            r.get("author",""),
-            r.get("rating",""),
-            r.get("publishTime",""),
-            r.get("relativeTime",""),
-            text,
-            key
-        ])
-
-    if to_append:
-        ws.append_rows(to_append, value_input_option="USER_ENTERED")
-        print(f"✅ Appended {len(to_append)} review row(s) to '{worksheet_name}'")
-    else:
-        print(f"ℹ️ No new review rows to append (all were duplicates).")
 
 
+# ---------- API calls ----------
+@lru_cache(maxsize=1)
+def http_session():
+    # requests loads on first fetch; one session keeps the connection to Google alive
+    import requests
+    return requests.Session()
 
 
-# ---------- API calls ----------
+@traced("fetch.places_new")
 def fetch_new_api(place_id):
     place_id = place_id.strip()
     url = f"https://places.googleapis.com/v1/places/{place_id}"
@@ -238,13 +327,16 @@ def fetch_new_api(place_id):
         "X-Goog-Api-Key": API_KEY,
         "X-Goog-FieldMask": "id,displayName,rating,userRatingCount"
     }
-    r = requests.get(url, headers=headers, timeout=30)
+    r = http_session().get(url, headers=headers, timeout=30)
+    count("places.calls")
+    count("places.bytes", len(r.content))
     if r.status_code != 200:
         print("NEW API ERROR:", r.status_code, r.text)
         r.raise_for_status()
     return r.json()
 
 
+@traced("fetch.places_legacy")
 def fetch_legacy_newest(place_id, language="en"):
     base = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
@@ -254,12 +346,15 @@ def fetch_legacy_newest(place_id, language="en"):
         "language": language,
         "key": API_KEY
     }
-    r = requests.get(base, params=params, timeout=30)
+    r = http_session().get(base, params=params, timeout=30)
+    count("places.calls")
+    count("places.bytes", len(r.content))
     r.raise_for_status()
     data = r.json()
     return (data.get("result") or {})
 
 # ---------- Sentiment & theming ----------
+@traced("sentiment")
 def summarize_sentiment(avg_rating, reviews_text_and_star):
     # star-based sentiment from review stars OR fallback to avg rating
     star_scores = []
@@ -321,45 +416,111 @@ we i you they he she them us our my your their
 def ensure_dir(path):
     pathlib.Path(path).mkdir(parents=True, exist_ok=True)
 
-def write_markdown_report(folder, loc_name, maps_url, rating, count, review_summary, newest_reviews, sentiment):
-    md = []
-    md.append(f"# {loc_name}")
-    md.append("")
-    md.append(f"- **Google Rating:** {rating}  ({count} total)")
+# Precompiled pieces of the per-location report — rendering is pure string work,
+# so it runs on a background pool while the next location is being fetched.
+_MD_HEAD = string.Template("# ${name}\n\n- **Google Rating:** ${rating}  (${count} total)")
+_MD_MAPS = string.Template("- **Google Maps:** ${url}")
+_MD_SENTIMENT = string.Template("- **Automated sentiment:** **${label}** (score ${score})")
+_MD_REVIEW = string.Template("- **[${stars}★] ${when}** — ${text}")
+_MD_INDEX_ROW = string.Template("| [${name}](${file}) | ${rating} | ${count} | ${new} | ${label} (${score}) |")
+
+def report_path(folder, loc_name):
+    return os.path.join(folder, f"{loc_name.replace(' ', '_')}.md")
+
+def render_markdown_report(loc_name, maps_url, rating, review_count, review_summary, newest_reviews, sentiment):
+    md = [_MD_HEAD.substitute(name=loc_name, rating=rating, count=review_count)]
     if maps_url:
-        md.append(f"- **Google Maps:** {maps_url}")
-    md.append(f"- **Automated sentiment:** **{sentiment['label']}** (score {sentiment['score']})")
+        md.append(_MD_MAPS.substitute(url=maps_url))
+    md.append(_MD_SENTIMENT.substitute(label=sentiment["label"], score=sentiment["score"]))
     if review_summary:
         # new API's summary is structured; show its 'overview' if present, otherwise dump JSON
         overview = review_summary.get("overview")
         if overview:
-            md.append("")
-            md.append("## Google Review Data")
-            md.append(overview.strip())
-    md.append("")
-    md.append("## Newest Reviews")
+            md += ["", "## Google Review Data", overview.strip()]
+    md += ["", "## Newest Reviews"]
     if not newest_reviews:
         md.append("_None returned by API_")
     else:
         for r in newest_reviews[:N_NEWEST]:
-            stars = r.get("rating")
             text = r.get("text") or ""
             when = r.get("publishTime") or r.get("relativeTime") or ""
             clean_text = text.strip().replace("\n", " ")
-            md.append(f"- **[{stars}★] {when}** — {clean_text[:400]}{'…' if len(clean_text) > 400 else ''}")
-
+            md.append(_MD_REVIEW.substitute(
+                stars=r.get("rating"), when=when,
+                text=f"{clean_text[:400]}{'…' if len(clean_text) > 400 else ''}",
+            ))
+    return "\n".join(md)
+
+def write_if_changed(path, content):
+    """Write content unless the file already holds exactly these bytes (e.g. a same-day rerun)."""
+    data = content.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                count("report.unchanged")
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+    count("report.written")
+    return True
+
+@traced("report.markdown")
+def write_markdown_report(folder, loc_name, maps_url, rating, review_count, review_summary, newest_reviews, sentiment):
+    path = report_path(folder, loc_name)
+    write_if_changed(path, render_markdown_report(loc_name, maps_url, rating, review_count, review_summary, newest_reviews, sentiment))
+    return path
 
-    path = os.path.join(folder, f"{loc_name.replace(' ', '_')}.md")
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(md))
+class ReportRenderer:
+    """Renders and writes location reports on a small thread pool, off the fetch loop.
+
+    submit() returns the report path immediately; wait() blocks until every
+    report is written.
+    """
+    def __init__(self, folder, max_workers=8):
+        self.folder = folder
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self.futures = []
+
+    def submit(self, loc_name, maps_url, rating, review_count, review_summary, newest_reviews, sentiment):
+        self.futures.append(self.pool.submit(
+            write_markdown_report, self.folder, loc_name, maps_url, rating, review_count,
+            review_summary, list(newest_reviews), dict(sentiment),
+        ))
+        return report_path(self.folder, loc_name)
+
+    def wait(self):
+        """Block until every submitted report is written."""
+        try:
+            for fut in self.futures:
+                fut.result()
+        finally:
+            self.pool.shutdown()
+
+
+def write_report_index(folder, summary_rows):
+    lines = [
+        f"# Weekly Google Reviews — {os.path.basename(os.path.normpath(folder))}",
+        "",
+        "| Location | Rating | Reviews | New this week | Sentiment |",
+        "|---|---|---|---|---|",
+    ]
+    for row in summary_rows:
+        lines.append(_MD_INDEX_ROW.substitute(
+            name=row["place"], file=os.path.basename(row["report_path"]),
+            rating=row["rating"], count=row["review_count"], new=row["new_reviews_week"],
+            label=row["sentiment_label"], score=row["sentiment_score"],
+        ))
+    path = os.path.join(folder, "index.md")
+    write_if_changed(path, "\n".join(lines) + "\n")
     return path
-def post_to_slack(webhook_url, loc_name, maps_url, rating, count, sentiment, newest_reviews,weekly_new=None, sample_7d=None):
-    if not webhook_url:
-        return
 
+
+def slack_message(loc_name, maps_url, rating, review_count, sentiment, newest_reviews, weekly_new=None):
     lines = []
     lines.append(f"*📍 {loc_name}*")
-    lines.append(f"⭐ {rating} ({count} reviews)")
+    lines.append(f"⭐ {rating} ({review_count} reviews)")
     if weekly_new is None:
         lines.append("🆕 New this week: — (first run)")
     else:
@@ -379,22 +540,32 @@ def post_to_slack(webhook_url, loc_name, maps_url, rating, count, sentiment, new
                 text = text[:240] + "…"
             lines.append(f"• [{stars}★] {when} — {text}")
 
-    payload = {"text": "\n".join(lines)}
-    try:
-        requests.post(webhook_url, json=payload, timeout=15).raise_for_status()
-    except Exception as e:
-        print("Slack post failed:", e)
-
-def main():
-    today = datetime.date.today().isoformat()
-    out_dir = os.path.join("reports", today)
-    state = load_state()
-    ensure_dir(out_dir)
+    return "\n".join(lines)
 
+def post_to_slack(webhook_url, loc_name, maps_url, rating, review_count, sentiment, newest_reviews,weekly_new=None, sample_7d=None):
+    # One-off post; main() queues every location and sends them together at the end
+    if not webhook_url:
+        return
+    q = SlackQueue(webhook_url)
+    q.add(slack_message(loc_name, maps_url, rating, review_count, sentiment, newest_reviews, weekly_new))
+    q.flush()
+
+def run_shard(locations, today, run_ts, out_dir, history=None):
+    """Fetch, score and report one shard's locations.
+
+    Only reads shared state (the rating history) and writes per-location report
+    files, so shards can run side by side in worker processes. Everything that
+    touches shared files or Sheets is returned for main() to commit once.
+    """
+    if history is None:
+        history = RatingHistory()
     summary_rows = []
     reviews_rows_all = []
+    history_rows = []
+    slack_texts = []
+    renderer = ReportRenderer(out_dir)
 
-    for loc in LOCATIONS:
+    for loc in locations:
         pid = loc["place_id"]
         name = loc.get("name") or pid
 
@@ -406,13 +577,24 @@ def main():
 
         maps_url = new.get("googleMapsUri")
         avg_rating = new.get("rating")
-        count = new.get("userRatingCount", 0)  # <-- New API field name
+        review_count = new.get("userRatingCount", 0)  # <-- New API field name
         review_summary = new.get("reviewSummary")
         new_reviews = new.get("reviews") or []
 
         # --- Legacy API for newest reviews ---
         legacy = fetch_legacy_newest(pid, language="en")
-        legacy_reviews = legacy.get("reviews", []) or []
+        legacy_all = legacy.get("reviews", []) or []
+
+        # Watermark = newest publish time (unix) already ingested for this place.
+        # Only strictly newer reviews get normalized, scored, hashed and uploaded.
+        prev = history.latest(pid) or {}
+        watermark = prev.get("watermark")
+        if watermark is not None:
+            legacy_reviews = [r for r in legacy_all if int(r.get("time") or 0) > watermark]
+        else:
+            legacy_reviews = legacy_all
+        new_watermark = max([watermark or 0] + [int(r.get("time") or 0) for r in legacy_reviews]) or None
+
         normalized_newest = []
         for r in legacy_reviews:
             normalized_newest.append({
@@ -424,14 +606,18 @@ def main():
                 "profilePhotoUrl": r.get("profile_photo_url"),
             })
 
-            # --- 7-day filtered newest reviews ---
-        now_utc = datetime.datetime.now(datetime.timezone.utc)
-        seven_days_ago = now_utc - datetime.timedelta(days=7)
-        newest_week = reviews_since(normalized_newest, seven_days_ago)
+        if watermark is not None:
+            # --- everything past the watermark is new since last run ---
+            newest_week = normalized_newest
+        else:
+            # --- first run for this place: 7-day filtered newest reviews ---
+            now_utc = datetime.datetime.now(datetime.timezone.utc)
+            seven_days_ago = now_utc - datetime.timedelta(days=7)
+            newest_week = reviews_since(normalized_newest, seven_days_ago)
         sample_7d = len(newest_week)  # keep this metric if you like
 
         # ✅ INSERT THE DETAIL ROW BUILDER *RIGHT HERE*
-        for r in newest_week:  # last 7 days only
+        for r in newest_week:  # new since last run (or last 7 days on first run)
             reviews_rows_all.append({
                 "date_run": today,
                 "place": name,
@@ -443,16 +629,16 @@ def main():
                 "text": (r.get("text") or "").strip()
             })
 
-        # --- Weekly "new reviews" count based on 7-day window ---
         # --- Weekly "new reviews" count based on review count delta ---
-        prev = state.get(pid, {})
-        prev_count = prev.get("userRatingCount")
+        # Not the watermark: the legacy API returns only the 5 newest reviews, so counting
+        # reviews past the watermark would cap this at 5 and miss star-only ratings.
+        prev_count = prev.get("count")
 
-        if prev_count is not None and count is not None:
+        if prev_count is not None and review_count is not None:
             # True number of new reviews since last run
-            weekly_new = max(0, count - prev_count)
+            weekly_new = max(0, review_count - prev_count)
         else:
-            # First run or missing data → fallback to 7-day filtered
+            # First run or missing data → fallback to the new-review list
             weekly_new = len(newest_week)
 
         # Keep original variable so your existing print/Slack/CSV code works
@@ -461,11 +647,8 @@ def main():
 
 
 
-        # Record the latest count for next week
-        state[pid] = {
-            "userRatingCount": int(count) if count is not None else None,
-            "lastRun": datetime.date.today().isoformat(),
-        }
+        # This run's rating + review count, appended to the history by main() for next week's delta
+        history_rows.append((pid, avg_rating, review_count, new_watermark))
         # --- Sentiment ---
 
         # --- Sentiment (use the same 7-day set you display) ---
@@ -483,7 +666,7 @@ def main():
 
         # Fallback to overall newest if week is empty
         if not pairs:
-            pairs = [(_to_float_or_none(r.get("rating")), (r.get("text") or "")) for r in normalized_newest[:5]]
+            pairs = [(_to_float_or_none(r.get("rating")), (r.get("text") or "")) for r in legacy_all[:5]]
 
         # Final fallback: new API reviews structure
         if not pairs:
@@ -503,7 +686,7 @@ def main():
         # --- Terminal output per location ---
         print("\n===============================")
         print(f"📍 {loc_name}")
-        print(f"⭐ Avg rating: {avg_rating} ({count} reviews)")
+        print(f"⭐ Avg rating: {avg_rating} ({review_count} reviews)")
         print(f"🆕 New this week: {weekly_new_clamped}")
         print(f"🙂 Sentiment: {sentiment['label']} ({sentiment['score']})")
         if newest_week:
@@ -518,18 +701,18 @@ def main():
             print("No reviews in the last 7 days.")
 
         if SLACK_WEBHOOK:
-            post_to_slack(
-                SLACK_WEBHOOK, loc_name, maps_url, avg_rating, count, sentiment,
+            # Queued — delivered in batched payloads after all the data work is done
+            slack_texts.append(slack_message(
+                loc_name, maps_url, avg_rating, review_count, sentiment,
                 newest_week,  # <-- only the filtered list
                 weekly_new=weekly_new_clamped,
-                sample_7d=sample_7d
-            )
+            ))
         else:
             print("⚠️ SLACK_WEBHOOK_URL not set; skipping Slack")
 
-        # --- Optional: still write Markdown + CSV for archiving ---
-        md_path = write_markdown_report(
-            out_dir, loc_name, maps_url, avg_rating, count, review_summary,
+        # --- Optional: still write Markdown + CSV for archiving (rendered in the background) ---
+        md_path = renderer.submit(
+            loc_name, maps_url, avg_rating, review_count, review_summary,
             newest_week,  # <-- only the filtered list
             sentiment
         )
@@ -539,30 +722,126 @@ def main():
             "place": name,
             "place_id": pid,
             "rating": avg_rating,
-            "review_count": count,
+            "review_count": review_count,
             "new_reviews_week": weekly_new_clamped if weekly_new_clamped is not None else "",
             "sentiment_label": sentiment["label"],
             "sentiment_score": round(float(sentiment["score"]), 2),
             "report_path": md_path.replace("\\", "/"),
             "maps_url": maps_url or ""
         })
-        
-    save_state(state)
+
+    renderer.wait()
+    return {
+        "summary_rows": summary_rows,
+        "reviews_rows": reviews_rows_all,
+        "history_rows": history_rows,
+        "slack": slack_texts,
+    }
+
+
+def _shard_worker(locations, today, run_ts, out_dir):
+    # Forked workers inherit the parent's counters — hand back only this shard's share
+    before = dict(profile.counters)
+    result = run_shard(locations, today, run_ts, out_dir)
+    result["counters"] = {k: v - before.get(k, 0) for k, v in profile.counters.items() if v != before.get(k, 0)}
+    return result
+
+
+def main(shard=None, workers=None):
+    today = datetime.date.today().isoformat()
+    out_dir = os.path.join("reports", today)
+    history = load_history()
+    run_ts = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    ensure_dir(out_dir)
+
+    shards = [REGISTRY.shard(shard)] if shard else REGISTRY.shards
+    if len(shards) == 1:
+        results = [run_shard(shards[0]["locations"], today, run_ts, out_dir, history)]
+    else:
+        # One worker process per shard; they read the (seeded) history from disk
+        from concurrent.futures import ProcessPoolExecutor
+        history.save_index()
+        workers = workers or min(len(shards), os.cpu_count() or 1)
+        with span("shards.run", shards=len(shards)), ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_shard_worker, s["locations"], today, run_ts, out_dir) for s in shards
+            ]
+            results = [f.result() for f in futures]
+        for r in results:
+            for name, n in r["counters"].items():
+                count(name, n)
+
+    summary_rows = [row for r in results for row in r["summary_rows"]]
+    reviews_rows_all = [row for r in results for row in r["reviews_rows"]]
+
+    # The index, summary.csv, archive and roll-up Summary are fleet-wide; a --shard rerun
+    # of one shard out of several only has its own locations, so it leaves them as the full
+    # run wrote them
+    fleet = shard is None or len(REGISTRY.shards) == 1
+
+    if fleet:
+        with span("report.finish"):
+            write_report_index(out_dir, summary_rows)
 
     # Write CSV summary
-    if summary_rows:
+    if summary_rows and fleet:
         csv_path = os.path.join(out_dir, "summary.csv")
         with open(csv_path, "w", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=list(summary_rows[0].keys()))
             writer.writeheader()
             writer.writerows(summary_rows)
         print(f"\n✅ Saved CSV + Markdown reports in: {out_dir}")
-
-    # Upload to Google Sheets
-        upload_to_google_sheets(csv_path, worksheet_name="Google Reviews Data")
-    # Write detailed reviews to a separate worksheet
-        upsert_reviews_to_sheet(reviews_rows_all, worksheet_name="Reviews (raw)")
+        with span("archive.summary"):
+            backfilled = archive_run(summary_rows)
+        if backfilled:
+            print(f"ℹ️ Backfilled {backfilled} older summary row(s) into the archive")
+    elif summary_rows:
+        print(f"\n✅ Saved Markdown reports for shard '{shard}' in: {out_dir}")
+
+    # Upload to Google Sheets: raw reviews (+ shard summary) to each shard's workbook,
+    # the fleet-wide summary to the roll-up — one batched write per spreadsheet
+    if summary_rows:
+        sinks = {}
+        for s, r in zip(shards, results):
+            sink = sinks.setdefault(s["sheet_id"], SheetsSink(s["sheet_id"]))
+            sink.add_reviews(r["reviews_rows"])
+            if s["sheet_id"] != REGISTRY.rollup_sheet_id:
+                sink.add_summary(r["summary_rows"])
+        if fleet:
+            sinks.setdefault(REGISTRY.rollup_sheet_id, SheetsSink(REGISTRY.rollup_sheet_id)).add_summary(summary_rows)
+        for sink in sinks.values():
+            sink.flush()
+
+    # Hand the new reviews to the sentiment pipeline without a Sheets round-trip
+    with span("spool.append"):
+        spooled = ReviewSpool().append([{**r, "dedupe_key": dedupe_key(r)} for r in reviews_rows_all])
+    if spooled:
+        print(f"📥 Spooled {spooled} new review(s) for sentiment analysis")
+
+    # Record this run's rating + count + watermark (append-only) only now that the reviews
+    # past the old watermark are safely on the sheet and in the spool — if either step
+    # raised, the next run starts from the old watermark and fetches them again
+    for pid, avg_rating, review_count, watermark in (row for r in results for row in r["history_rows"]):
+        history.append(pid, avg_rating, review_count, run_ts=run_ts, watermark=watermark)
+    with span("state.save"):
+        history.save_index()
+
+    # Slack last: a slow webhook can't hold up the data pipeline
+    if SLACK_WEBHOOK:
+        slack = SlackQueue(SLACK_WEBHOOK)
+        for text in (t for r in results for t in r["slack"]):
+            slack.add(text)
+        sent, failed = slack.flush()
+        print(f"📨 Slack: {sent} payload(s) sent" + (f", {failed} failed" if failed else ""))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Weekly Google Reviews fetcher")
+    parser.add_argument("--shard", help="run only this shard from locations.json")
+    parser.add_argument("--workers", type=int, help="worker processes when running several shards")
+    args = parser.parse_args()
+    try:
+        main(shard=args.shard, workers=args.workers)
+    finally:
+        # Timing/counter profile lands next to this run's reports
+        write_profile(os.path.join("reports", datetime.date.today().isoformat()))
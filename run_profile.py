@@ -0,0 +1,126 @@
+"""
+Lightweight per-stage timing and counters for the weekly fetcher (reviews.py)
+and the sentiment pipeline (sentiment-analysis/main.py).
+
+    from run_profile import count, span, traced
+
+    with span("fetch", place=name):
+        ...
+        count("http.calls")
+        count("http.bytes", len(r.content))
+
+    @traced("sheets.write_reviews")
+    def write_reviews(...): ...
+
+At the end of a run, write_profile(folder) drops a machine-readable
+<name>.json (span totals, counters, every span with start/duration) into the
+run's reports/<date>/ folder, plus a Chrome trace (<name>.trace.json, open in
+chrome://tracing or Perfetto) when RUN_PROFILE_TRACE is set.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class RunProfile:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans: list[dict] = []
+        self.counters: dict[str, float] = defaultdict(float)
+
+    def _stack(self) -> list[str]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block. Nested spans record their parent so totals can be split by stage."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            dur = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "parent": parent,
+                    "start_s": round(start - self._t0, 6),
+                    "dur_s": round(dur, 6),
+                    "thread": threading.get_ident(),
+                    "attrs": attrs,
+                })
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def traced(self, name: str):
+        """Decorator form of span()."""
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def summary(self) -> dict:
+        totals: dict[str, dict] = {}
+        for s in self.spans:
+            t = totals.setdefault(s["name"], {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            t["count"] += 1
+            t["total_s"] = round(t["total_s"] + s["dur_s"], 6)
+            t["max_s"] = max(t["max_s"], s["dur_s"])
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "wall_s": round(time.perf_counter() - self._t0, 3),
+            "span_totals": dict(sorted(totals.items(), key=lambda kv: -kv[1]["total_s"])),
+            "counters": dict(sorted(self.counters.items())),
+            "spans": self.spans,
+        }
+
+    def chrome_trace(self) -> dict:
+        events = [
+            {
+                "name": s["name"], "ph": "X", "pid": os.getpid(), "tid": s["thread"],
+                "ts": int(s["start_s"] * 1e6), "dur": int(s["dur_s"] * 1e6),
+                "args": {k: str(v) for k, v in s["attrs"].items()},
+            }
+            for s in self.spans
+        ]
+        events += [
+            {"name": name, "ph": "C", "pid": os.getpid(), "ts": 0, "args": {"value": value}}
+            for name, value in self.counters.items()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, folder: str, name: str = "run_profile") -> str:
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        if os.getenv("RUN_PROFILE_TRACE"):
+            with open(os.path.join(folder, f"{name}.trace.json"), "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f)
+        return path
+
+
+# One profile per process — both entry points are single-run CLIs.
+profile = RunProfile()
+span = profile.span
+count = profile.count
+traced = profile.traced
+write_profile = profile.write
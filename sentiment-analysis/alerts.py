@@ -0,0 +1,131 @@
+"""
+Priority scheduling of LLM batches and early delivery of urgent callouts.
+
+Reviews that are likely to need ops follow-up (low stars, damage and billing
+words, negative lexicon hits) are sent to Gemini first, in their own smaller
+batches (URGENT_BATCH_SIZE). CalloutStream.emit() then pushes every needs_ops_followup review from a
+batch as soon as that batch returns. Callouts go to a local JSONL sink
+(reports/<date>/urgent_callouts.jsonl) and, when SLACK_URGENT_WEBHOOK_URL (or
+SLACK_WEBHOOK_URL) is set, to Slack. Nobody has to wait for the last batch and
+the dashboard write. Each delivery is an "alerts.emit" span, so the run profile
+shows the time-to-alert.
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from config import URGENT_BATCH_SIZE
+from lexicon import NEG_WORDS, tokenize  # repo root, on sys.path via config
+from models import Review
+from run_profile import count, span
+
+logger = logging.getLogger(__name__)
+
+# Vehicle damage, billing and safety words: the complaints ops wants to hear about first
+URGENT_WORDS = set("""
+damage damaged scratch scratched scratches dent dented broke broken mirror mirrors wiper wipers antenna
+charged charge billing billed bill refund cancel cancelled canceled overcharged unauthorized
+unsafe injured hurt accident
+""".split())
+
+
+def urgency(review: Review) -> int:
+    """Higher for reviews more likely to be flagged needs_ops_followup."""
+    tokens = tokenize(review.text)
+    return (
+        3 * sum(t in URGENT_WORDS for t in tokens)
+        + sum(t in NEG_WORDS for t in tokens)
+        + 2 * max(0, 3 - review.star_rating)
+    )
+
+
+def plan_batches(
+    reviews: list[Review], batch_size: int, urgent_batch_size: int = URGENT_BATCH_SIZE,
+) -> list[list[Review]]:
+    """Batches in dispatch order: likely-urgent reviews first (most urgent at the front)
+    in batches of their own of at most urgent_batch_size, then the rest in their
+    original order in batches of batch_size."""
+    scores = [urgency(r) for r in reviews]
+    order = sorted(range(len(reviews)), key=lambda i: -scores[i])  # stable: ties keep input order
+    urgent = [reviews[i] for i in order if scores[i] > 0]
+    rest = [r for r, s in zip(reviews, scores) if s == 0]
+    urgent_batch_size = min(urgent_batch_size, batch_size)
+    return [
+        group[i : i + size]
+        for group, size in ((urgent, urgent_batch_size), (rest, batch_size))
+        for i in range(0, len(group), size)
+    ]
+
+
+def _callout(analysis: dict) -> dict:
+    rid = analysis.get("review_id", "")
+    neg = analysis.get("negative_aspects") or []
+    return {
+        "location": analysis.get("location", ""),
+        "dedupe_key": rid,
+        "review_date": rid.split("|")[-1][:10] if "|" in rid else "",
+        "star_rating": analysis.get("star_rating", ""),
+        "themes": analysis.get("themes", []),
+        "description": neg[0] if neg else "Operational issue flagged",
+        "quote": analysis.get("representative_quote") or "",
+    }
+
+
+def _slack_text(c: dict) -> str:
+    text = f"🚨 *Urgent — {c['location']}* ({c['star_rating']}★, {c['review_date'] or 'no date'})\n{c['description']}"
+    if c["themes"]:
+        text += f"\n`{', '.join(c['themes'])}`"
+    if c["quote"]:
+        text += f"\n> {c['quote']}"
+    return text
+
+
+class CalloutStream:
+    """Delivers urgent callouts batch by batch. sink_path=None and no webhook just logs them."""
+
+    def __init__(self, sink_path: Path | None = None, webhook_url: str | None = None) -> None:
+        self.sink_path = sink_path
+        self.webhook_url = webhook_url
+        self.sent: set[str] = set()
+        self._t0 = time.perf_counter()
+
+    @classmethod
+    def for_run(cls, folder: Path, dry_run: bool = False) -> "CalloutStream":
+        if dry_run:
+            return cls()
+        webhook = os.getenv("SLACK_URGENT_WEBHOOK_URL") or os.getenv("SLACK_WEBHOOK_URL")
+        return cls(folder / "urgent_callouts.jsonl", webhook)
+
+    def emit(self, analyses: list[dict]) -> int:
+        """Deliver callouts for this batch's needs_ops_followup reviews (each review at most once)."""
+        callouts = []
+        for a in analyses:
+            rid = a.get("review_id", "")
+            if a.get("needs_ops_followup") and rid not in self.sent:
+                self.sent.add(rid)
+                callouts.append(_callout(a))
+        if not callouts:
+            return 0
+
+        elapsed = time.perf_counter() - self._t0
+        with span("alerts.emit", callouts=len(callouts)):
+            if self.sink_path is not None:
+                self.sink_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.sink_path.open("a", encoding="utf-8") as f:
+                    for c in callouts:
+                        f.write(json.dumps({**c, "alerted_after_s": round(elapsed, 1)}, ensure_ascii=False) + "\n")
+            if self.webhook_url:
+                from slack_queue import SlackQueue
+
+                slack = SlackQueue(self.webhook_url)
+                for c in callouts:
+                    slack.add(_slack_text(c))
+                sent, failed = slack.flush()
+                if failed:
+                    logger.warning("Urgent callouts: %d Slack payload(s) failed", failed)
+        count("alerts.callouts", len(callouts))
+        logger.info("🚨 %d urgent callout(s) delivered %.1fs into the run", len(callouts), elapsed)
+        return len(callouts)
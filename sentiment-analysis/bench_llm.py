@@ -0,0 +1,206 @@
+"""
+Offline LLM throughput benchmark — drives llm.analyze_batch (and through it the
+429 backoff and truncation-splitting retry paths) against fake_genai, so batch
+size, prompt caching and retry policy can be tuned without spending Vertex quota.
+
+The locked prompt's fixed instructions are below Vertex's minimum context cache
+size, so real runs never cache them. --min-cache-tokens lowers the minimum on
+both sides to see what caching would save for a longer prompt.
+
+Usage:
+    python bench_llm.py                                   # default sweep
+    python bench_llm.py --reviews 1500 --batch-sizes 25,75,150 --truncate-above 100
+    python bench_llm.py --tpm 250000 --rate-429 0.05 --json
+    python bench_llm.py --check                           # assert llm.py's retry/caching behaviour
+
+Times are simulated (virtual clock): latency, generation time and every
+time.sleep() in the retry path advance the clock instead of blocking.
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from unittest import mock
+
+import llm
+from fake_genai import FakeClock, FakeGeminiClient, FakeGeminiConfig
+from models import Review
+
+_LOCATIONS = [
+    "Pleasant View", "Layton", "Kearns", "West Valley", "Murray", "Draper", "Cedar Hills",
+    "Lehi", "Provo", "Mechanicsburg", "Lemoyne", "Lower Paxton", "Linglestown", "Lebanon",
+    "Selinsgrove", "West Manchester", "Mt. Airy", "Clinton", "Middle River",
+]
+_PHRASES = [
+    "Great wash, friendly staff!", "The vacuums were broken again.",
+    "Manager fixed the billing problem on my membership quickly.",
+    "Left streaks all over the back window and the dryer missed half the car.",
+    "Love the members lounge and the free drinks.", "Long wait at the kiosk.",
+]
+
+
+def synthetic_reviews(n: int, seed: int = 0) -> list[Review]:
+    rng = random.Random(seed)
+    reviews = []
+    for i in range(n):
+        text = " ".join(rng.choice(_PHRASES) for _ in range(rng.randint(1, 5)))
+        reviews.append(Review(
+            dedupe_key=f"bench{i}",
+            place=rng.choice(_LOCATIONS),
+            place_id="",
+            author=f"Reviewer {i}",
+            star_rating=rng.choice([5, 5, 5, 5, 4, 3, 2, 1]),
+            publish_time=f"2026-03-{1 + i % 28:02d}T12:00:00Z",
+            relative_time="",
+            text=text,
+            date_run="2026-04-01",
+        ))
+    return reviews
+
+
+def run_config(reviews: list[Review], batch_size: int, prompt_cache: bool, cfg: FakeGeminiConfig) -> dict:
+    """One benchmark pass; llm.py's minimum cache size follows cfg.min_cache_tokens."""
+    clock = FakeClock()
+    client = FakeGeminiClient(cfg, clock)
+    attempts = {"n": 0}
+    real_analyze = llm._analyze_with_retry
+
+    def counting_analyze(c, batch):
+        attempts["n"] += 1
+        return real_analyze(c, batch)
+
+    llm._prefix_caches.clear()
+    started = time.perf_counter()
+    with mock.patch.object(llm.genai, "Client", lambda **_: client), \
+            mock.patch.object(llm, "vertex_credentials", lambda: None), \
+            mock.patch.object(llm.time, "sleep", clock.sleep), \
+            mock.patch.object(llm, "_analyze_with_retry", counting_analyze), \
+            mock.patch.object(llm, "PROMPT_CACHE_TTL_S", 3600 if prompt_cache else 0), \
+            mock.patch.object(llm, "PROMPT_CACHE_MIN_TOKENS", cfg.min_cache_tokens):
+        analyzed = 0
+        batches = 0
+        for i in range(0, len(reviews), batch_size):
+            result = llm.analyze_batch(reviews[i : i + batch_size], "bench", "local")
+            analyzed += len(result.get("reviews", []))
+            batches += 1
+    wall = time.perf_counter() - started
+
+    s = client.stats
+    return {
+        "batch_size": batch_size,
+        "prompt_cache": prompt_cache,
+        "reviews": analyzed,
+        "calls": s.calls,
+        "input_tokens": s.input_tokens,
+        "cached_tokens": s.cached_tokens,
+        "output_tokens": s.output_tokens,
+        "retries_429": s.errors_429,
+        "splits": attempts["n"] - batches,
+        "caches_created": s.caches_created,
+        "cache_misses": s.cache_misses,
+        "sim_seconds": round(clock.now, 1),
+        "wall_ms": round(wall * 1000, 1),
+    }
+
+
+def check() -> None:
+    """Assertions for llm.py against the stand-in: prefix caching and its fallback,
+    429 backoff, truncation splitting, and the prompt codec round trip."""
+    reviews = synthetic_reviews(300)
+    expected_ids = {llm.make_review_id(r) for r in reviews}
+
+    # The real prefix is below the minimum cache size: no create call, nothing cached
+    r = run_config(reviews, 50, True, FakeGeminiConfig(latency_s=1))
+    assert (r["reviews"], r["calls"], r["caches_created"], r["cached_tokens"]) == (300, 6, 0, 0), r
+
+    # If the size check is bypassed, the undersized create is rejected and the run falls back
+    llm._prefix_caches.clear()
+    with mock.patch.object(llm, "PROMPT_CACHE_MIN_TOKENS", 0):
+        assert llm._cached_prefix(FakeGeminiClient(FakeGeminiConfig(latency_s=0))) is None
+    assert llm._prefix_caches[llm.GEMINI_MODEL] is None
+
+    # With a minimum the prefix clears, one cache serves every batch
+    small = {"latency_s": 1, "min_cache_tokens": 100}
+    r = run_config(reviews, 50, True, FakeGeminiConfig(**small))
+    assert (r["reviews"], r["calls"], r["caches_created"]) == (300, 6, 1), r
+    assert r["cached_tokens"] > 0 and r["cache_misses"] == 0, r
+
+    # Vertex evicts the cache long before its ttl: the rejected batch is resent with the
+    # prefix inlined, the next one creates a fresh cache, and nothing fails
+    r = run_config(reviews, 50, True, FakeGeminiConfig(**{**small, "latency_s": 30}, cache_lifetime_s=60))
+    assert r["reviews"] == 300 and r["cache_misses"] > 0, r
+    assert r["caches_created"] > 1 and r["calls"] == 6 + r["cache_misses"], r
+
+    r = run_config(reviews, 25, False, FakeGeminiConfig(latency_s=1, rate_429=0.3))
+    assert r["reviews"] == 300 and r["retries_429"] > 0 and r["sim_seconds"] >= 60 * r["retries_429"], r
+
+    r = run_config(reviews, 75, False, FakeGeminiConfig(latency_s=1, truncate_above=40))
+    assert r["reviews"] == 300 and r["splits"] == 8, r
+
+    for short_codes in (True, False):
+        codec = llm._PromptCodec(reviews[:40], short_codes=short_codes)
+        text = FakeGeminiClient(FakeGeminiConfig(latency_s=0)).models.generate_content(
+            llm.GEMINI_MODEL, codec.encode(),
+        ).text
+        decoded = codec.decode(text)
+        assert {a["review_id"] for a in decoded["reviews"]} == {llm.make_review_id(x) for x in reviews[:40]}
+        assert {a["location"] for a in decoded["reviews"]} == {x.place for x in reviews[:40]}
+        assert set(decoded["summary"]["by_location"]) == {x.place for x in reviews[:40]}
+    assert len(expected_ids) == 300
+    print("bench_llm checks passed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmark for llm.analyze_batch")
+    parser.add_argument("--reviews", type=int, default=600)
+    parser.add_argument("--batch-sizes", default="25,50,75,150")
+    parser.add_argument("--latency", type=float, default=2.0, help="fixed seconds per call")
+    parser.add_argument("--tpm", type=int, default=0, help="input tokens per minute before 429 (0 = unlimited)")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-truncate", type=float, default=0.0)
+    parser.add_argument("--truncate-above", type=int, default=139,
+                        help="batches above this size always truncate (March 2026 broke at 139)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-cache-tokens", type=int, default=FakeGeminiConfig.min_cache_tokens,
+                        help="smallest cacheable prefix, in tokens (Vertex: 2048)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per configuration")
+    parser.add_argument("--verbose", action="store_true", help="show llm.py retry/truncation logging")
+    parser.add_argument("--check", action="store_true", help="run the assertions in check() and exit")
+    args = parser.parse_args()
+
+    # Injected truncations and 429s are expected here — the counters report them
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+    if args.check:
+        check()
+        return
+
+    reviews = synthetic_reviews(args.reviews, args.seed)
+    results = []
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        for prompt_cache in (False, True):
+            cfg = FakeGeminiConfig(
+                latency_s=args.latency,
+                tokens_per_minute=args.tpm,
+                rate_429=args.rate_429,
+                rate_truncate=args.rate_truncate,
+                truncate_above=args.truncate_above,
+                min_cache_tokens=args.min_cache_tokens,
+                seed=args.seed,
+            )
+            results.append(run_config(reviews, batch_size, prompt_cache, cfg))
+
+    if args.json:
+        for r in results:
+            print(json.dumps(r))
+        return
+
+    cols = list(results[0])
+    print("  ".join(f"{c:>13}" for c in cols))
+    for r in results:
+        print("  ".join(f"{str(r[c]):>13}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
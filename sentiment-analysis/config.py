@@ -1,4 +1,24 @@
-SHEET_ID = "1rAMV-_Xh2Q8wpgAJWzgzYbHu96UO9NmsD1xGHr2Xz1E"
+import sys
+from pathlib import Path
+
+# Modules shared with the weekly fetcher (reviews.py) live at the repo root.
+REPO_ROOT = Path(__file__).parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
+
+# Run profiles are written next to the weekly job's reports/<date>/ folders.
+REPORTS_DIR = REPO_ROOT / "reports"
+
+# reviews.py appends each week's new reviews here; --mode ingest reads past this consumer's offset.
+SPOOL_DIR = REPO_ROOT / "spool" / "reviews"
+SPOOL_CONSUMER = "sentiment"
+
+from location_registry import LocationRegistry  # importable now that REPO_ROOT is on sys.path
+
+# Sentiment tabs live in the roll-up workbook; raw reviews are spread over the shard workbooks.
+_REGISTRY = LocationRegistry()
+SHEET_ID = _REGISTRY.rollup_sheet_id
+RAW_SHEET_IDS = _REGISTRY.sheet_ids()
 
 RAW_REVIEWS_TAB = "Reviews (raw)"
 SENTIMENT_CURRENT_TAB = "Sentiment - Current"
@@ -7,6 +27,11 @@ THEMES_LIBRARY_TAB = "Themes Library"
 SENTIMENT_REVIEWS_TAB = "Sentiment - Reviews"
 THEME_BREAKDOWN_TAB = "Theme Sentiment Breakdown"
 DASHBOARD_TAB = "Dashboard"
+AGGREGATE_CUBE_TAB = "Sentiment - Cube"  # hidden; the persisted aggregate cube's cells (no review_ids)
+
+# "values" writes precomputed counts to the Theme Sentiment Breakdown tab (fast to open);
+# "formulas" writes live COUNTIFS against Sentiment - Reviews (slow to recalc as the tab grows).
+THEME_BREAKDOWN_MODE = "values"
 
 LOCATION_HOTSPOT_MIN = 3  # min negative/mixed reviews on same theme at one location to surface on dashboard
 
@@ -17,6 +42,38 @@ GEMINI_MODEL = "gemini-2.5-flash-lite"
 # 75 reviews per batch keeps the JSON response well under the 65k output token limit.
 # March 2026 at 139 reviews hit the truncation threshold; 75 gives a comfortable margin.
 BATCH_SIZE = 75
+# Likely-urgent reviews go first in smaller batches, so their callouts arrive sooner (alerts.py)
+URGENT_BATCH_SIZE = 15
+
+# Seconds to keep the fixed prompt instructions in Vertex context cache between batches.
+# 0 disables caching and sends the full prompt every call.
+PROMPT_CACHE_TTL_S = 3600
+# Vertex rejects explicit context caches smaller than this (2,048 tokens for the Gemini 2.x
+# models). The locked prompt's instructions are well under it, so they are sent inline.
+PROMPT_CACHE_MIN_TOKENS = 2048
+
+# Send review lines with short location codes (L1..Ln + legend) and review ids (r1..rn)
+# instead of the v2 prompt's full names and ids. The instructions text is unchanged, but
+# this is still a change to the locked prompt's input, so it stays off until Kate signs off;
+# False sends the exact v2 review-line format.
+PROMPT_SHORT_CODES = False
+
+# Short, clearly positive 5-star reviews are classified by fastpath.py instead of Gemini,
+# but only while its labels agree with Gemini's on at least FASTPATH_MIN_AGREEMENT of the
+# last FASTPATH_MIN_SAMPLES or so reviews Gemini labelled. False sends everything to Gemini.
+FASTPATH_ENABLED = True
+FASTPATH_MAX_WORDS = 12
+FASTPATH_MIN_AGREEMENT = 0.95
+FASTPATH_MIN_SAMPLES = 30
+# ...and while at least this share of the themes it assigns are ones Gemini also tagged
+FASTPATH_MIN_THEME_PRECISION = 0.9
+# Share of fast-path candidates sent to Gemini anyway while the fast path is on, so its
+# calibration keeps getting fresh labels to compare against
+FASTPATH_HOLDOUT = 0.1
+
+# Estimated Jaccard similarity (MinHash over normalized text) at which a new review reuses
+# the analysis of an already-analyzed near-duplicate with the same star rating (near_dup.py).
+NEAR_DUP_THRESHOLD = 0.85
 
 BASELINE_START = "2025-10-01"
 
@@ -37,3 +94,6 @@ APPROVED_THEMES = [
     "general_positive",
     "general_negative",
 ]
+
+# Local run-to-run state (aggregates, caches). Ephemeral on CI, persistent on a dev box.
+CACHE_DIR = Path(__file__).parent / ".cache"
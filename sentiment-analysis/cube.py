@@ -0,0 +1,193 @@
+"""
+Location × theme × sentiment × month aggregate cube.
+
+Each cell holds a review count plus star and sentiment-score sums, so per-location
+averages, theme leanings and month slices for any period come from O(cells) work
+instead of rescanning per-review dicts. Reviews are folded in incrementally and
+keyed by review_id, so re-adding an analysis that is already counted is a no-op.
+
+Only the cells are persisted (to_rows/from_rows, stored in a hidden sheet tab) —
+no review_ids — so a loaded cube can't recognize reviews it already holds and
+callers must fold in only analyses that were newly stored.
+
+The theme dimension has one extra value, REVIEW_TOTAL (""), which every review
+contributes to exactly once — that is what review counts and averages read, since
+a review can carry any number of themes (including none).
+"""
+
+import logging
+import re
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+REVIEW_TOTAL = ""
+
+_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+# (location, theme, sentiment, month) -> [count, star_sum, score_sum]
+Cell = tuple[str, str, str, str]
+
+ROW_HEADERS = ["location", "theme", "sentiment", "month", "reviews", "star_sum", "score_sum"]
+
+
+def analysis_month(analysis: dict) -> str:
+    """YYYY-MM from the review_id's date suffix ("" when the review had no date)."""
+    rid = analysis.get("review_id", "")
+    month = rid.split("|")[-1][:7] if "|" in rid else ""
+    return month if _MONTH_RE.match(month) else ""
+
+
+class AggregateCube:
+    def __init__(self) -> None:
+        self.cells: dict[Cell, list[float]] = {}
+        self.review_ids: set[str] = set()
+
+    # ------------------------------------------------------------------ build
+
+    def add(self, analysis: dict) -> bool:
+        """Fold one review analysis into the cube. Returns False if already counted."""
+        rid = analysis.get("review_id", "")
+        if rid and rid in self.review_ids:
+            return False
+        if rid:
+            self.review_ids.add(rid)
+        self._fold(analysis)
+        return True
+
+    def _fold(self, analysis: dict, distinct_themes: bool = True) -> None:
+        loc = analysis.get("location", "Unknown")
+        sentiment = analysis.get("sentiment", "neutral")
+        month = analysis_month(analysis)
+        stars = float(analysis.get("star_rating", 0) or 0)
+        score = float(analysis.get("sentiment_score", 0) or 0)
+
+        # The stored-analyses cube counts reviews per theme, so a theme repeated within one review
+        # counts once there; run summaries have always counted every tag (see from_analyses).
+        themes = analysis.get("themes", [])
+        for theme in [REVIEW_TOTAL, *(dict.fromkeys(themes) if distinct_themes else themes)]:
+            cell = self.cells.setdefault((loc, theme, sentiment, month), [0, 0.0, 0.0])
+            cell[0] += 1
+            cell[1] += stars
+            cell[2] += score
+
+    def add_many(self, analyses) -> int:
+        """Fold in an iterable of analyses; returns how many were new."""
+        return sum(1 for a in analyses if self.add(a))
+
+    @classmethod
+    def from_analyses(cls, analyses) -> "AggregateCube":
+        """Transient cube over exactly these analyses — no review_id dedup, no persistence.
+        Like the run summary it feeds, it counts every theme tag, repeats included."""
+        cube = cls()
+        for a in analyses:
+            cube._fold(a, distinct_themes=False)
+        return cube
+
+    # ------------------------------------------------------------------ persistence
+
+    def to_rows(self) -> list[list]:
+        """Header plus one row per cell, sorted so rewrites of an unchanged cube match."""
+        return [ROW_HEADERS] + [
+            [*cell, int(vals[0]), round(vals[1], 4), round(vals[2], 4)]
+            for cell, vals in sorted(self.cells.items())
+        ]
+
+    @classmethod
+    def from_rows(cls, rows: list[list]) -> "AggregateCube":
+        """Inverse of to_rows. Rows without a count (blank padding) are skipped."""
+        cube = cls()
+        for row in rows[1:]:
+            if len(row) < len(ROW_HEADERS) or row[4] in ("", None):
+                continue
+            loc, theme, sentiment, month = (str(v) for v in row[:4])
+            cube.cells[(loc, theme, sentiment, month)] = [int(row[4]), float(row[5] or 0), float(row[6] or 0)]
+        return cube
+
+    # ------------------------------------------------------------------ query
+
+    def _select(self, start: str | None, end: str | None):
+        """Cells whose month falls in [start, end] (YYYY-MM, inclusive; None = open)."""
+        for (loc, theme, sentiment, month), vals in self.cells.items():
+            if start and month < start:
+                continue
+            if end and month > end:
+                continue
+            yield loc, theme, sentiment, month, vals
+
+    def location_stats(self, start: str | None = None, end: str | None = None) -> dict:
+        """Same shape as summary["by_location"]."""
+        totals: dict = defaultdict(lambda: [0, 0.0, 0.0])
+        themes: dict[str, Counter] = defaultdict(Counter)
+        for loc, theme, _, _, (count, stars, score) in self._select(start, end):
+            if theme == REVIEW_TOTAL:
+                t = totals[loc]
+                t[0] += count
+                t[1] += stars
+                t[2] += score
+            else:
+                themes[loc][theme] += count
+
+        by_location: dict = {}
+        for loc, (count, stars, score) in totals.items():
+            by_location[loc] = {
+                "review_count": count,
+                "average_star_rating": round(stars / count, 2) if count else 0,
+                "average_sentiment_score": round(score / count, 2) if count else 0,
+                "top_themes": [t for t, _ in themes[loc].most_common(5)],
+            }
+        return by_location
+
+    def theme_stats(self, start: str | None = None, end: str | None = None) -> list[dict]:
+        """Same shape as summary["overall_top_themes"]. Ties keep the summary's order:
+        locations in first-seen order, then themes in first-seen order within each."""
+        by_loc: dict[str, list] = defaultdict(list)
+        for loc, theme, sentiment, _, (count, _, _) in self._select(start, end):
+            cells = by_loc[loc]  # keyed on the location's first cell, themed or not
+            if theme != REVIEW_TOTAL:
+                cells.append((theme, sentiment, count))
+
+        counts: Counter = Counter()
+        pos: Counter = Counter()
+        neg: Counter = Counter()
+        for theme, sentiment, count in (cell for cells in by_loc.values() for cell in cells):
+            counts[theme] += count
+            if sentiment == "positive":
+                pos[theme] += count
+            elif sentiment == "negative":
+                neg[theme] += count
+
+        result = []
+        for theme, count in counts.most_common():
+            p, n = pos[theme], neg[theme]
+            leaning = "positive" if p > n else "negative" if n > p else "mixed"
+            result.append({"theme": theme, "count": count, "sentiment_leaning": leaning})
+        return result
+
+    def sentiment_counts(self, start: str | None = None, end: str | None = None) -> dict[tuple[str, str], Counter]:
+        """{(location, theme): Counter(sentiment -> reviews)}; the REVIEW_TOTAL theme
+        holds each location's whole sentiment split."""
+        counts: dict[tuple[str, str], Counter] = defaultdict(Counter)
+        for loc, theme, sentiment, _, (count, _, _) in self._select(start, end):
+            counts[(loc, theme)][sentiment] += int(count)
+        return dict(counts)
+
+    def review_count(self, start: str | None = None, end: str | None = None) -> int:
+        return sum(
+            int(vals[0]) for _, theme, _, _, vals in self._select(start, end) if theme == REVIEW_TOTAL
+        )
+
+    def theme_slices(self, sentiments: list[str]) -> dict[str, list[int]]:
+        """
+        {"<month>|<theme>": [count per sentiment]} plus an "ALL|<theme>" slice
+        per theme, in the column order given by sentiments.
+        """
+        slices: dict[str, list[int]] = {}
+        for _, theme, sentiment, month, (count, _, _) in self._select(None, None):
+            if theme == REVIEW_TOTAL or sentiment not in sentiments:
+                continue
+            col = sentiments.index(sentiment)
+            keys = [f"ALL|{theme}"] + ([f"{month}|{theme}"] if month else [])
+            for key in keys:
+                slices.setdefault(key, [0] * len(sentiments))[col] += int(count)
+        return slices
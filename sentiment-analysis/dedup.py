@@ -1,50 +1,89 @@
 import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
 from models import Review
 
 
+# Bounded, in-process only: one run's authors repeat across dedup and review_id calls,
+# and a memo persisted across runs would grow forever and cost about as much to load as NFKD.
+@lru_cache(maxsize=65536)
 def _normalize(name: str) -> str:
     nfkd = unicodedata.normalize("NFKD", name)
     return "".join(c for c in nfkd if not unicodedata.combining(c)).lower().strip()
 
 
+def _review_id(normalized_author: str, publish_time: str) -> str:
+    author = normalized_author.replace(" ", "_")[:20]
+    date = publish_time[:10] if publish_time else "nodate"
+    return f"{author}|{date}"
+
+
 def make_review_id(r: Review) -> str:
     """Stable composite identifier: normalized_author|publish_date.
     More unique than dedupe_key, which turns out to be the Google Place ID."""
-    author = _normalize(r.author).replace(" ", "_")[:20]
-    date = r.publish_time[:10] if r.publish_time else "nodate"
-    return f"{author}|{date}"
+    return _review_id(_normalize(r.author), r.publish_time)
 
 
-def dedup_reviews(reviews: list[Review]) -> tuple[list[Review], int]:
+@dataclass
+class DedupResult:
+    """Deduped reviews plus their review_ids, computed once per review.
+
+    ids[i] is the review_id of reviews[i]; by_id maps review_id -> Review
+    (last occurrence wins).
     """
-    Returns (deduped_reviews, duplicate_count).
+    reviews: list[Review]
+    ids: list[str]
+    dup_count: int
+    by_id: dict[str, Review]
+
+    def text_items(self) -> list[tuple[str, Review]]:
+        """(review_id, review) pairs for reviews with non-empty text."""
+        return [(rid, r) for rid, r in zip(self.ids, self.reviews) if r.text.strip()]
+
+
+def dedup_with_ids(reviews: list[Review]) -> DedupResult:
+    """
+    Single pass over the reviews: the author is normalized once and reused for
+    both the dedup key and the review_id.
 
     Two separate dedup strategies:
     - Empty-text reviews: key on author+location+date because all empty reviews
       share the same SHA-1 dedupe_key (hash of empty string).
     - Text reviews: key on normalized author+location+date+first-50-chars to catch
       the same review posted twice with minor variations (e.g. accent differences).
+
+    Near-duplicates that survive this (cross-posts, templates, edits) are matched
+    later by near_dup.NearDupIndex, which reuses their analysis instead of dropping them.
     """
     seen: set[tuple] = set()
     result: list[Review] = []
+    ids: list[str] = []
+    by_id: dict[str, Review] = {}
     dup_count = 0
 
     for r in reviews:
-        if not r.text.strip():
-            key = ("empty", _normalize(r.author), r.place.lower(), r.publish_time[:10])
+        author = _normalize(r.author)
+        text = r.text.strip()
+        day = r.publish_time[:10]
+        if not text:
+            key = ("empty", author, r.place.lower(), day)
         else:
-            key = (
-                "text",
-                _normalize(r.author),
-                r.place.lower(),
-                r.publish_time[:10],
-                r.text.strip()[:50].lower(),
-            )
+            key = ("text", author, r.place.lower(), day, text[:50].lower())
 
         if key in seen:
             dup_count += 1
             continue
         seen.add(key)
+        rid = _review_id(author, r.publish_time)
         result.append(r)
+        ids.append(rid)
+        by_id[rid] = r
 
-    return result, dup_count
+    return DedupResult(reviews=result, ids=ids, dup_count=dup_count, by_id=by_id)
+
+
+def dedup_reviews(reviews: list[Review]) -> tuple[list[Review], int]:
+    """Returns (deduped_reviews, duplicate_count). See dedup_with_ids for the key rules."""
+    deduped = dedup_with_ids(reviews)
+    return deduped.reviews, deduped.dup_count
@@ -0,0 +1,212 @@
+"""
+Local stand-in for the slice of the google-genai client that llm.py uses:
+client.models.generate_content(...) and client.caches.create(...).
+
+It answers batch prompts with analysis JSON in response_schema.RESPONSE_SCHEMA's
+shape, built from the review lines in the prompt, and can be configured to behave like a busy Vertex endpoint:
+per-call latency, a tokens-per-minute budget that answers 429 when exceeded,
+random 429s, truncated JSON for oversized or unlucky batches, cached contents
+below the minimum cache size (answered with 400 like Vertex), and cached
+contents that expire early (answered with 404 like an evicted Vertex cache). Time is virtual
+(FakeClock) so a benchmark can simulate hours of backoff in milliseconds.
+"""
+
+import json
+import random
+import re
+from dataclasses import dataclass, field
+
+from google.genai import errors as genai_errors
+
+_REVIEW_LINE_RE = re.compile(
+    r"^(\d+)\. Location: (.*?) \| Author: (.*?) \| Stars: (\d+) \| dedupe_key: (\S+)$", re.M
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token — close enough for relative comparisons."""
+    return max(1, len(text) // 4)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@dataclass
+class FakeGeminiConfig:
+    latency_s: float = 2.0                # fixed per-call latency
+    output_tokens_per_s: float = 400.0    # generation speed, added on top of latency_s
+    tokens_per_minute: int = 0            # 0 = unlimited; else rolling input-token budget
+    rate_429: float = 0.0                 # probability any call answers 429
+    rate_truncate: float = 0.0            # probability a batch response is cut mid-JSON
+    truncate_above: int = 0               # batches larger than this always truncate (0 = never)
+    cache_lifetime_s: float = 0.0         # >0: cached contents vanish this soon, whatever ttl was asked
+    min_cache_tokens: int = 2048          # caches.create rejects smaller contents, as Vertex does
+    seed: int = 0
+
+
+@dataclass
+class FakeGeminiStats:
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    errors_429: int = 0
+    truncations: int = 0
+    caches_created: int = 0
+    cache_misses: int = 0                 # calls naming an expired or unknown cache
+    window: list = field(default_factory=list)  # (time, tokens) for the TPM budget
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _CachedContent:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def _rate_limited() -> genai_errors.ClientError:
+    return genai_errors.ClientError(
+        429, {"error": {"code": 429, "message": "Resource exhausted (fake)", "status": "RESOURCE_EXHAUSTED"}}
+    )
+
+
+def _cache_too_small(tokens: int, minimum: int) -> genai_errors.ClientError:
+    return genai_errors.ClientError(400, {"error": {
+        "code": 400, "status": "INVALID_ARGUMENT",
+        "message": f"Cached content is too small: {tokens} tokens, minimum is {minimum} (fake)",
+    }})
+
+
+def _cache_not_found(name: str) -> genai_errors.ClientError:
+    return genai_errors.ClientError(
+        404, {"error": {"code": 404, "message": f"Cached content {name} not found (fake)", "status": "NOT_FOUND"}}
+    )
+
+
+class _Models:
+    def __init__(self, client: "FakeGeminiClient") -> None:
+        self._c = client
+
+    def generate_content(self, model: str, contents, config=None) -> _Response:
+        c = self._c
+        prompt = contents if isinstance(contents, str) else "".join(map(str, contents))
+        cache_name = getattr(config, "cached_content", None)
+        cached = c.cache_tokens.get(cache_name, 0) if cache_name else 0
+        in_tokens = estimate_tokens(prompt)
+
+        c.stats.calls += 1
+        c.clock.sleep(c.cfg.latency_s)
+
+        if cache_name and c.cache_expiry.get(cache_name, 0) <= c.clock.now:
+            c.stats.cache_misses += 1
+            raise _cache_not_found(cache_name)
+
+        if c.cfg.tokens_per_minute:
+            c.stats.window = [(t, n) for t, n in c.stats.window if t > c.clock.now - 60]
+            if sum(n for _, n in c.stats.window) + in_tokens + cached > c.cfg.tokens_per_minute:
+                c.stats.errors_429 += 1
+                raise _rate_limited()
+            c.stats.window.append((c.clock.now, in_tokens + cached))
+        if c.rng.random() < c.cfg.rate_429:
+            c.stats.errors_429 += 1
+            raise _rate_limited()
+
+        c.stats.input_tokens += in_tokens
+        c.stats.cached_tokens += cached
+
+        reviews = _REVIEW_LINE_RE.findall(prompt)
+        text = json.dumps(_fake_analysis(reviews)) if reviews else json.dumps(
+            {"top_positive_drivers": "Fake positive drivers.", "top_negative_drivers": "Fake negative drivers."}
+        )
+        if reviews and (
+            (c.cfg.truncate_above and len(reviews) > c.cfg.truncate_above)
+            or c.rng.random() < c.cfg.rate_truncate
+        ):
+            c.stats.truncations += 1
+            text = text[: len(text) // 2]
+
+        out_tokens = estimate_tokens(text)
+        c.stats.output_tokens += out_tokens
+        c.clock.sleep(out_tokens / c.cfg.output_tokens_per_s)
+        return _Response(text)
+
+
+class _Caches:
+    def __init__(self, client: "FakeGeminiClient") -> None:
+        self._c = client
+
+    def create(self, model: str, config=None) -> _CachedContent:
+        c = self._c
+        contents = getattr(config, "contents", None) or []
+        tokens = sum(estimate_tokens(str(x)) for x in contents)
+        if tokens < c.cfg.min_cache_tokens:
+            raise _cache_too_small(tokens, c.cfg.min_cache_tokens)
+        c.stats.caches_created += 1
+        name = f"cachedContents/fake-{c.stats.caches_created}"
+        c.cache_tokens[name] = tokens
+        ttl = float(str(getattr(config, "ttl", None) or "3600s").rstrip("s"))
+        c.cache_expiry[name] = c.clock.now + (c.cfg.cache_lifetime_s or ttl)
+        return _CachedContent(name)
+
+
+class FakeGeminiClient:
+    def __init__(self, cfg: FakeGeminiConfig | None = None, clock: FakeClock | None = None) -> None:
+        self.cfg = cfg or FakeGeminiConfig()
+        self.clock = clock or FakeClock()
+        self.rng = random.Random(self.cfg.seed)
+        self.stats = FakeGeminiStats()
+        self.cache_tokens: dict[str, int] = {}
+        self.cache_expiry: dict[str, float] = {}
+        self.models = _Models(self)
+        self.caches = _Caches(self)
+
+
+def _fake_analysis(review_lines: list[tuple]) -> dict:
+    per_review = []
+    for _, location, _, stars, review_id in review_lines:
+        stars = int(stars)
+        sentiment = "positive" if stars >= 4 else "negative" if stars <= 2 else "mixed"
+        per_review.append({
+            "review_id": review_id,
+            "location": location,
+            "star_rating": stars,
+            "sentiment": sentiment,
+            "sentiment_score": round((stars - 3) / 2, 2),
+            "themes": ["general_positive" if stars >= 4 else "general_negative"],
+            "positive_aspects": [],
+            "negative_aspects": [] if stars >= 3 else ["fake complaint"],
+            "staff_mentioned": [],
+            "representative_quote": "fake quote",
+            "needs_ops_followup": stars == 1,
+        })
+    by_location = [
+        {
+            "location": loc,
+            "review_count": len(rs),
+            "average_star_rating": round(sum(r["star_rating"] for r in rs) / len(rs), 2),
+            "average_sentiment_score": round(sum(r["sentiment_score"] for r in rs) / len(rs), 2),
+            "top_themes": sorted({t for r in rs for t in r["themes"]}),
+        }
+        for loc in sorted({r["location"] for r in per_review})
+        for rs in [[r for r in per_review if r["location"] == loc]]
+    ]
+    return {
+        "reviews": per_review,
+        "summary": {
+            "total_reviews": len(per_review),
+            "by_location": by_location,
+            "overall_top_themes": [],
+            "top_positive_drivers": "Fake positive drivers.",
+            "top_negative_drivers": "Fake negative drivers.",
+            "staff_to_recognize": [],
+            "urgent_callouts": [],
+        },
+    }
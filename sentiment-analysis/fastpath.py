@@ -0,0 +1,245 @@
+"""
+Deterministic fast path for trivial reviews.
+
+Most reviews are short 5-star one-liners like "Great wash, friendly staff!", and
+Gemini labels them the same way every time. classify_trivial() scores each new
+review with the fetcher's lexicon (lexicon.py) and a few rules. Only confident
+cases get their analysis built here, in the same dict shape analyze_batch
+returns. Anything that is not 5 stars, is long, has a negative or hedging word,
+or might name an employee still goes to Gemini.
+
+The rules are checked against Gemini on every run. recalibrate() compares the
+run's fresh Gemini labels with what the fast path *would* have said for the
+reviews it accepts: all of them while the fast path is off, and a random
+FASTPATH_HOLDOUT share of its candidates while it is on. Each run's comparison
+is blended into the stored one as a rolling window of about
+FASTPATH_MIN_SAMPLES reviews, so an old calibration can't stand forever. The
+fast path stays on only while they agree often enough (FASTPATH_MIN_AGREEMENT)
+and while enough of its keyword themes are ones Gemini also tagged
+(FASTPATH_MIN_THEME_PRECISION). The result is stored in reports/ so the weekly
+job commits it. Fast-path analyses carry "fast_path": True, which
+Sentiment - Reviews keeps in its own column.
+"""
+
+import json
+import logging
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import (
+    APPROVED_THEMES, FASTPATH_ENABLED, FASTPATH_HOLDOUT, FASTPATH_MAX_WORDS, FASTPATH_MIN_AGREEMENT,
+    FASTPATH_MIN_SAMPLES, FASTPATH_MIN_THEME_PRECISION, REPORTS_DIR,
+)
+from lexicon import NEG_WORDS, POS_WORDS, tokenize  # repo root, on sys.path via config
+from models import Review
+from run_profile import count
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_PATH = REPORTS_DIR / "sentiment_fastpath_calibration.json"
+
+# Negation, contrast and service-recovery words: praise next to these is not trivial
+_UNCERTAIN_WORDS = set("""
+not no never nothing but though although however except only wish hope hopefully if should could would
+don't doesn't didn't isn't wasn't weren't won't can't couldn't wouldn't
+manager refund fixed issue issues problem problems finally
+""".split())
+
+_THEME_WORDS = {
+    "friendly": "staff_friendliness",
+    "nice": "staff_friendliness",
+    "helpful": "staff_helpfulness",
+    "clean": "wash_quality",
+    "shiny": "wash_quality",
+    "spotless": "wash_quality",
+    "thorough": "wash_quality",
+    "membership": "membership_subscription",
+    "value": "pricing",
+    "price": "pricing",
+    "vacuum": "vacuums_amenities",
+    "vacuums": "vacuums_amenities",
+    "lounge": "members_lounge",
+}
+
+# Words that commonly open a short review; any other capitalized word may be a name
+_OPENING_WORDS = set("""
+a the this these it i i'm we my our very so always super really everyone everything staff team
+car wash washes place service good nice thanks thank
+""".split()) | POS_WORDS | set(_THEME_WORDS)
+
+_WORD_OR_STOP_RE = re.compile(r"[A-Za-z']+|[.!?]")
+
+
+def _may_name_someone(text: str) -> bool:
+    """True if a capitalized word could be a staff or reviewer name (e.g. "Julian was great")."""
+    sentence_start = True
+    for w in _WORD_OR_STOP_RE.findall(text):
+        if w in ".!?":
+            sentence_start = True
+            continue
+        if w[0].isupper() and not w.isupper():
+            if not sentence_start or w.lower() not in _OPENING_WORDS:
+                return True
+        sentence_start = False
+    return False
+
+
+def _propose(rid: str, review: Review) -> dict | None:
+    """The fast-path analysis for a review, or None if it isn't clearly trivial."""
+    text = review.text.strip()
+    if review.star_rating != 5 or "?" in text:
+        return None
+    tokens = tokenize(text)
+    if not tokens or len(tokens) > FASTPATH_MAX_WORDS:
+        return None
+    if not any(t in POS_WORDS for t in tokens):
+        return None
+    if any(t in NEG_WORDS or t in _UNCERTAIN_WORDS for t in tokens):
+        return None
+    if _may_name_someone(text):
+        return None
+    themes = sorted({_THEME_WORDS[t] for t in tokens if t in _THEME_WORDS}, key=APPROVED_THEMES.index)
+    return {
+        "review_id": rid,
+        "location": review.place,
+        "star_rating": review.star_rating,
+        "sentiment": "positive",
+        "sentiment_score": 0.0,  # set from calibration
+        "themes": themes or ["general_positive"],
+        "positive_aspects": [text.rstrip(".!")],
+        "negative_aspects": [],
+        "staff_mentioned": [],
+        "representative_quote": text,
+        "needs_ops_followup": False,
+        "fast_path": True,
+    }
+
+
+def _agrees(proposal: dict, gemini: dict) -> bool:
+    return (
+        gemini.get("sentiment") == proposal["sentiment"]
+        and not gemini.get("staff_mentioned")
+        and not gemini.get("negative_aspects")
+        and not gemini.get("needs_ops_followup")
+    )
+
+
+@dataclass
+class Calibration:
+    samples: int = 0
+    agreement: float = 0.0
+    sentiment_score: float = 0.0  # mean Gemini score on reviews the fast path accepts
+    theme_precision: float = 0.0  # share of fast-path themes Gemini also tagged
+
+    @property
+    def trusted(self) -> bool:
+        return (
+            self.samples >= FASTPATH_MIN_SAMPLES
+            and self.agreement >= FASTPATH_MIN_AGREEMENT
+            and self.theme_precision >= FASTPATH_MIN_THEME_PRECISION
+        )
+
+    def fold(self, samples: int, agreed: int, score_sum: float, themes: int, theme_hits: int) -> None:
+        """Blend one run's comparison into this one. The stored figures keep the weight of
+        at most FASTPATH_MIN_SAMPLES - samples reviews, so a full run replaces them."""
+        kept = min(self.samples, max(FASTPATH_MIN_SAMPLES - samples, 0))
+        total = kept + samples
+        precision = theme_hits / themes if themes else 0.0
+        self.agreement = round((self.agreement * kept + agreed) / total, 3)
+        self.sentiment_score = round((self.sentiment_score * kept + score_sum) / total, 2)
+        self.theme_precision = round((self.theme_precision * kept + precision * samples) / total, 3)
+        self.samples = total
+
+    @classmethod
+    def load(cls, path: Path = CALIBRATION_PATH) -> "Calibration":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        return cls(
+            samples=data.get("samples", 0),
+            agreement=data.get("agreement", 0.0),
+            sentiment_score=data.get("sentiment_score", 0.0),
+            theme_precision=data.get("theme_precision", 0.0),
+        )
+
+    def save(self, path: Path = CALIBRATION_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "samples": self.samples,
+            "agreement": self.agreement,
+            "sentiment_score": self.sentiment_score,
+            "theme_precision": self.theme_precision,
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+
+def recalibrate(analyses: list[dict], reviews: dict[str, Review]) -> Calibration:
+    """Score the rules against this run's Gemini analyses of the reviews they would accept,
+    and fold the result into the stored calibration."""
+    cal = Calibration.load()
+    if not FASTPATH_ENABLED:
+        return cal
+    samples = agreed = theme_total = theme_hits = 0
+    score_sum = 0.0
+    for gemini in analyses:
+        rid = gemini.get("review_id", "")
+        review = reviews.get(rid)
+        proposal = _propose(rid, review) if review is not None else None
+        if proposal is None:
+            continue
+        samples += 1
+        agreed += _agrees(proposal, gemini)
+        score_sum += gemini.get("sentiment_score", 0)
+        theme_total += len(proposal["themes"])
+        theme_hits += len(set(proposal["themes"]) & set(gemini.get("themes", [])))
+
+    if samples:
+        cal.fold(samples, agreed, score_sum, theme_total, theme_hits)
+        cal.save()
+    logger.info(
+        "Fast path calibration: %d new samples; %d in window, %.1f%% label agreement, "
+        "%.1f%% theme precision, score %.2f",
+        samples, cal.samples, cal.agreement * 100, cal.theme_precision * 100, cal.sentiment_score,
+    )
+    return cal
+
+
+def classify_trivial(
+    text_items: list[tuple[str, Review]], cache: dict[str, dict],
+    candidates: list[tuple[str, Review]] | None = None,
+) -> tuple[list[dict], list[Review]]:
+    """Split uncached reviews (or just `candidates`, if given) into fast-path analyses
+    and the reviews that still need Gemini — including the random holdout."""
+    new_items = candidates if candidates is not None else [(rid, r) for rid, r in text_items if rid not in cache]
+    if not FASTPATH_ENABLED or not new_items:
+        return [], [r for _, r in new_items]
+
+    cal = Calibration.load()
+    if not cal.trusted:
+        logger.info(
+            "Fast path off: needs %.0f%% agreement and %.0f%% theme precision over %d+ samples",
+            FASTPATH_MIN_AGREEMENT * 100, FASTPATH_MIN_THEME_PRECISION * 100, FASTPATH_MIN_SAMPLES,
+        )
+        return [], [r for _, r in new_items]
+
+    analyses: list[dict] = []
+    remaining: list[Review] = []
+    held_out = 0
+    for rid, review in new_items:
+        analysis = _propose(rid, review)
+        if analysis is None:
+            remaining.append(review)
+            continue
+        if random.random() < FASTPATH_HOLDOUT:
+            held_out += 1
+            remaining.append(review)  # Gemini labels it; recalibrate() compares
+            continue
+        analysis["sentiment_score"] = cal.sentiment_score
+        analyses.append(analysis)
+    count("fastpath.classified", len(analyses))
+    count("fastpath.held_out", held_out)
+    return analyses, remaining
@@ -1,20 +1,34 @@
+import hashlib
 import json
 import logging
+import re
+import threading
 import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from google import genai
 from google.genai import errors as genai_errors
 from google.genai import types
 
 from auth import vertex_credentials
-from config import APPROVED_THEMES, GCP_LOCATION, GCP_PROJECT, GEMINI_MODEL
+from config import (
+    APPROVED_THEMES, CACHE_DIR, GCP_LOCATION, GCP_PROJECT, GEMINI_MODEL, PROMPT_CACHE_MIN_TOKENS, PROMPT_CACHE_TTL_S,
+    PROMPT_SHORT_CODES,
+)
 from dedup import make_review_id
 from models import Review
+from response_schema import (
+    RESPONSE_SCHEMA, REVIEW_SCHEMA, SUMMARY_SCHEMA, SchemaError, by_location_mapping, conform,
+)
+from run_profile import count, span
 
 logger = logging.getLogger(__name__)
 
 # Locked v2 prompt — do not modify without discussing with Kate first.
 # Tested against a 17-review sample and validated.
+# The review lines that fill {reviews} are encoded by _PromptCodec; the short-code
+# format is not yet signed off, so config.PROMPT_SHORT_CODES leaves it off by default.
 _PROMPT_TEMPLATE = """\
 You are analyzing customer reviews of a multi-location carwash company. Return ONE valid JSON object with two keys: "reviews" (array, one object per review) and "summary" (one object covering the full batch).
 
@@ -57,8 +71,138 @@ Reviews:
 {reviews}"""
 
 
-def _format_review(n: int, r: Review) -> str:
-    return f'{n}. Location: {r.place} | Author: {r.author} | Stars: {r.star_rating} | dedupe_key: {make_review_id(r)}\n"{r.text}"'
+# Everything before {reviews} is identical on every call — it is what gets cached,
+# once it is big enough for a context cache (~4 characters per token).
+_PROMPT_PREFIX, _PROMPT_SUFFIX = _PROMPT_TEMPLATE.split("{reviews}")
+_PROMPT_PREFIX_TOKENS = len(_PROMPT_PREFIX) // 4
+
+_LOC_CODE_RE = re.compile(r"\bL(\d+)\b")
+
+
+class _PromptCodec:
+    """
+    Short codes for the per-review fields that repeat or run long: locations
+    become L1..Ln (with a one-line legend per batch) and review ids become
+    r1..rn. decode() maps them back while decoding the response, so everything
+    downstream sees the same location names and review_ids as before.
+    With short_codes=False the lines use the v2 format (full names and ids) and
+    the codes are the identity.
+    """
+
+    def __init__(self, reviews: list[Review], short_codes: bool = PROMPT_SHORT_CODES):
+        self.reviews = reviews
+        self.short_codes = short_codes
+        places = sorted({r.place for r in reviews})
+        self.loc_code = {p: f"L{i + 1}" if short_codes else p for i, p in enumerate(places)}
+        self.loc_name = {c: p for p, c in self.loc_code.items()}
+        self.review_ids = [make_review_id(r) for r in reviews]
+        self.id_code = [f"r{i + 1}" if short_codes else rid for i, rid in enumerate(self.review_ids)]
+        self.id_name = dict(zip(self.id_code, self.review_ids))
+
+    def encode(self) -> str:
+        if not self.short_codes:
+            return "\n\n".join(
+                f'{i + 1}. Location: {r.place} | Author: {r.author} | Stars: {r.star_rating} | dedupe_key: {rid}\n"{r.text}"'
+                for i, (r, rid) in enumerate(zip(self.reviews, self.review_ids))
+            )
+        legend = "Location codes: " + "; ".join(f"{c} = {p}" for p, c in self.loc_code.items())
+        formatted = "\n\n".join(
+            f'{i + 1}. Location: {self.loc_code[r.place]} | Author: {r.author} | Stars: {r.star_rating} | dedupe_key: r{i + 1}\n"{r.text}"'
+            for i, r in enumerate(self.reviews)
+        )
+        return f"{legend}\n\n{formatted}"
+
+    def _loc(self, value: str) -> str:
+        return self.loc_name.get(value, value)
+
+    def _rid(self, value: str) -> str:
+        return self.id_name.get(value, value)
+
+    def _text(self, value: str) -> str:
+        if not self.short_codes:
+            return value
+        return _LOC_CODE_RE.sub(lambda m: self.loc_name.get(m.group(0), m.group(0)), value)
+
+    def decode(self, text: str) -> dict:
+        """
+        Parse the model's reply and conform it to RESPONSE_SCHEMA in one pass per
+        record, mapping codes back and flagging unapproved themes and sentiment
+        that contradicts the stars on the way. Raises json.JSONDecodeError on
+        truncated output and SchemaError on anything that parses but doesn't fit.
+        """
+        parsed = json.loads(_strip_fences(text))
+        if not isinstance(parsed, dict) or "reviews" not in parsed or "summary" not in parsed:
+            raise SchemaError('$: expected an object with "reviews" and "summary"')
+        raw_reviews = parsed["reviews"]
+        if not isinstance(raw_reviews, list):
+            raise SchemaError(f"$.reviews: expected array, got {type(raw_reviews).__name__}")
+
+        approved = set(APPROVED_THEMES)
+        reviews = []
+        for i, raw in enumerate(raw_reviews):
+            r = conform(raw, REVIEW_SCHEMA, f"reviews[{i}]")
+            if r["review_id"] not in self.id_name:
+                raise SchemaError(f"reviews[{i}].review_id: {r['review_id']!r} is not a key from this batch")
+            r["review_id"] = self.id_name[r["review_id"]]
+            r["location"] = self._loc(r["location"])
+            bad = [t for t in r["themes"] if t not in approved]
+            if bad:
+                logger.warning("Unapproved theme(s) %s in review %s — keeping but flagging", bad, r["review_id"])
+            if r["star_rating"] == 5 and r["sentiment"] == "negative":
+                logger.warning("5-star review marked negative: %s", r["review_id"])
+            elif r["star_rating"] == 1 and r["sentiment"] == "positive":
+                logger.warning("1-star review marked positive: %s", r["review_id"])
+            reviews.append(r)
+
+        summary = conform(parsed["summary"], SUMMARY_SCHEMA, "summary")
+        for e in summary["by_location"]:
+            e["location"] = self._loc(e["location"])
+        summary["by_location"] = by_location_mapping(summary["by_location"])
+        for s in summary["staff_to_recognize"]:
+            s["location"] = self._loc(s["location"])
+        for u in summary["urgent_callouts"]:
+            u["location"] = self._loc(u["location"])
+            u["dedupe_key"] = self._rid(u["dedupe_key"])
+            u["description"] = self._text(u["description"])
+        for key in ("top_positive_drivers", "top_negative_drivers"):
+            summary[key] = self._text(summary[key])
+        return {"reviews": reviews, "summary": summary}
+
+
+# model -> (cached content name, monotonic expiry); None marks "caching unavailable"
+_prefix_caches: dict[str, tuple[str, float] | None] = {}
+
+
+def _cached_prefix(client: genai.Client) -> str | None:
+    """
+    Name of a cached-content entry holding _PROMPT_PREFIX, created once per run
+    and shared by every batch until shortly before its TTL runs out. Returns None (and the caller
+    sends the full prompt) if caching is disabled, the prefix is below the model's minimum
+    cache size, or the API rejects it.
+    """
+    if not PROMPT_CACHE_TTL_S or _PROMPT_PREFIX_TOKENS < PROMPT_CACHE_MIN_TOKENS:
+        return None
+    entry = _prefix_caches.get(GEMINI_MODEL, ())
+    if entry is None:
+        return None
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    try:
+        cache = client.caches.create(
+            model=GEMINI_MODEL,
+            config=types.CreateCachedContentConfig(
+                contents=[_PROMPT_PREFIX],
+                ttl=f"{PROMPT_CACHE_TTL_S}s",
+            ),
+        )
+    except genai_errors.APIError as e:
+        logger.warning("Prompt prefix caching unavailable (%s) — sending full prompt", e)
+        _prefix_caches[GEMINI_MODEL] = None
+        return None
+    logger.info("Cached prompt prefix as %s (ttl %ds)", cache.name, PROMPT_CACHE_TTL_S)
+    # refresh a minute early so a long batch never references an expired cache
+    _prefix_caches[GEMINI_MODEL] = (cache.name, time.monotonic() + max(0, PROMPT_CACHE_TTL_S - 60))
+    return cache.name
 
 
 def _strip_fences(text: str) -> str:
@@ -71,41 +215,19 @@ def _strip_fences(text: str) -> str:
     return text.strip()
 
 
-def _validate_themes(review_analyses: list[dict]) -> None:
-    """Log warnings for any themes not in the approved list."""
-    approved = set(APPROVED_THEMES)
-    for r in review_analyses:
-        bad = [t for t in r.get("themes", []) if t not in approved]
-        if bad:
-            logger.warning(
-                "Unapproved theme(s) %s in review %s — keeping but flagging",
-                bad, r.get("review_id")
-            )
-
-
-def _sanity_check_sentiment(review_analyses: list[dict]) -> None:
-    """Warn when LLM sentiment contradicts star rating — likely a parsing issue or sarcasm."""
-    for r in review_analyses:
-        stars = r.get("star_rating", 0)
-        sentiment = r.get("sentiment", "")
-        if stars == 5 and sentiment == "negative":
-            logger.warning("5-star review marked negative: %s", r.get("review_id"))
-        elif stars == 1 and sentiment == "positive":
-            logger.warning("1-star review marked positive: %s", r.get("review_id"))
-
-
 def _normalize_staff_names(review_analyses: list[dict]) -> None:
     """
     Post-processing safety net: merge staff names within the same location
     when edit distance < 2 (catches cases the LLM misses across a large batch).
     """
-    from collections import Counter, defaultdict
-    from rapidfuzz.distance import Levenshtein
-
     names_by_loc: dict[str, list[str]] = defaultdict(list)
     for r in review_analyses:
         loc = r.get("location", "")
         names_by_loc[loc].extend(r.get("staff_mentioned", []))
+    if not any(names_by_loc.values()):
+        return
+
+    from rapidfuzz.distance import Levenshtein  # only loaded when there are names to merge
 
     canonical: dict[tuple[str, str], str] = {}  # (loc, raw_name) -> canonical_name
 
@@ -133,7 +255,6 @@ def _normalize_staff_names(review_analyses: list[dict]) -> None:
 def _rebuild_staff_recognition(review_analyses: list[dict]) -> list[dict]:
     """Rebuild staff_to_recognize from normalized per-review data so the summary
     reflects the same name merging applied to individual reviews."""
-    from collections import defaultdict
     counts: dict[tuple[str, str], int] = defaultdict(int)
     for r in review_analyses:
         loc = r.get("location", "")
@@ -147,28 +268,62 @@ def _rebuild_staff_recognition(review_analyses: list[dict]) -> list[dict]:
     return sorted(result, key=lambda x: x["mention_count"], reverse=True)
 
 
-def _call_llm_raw(client: genai.Client, reviews: list[Review]) -> dict:
-    """Single LLM call — returns parsed JSON dict with no validation applied."""
-    formatted = "\n\n".join(_format_review(i + 1, r) for i, r in enumerate(reviews))
-    prompt = _PROMPT_TEMPLATE.replace("{reviews}", formatted)
+def _count_usage(response) -> None:
+    count("llm.calls")
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    count("llm.input_tokens", getattr(usage, "prompt_token_count", 0) or 0)
+    count("llm.cached_tokens", getattr(usage, "cached_content_token_count", 0) or 0)
+    count("llm.output_tokens", getattr(usage, "candidates_token_count", 0) or 0)
 
-    logger.info("Sending %d reviews to %s", len(reviews), GEMINI_MODEL)
-    response = client.models.generate_content(
+
+def _generate(client: genai.Client, batch_text: str, cache_name: str | None):
+    return client.models.generate_content(
         model=GEMINI_MODEL,
-        contents=prompt,
+        contents=batch_text if cache_name else _PROMPT_PREFIX + batch_text,
         config=types.GenerateContentConfig(
             response_mime_type="application/json",
+            response_schema=RESPONSE_SCHEMA,
             temperature=0.1,
             max_output_tokens=65535,
+            cached_content=cache_name,
         ),
     )
 
+
+def _call_llm_raw(client: genai.Client, reviews: list[Review]) -> dict:
+    """Single LLM call, constrained to RESPONSE_SCHEMA — returns the decoded, validated response."""
+    codec = _PromptCodec(reviews)
+    batch_text = codec.encode() + _PROMPT_SUFFIX
+    cache_name = _cached_prefix(client)
+
+    logger.info("Sending %d reviews to %s", len(reviews), GEMINI_MODEL)
+    with span("llm.call", reviews=len(reviews)):
+        try:
+            response = _generate(client, batch_text, cache_name)
+        except genai_errors.ClientError as e:
+            if cache_name is None or e.code == 429:
+                raise
+            # The cached prefix expired or was evicted server-side: forget it (the next batch
+            # creates a fresh one) and resend this batch once with the prefix inlined.
+            logger.warning("Cached prompt prefix %s rejected (%s) — resending with the full prompt", cache_name, e)
+            count("llm.prefix_cache_rejected")
+            _prefix_caches.pop(GEMINI_MODEL, None)
+            response = _generate(client, batch_text, None)
+    _count_usage(response)
+
     raw = response.text
     try:
-        return json.loads(_strip_fences(raw))
+        with span("llm.decode", reviews=len(reviews)):
+            return codec.decode(raw)
     except json.JSONDecodeError as e:
         logger.error("JSON parse failed: %s\nRaw response (first 500 chars):\n%s", e, raw[:500])
         raise
+    except SchemaError as e:
+        count("llm.schema_errors")
+        logger.error("Response does not match the schema: %s\nRaw response (first 500 chars):\n%s", e, raw[:500])
+        raise
 
 
 def _call_llm_with_429_retry(client: genai.Client, reviews: list[Review]) -> dict:
@@ -178,25 +333,28 @@ def _call_llm_with_429_retry(client: genai.Client, reviews: list[Review]) -> dic
         try:
             return _call_llm_raw(client, reviews)
         except genai_errors.ClientError as e:
-            if e.status_code != 429 or delay is None:
+            if e.code != 429 or delay is None:
                 raise
             logger.warning(
                 "429 RESOURCE_EXHAUSTED — waiting %ds before retry %d/%d",
                 delay, attempt + 1, len(delays),
             )
+            count("llm.retries_429")
             time.sleep(delay)
 
 
 def _analyze_with_retry(client: genai.Client, reviews: list[Review]) -> dict:
-    """Call LLM with automatic batch-splitting retry on JSON truncation."""
+    """Call LLM with automatic batch-splitting retry on JSON truncation or a schema mismatch."""
     try:
         parsed = _call_llm_with_429_retry(client, reviews)
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, SchemaError) as e:
         if len(reviews) <= 10:
             raise  # can't split further
         mid = len(reviews) // 2
+        count("llm.splits")
         logger.warning(
-            "JSON truncated on %d reviews — retrying as two halves (%d + %d)",
+            "%s on %d reviews — retrying as two halves (%d + %d)",
+            "JSON truncated" if isinstance(e, json.JSONDecodeError) else "Schema mismatch",
             len(reviews), mid, len(reviews) - mid,
         )
         a = _analyze_with_retry(client, reviews[:mid])
@@ -208,16 +366,14 @@ def _analyze_with_retry(client: genai.Client, reviews: list[Review]) -> dict:
         logger.info("Merged split batches: %d total reviews", len(all_revs))
         return {"reviews": all_revs, "summary": summary}
 
-    review_analyses: list[dict] = parsed.get("reviews", [])
-    _validate_themes(review_analyses)
-    _sanity_check_sentiment(review_analyses)
+    review_analyses: list[dict] = parsed["reviews"]
     _normalize_staff_names(review_analyses)
     parsed["summary"]["staff_to_recognize"] = _rebuild_staff_recognition(review_analyses)
 
     logger.info(
         "Batch complete: %d reviews analyzed, %d urgent callouts",
         len(review_analyses),
-        len(parsed.get("summary", {}).get("urgent_callouts", [])),
+        len(parsed["summary"]["urgent_callouts"]),
     )
     return parsed
 
@@ -237,14 +393,18 @@ def analyze_batch(reviews: list[Review], project: str, location: str) -> dict:
     return _analyze_with_retry(client, reviews)
 
 
-def generate_narrative(review_analyses: list[dict], project: str, location: str) -> dict:
-    """
-    Generate top_positive_drivers and top_negative_drivers from already-analyzed reviews.
-    Used when all reviews are cached and no batch LLM call was made.
-    Returns {"top_positive_drivers": "...", "top_negative_drivers": "..."}.
-    """
-    from collections import Counter
+# CACHE_DIR is fresh on every CI run; both workflows restore and save this one file
+# with actions/cache so scheduled and re-dispatched runs find earlier narratives.
+NARRATIVE_CACHE_PATH = CACHE_DIR / "narratives.json"
+
+_NARRATIVE_CONFIG = {"response_mime_type": "application/json", "temperature": 0.2, "max_output_tokens": 512}
 
+# fingerprint -> narrative. Loaded from disk on first use; guarded for precompute_narratives' threads.
+_narrative_cache: dict[str, dict] | None = None
+_narrative_lock = threading.Lock()
+
+
+def _narrative_prompt(review_analyses: list[dict]) -> str:
     theme_pos: Counter = Counter()
     theme_neg: Counter = Counter()
     quotes_pos: list[str] = []
@@ -267,7 +427,7 @@ def generate_narrative(review_analyses: list[dict], project: str, location: str)
     top_pos = ", ".join(f"{t} ({c})" for t, c in theme_pos.most_common(5))
     top_neg = ", ".join(f"{t} ({c})" for t, c in theme_neg.most_common(5))
 
-    prompt = f"""You are summarizing pre-analyzed customer reviews for a multi-location carwash company.
+    return f"""You are summarizing pre-analyzed customer reviews for a multi-location carwash company.
 
 Top positive themes (theme: count): {top_pos or "none"}
 Top negative themes (theme: count): {top_neg or "none"}
@@ -281,6 +441,50 @@ Write exactly two fields as a JSON object:
 
 Return ONLY valid JSON, no commentary, no markdown code fences."""
 
+
+def _narrative_fingerprint(prompt: str) -> str:
+    """The prompt already embeds the theme counters and selected quotes."""
+    key = json.dumps([GEMINI_MODEL, _NARRATIVE_CONFIG, prompt], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _narratives() -> dict[str, dict]:
+    global _narrative_cache
+    if _narrative_cache is None:
+        try:
+            _narrative_cache = json.loads(NARRATIVE_CACHE_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _narrative_cache = {}
+    return _narrative_cache
+
+
+def _store_narrative(fingerprint: str, narrative: dict) -> None:
+    with _narrative_lock:
+        cache = _narratives()
+        cache[fingerprint] = narrative
+        NARRATIVE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = NARRATIVE_CACHE_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(NARRATIVE_CACHE_PATH)
+
+
+def generate_narrative(review_analyses: list[dict], project: str, location: str) -> dict:
+    """
+    Generate top_positive_drivers and top_negative_drivers from already-analyzed reviews.
+    Used when all reviews are cached and no batch LLM call was made.
+    Returns {"top_positive_drivers": "...", "top_negative_drivers": "..."}.
+
+    Memoized on disk by a fingerprint of the model, generation config and prompt,
+    so re-running a period whose counters and quotes haven't changed is free.
+    """
+    prompt = _narrative_prompt(review_analyses)
+    fingerprint = _narrative_fingerprint(prompt)
+    with _narrative_lock:
+        cached = _narratives().get(fingerprint)
+    if cached is not None:
+        count("llm.narrative_cache_hits")
+        return dict(cached)
+
     client = genai.Client(
         vertexai=True,
         project=project,
@@ -288,17 +492,28 @@ Return ONLY valid JSON, no commentary, no markdown code fences."""
         credentials=vertex_credentials(),
     )
     logger.info("Generating narrative summary from %d cached reviews", len(review_analyses))
-    response = client.models.generate_content(
-        model=GEMINI_MODEL,
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            temperature=0.2,
-            max_output_tokens=512,
-        ),
-    )
+    with span("llm.narrative"):
+        response = client.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt,
+            config=types.GenerateContentConfig(**_NARRATIVE_CONFIG),
+        )
+    _count_usage(response)
     try:
-        return json.loads(_strip_fences(response.text))
+        narrative = json.loads(_strip_fences(response.text))
     except json.JSONDecodeError:
         logger.warning("Narrative generation returned invalid JSON — using empty strings")
         return {"top_positive_drivers": "", "top_negative_drivers": ""}
+    _store_narrative(fingerprint, narrative)
+    return dict(narrative)
+
+
+def precompute_narratives(
+    groups: list[list[dict]], project: str, location: str, max_workers: int = 4,
+) -> list[dict]:
+    """Narratives for several periods (e.g. every backfill month) in one concurrent sweep.
+    Periods already in the cache cost nothing; results come back in input order."""
+    if not groups:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="narrative") as pool:
+        return list(pool.map(lambda g: generate_narrative(g, project, location), groups))
@@ -4,7 +4,11 @@ Google Reviews Sentiment Analysis — Phase 1 entry point.
 Usage:
     python main.py --mode baseline          # all reviews from Oct 2025 to today
     python main.py --mode monthly           # reviews from last calendar month
-    python main.py --mode baseline --dry-run  # print JSON, don't write to Sheet
+    python main.py --mode baseline --dry-run  # stream NDJSON to stdout, don't write to Sheet
+    python main.py --mode monthly --output out.ndjson  # write the Sheet and stream NDJSON to a file
+    python main.py --mode ingest            # analyze reviews spooled by the weekly fetcher since last ingest
+    python main.py --mode incremental       # ingest + refresh Current/Dashboard with month-to-date totals
+    python main.py --mode compact           # move rows older than last quarter into quarter partition tabs
 
 Credentials:
     Set GOOGLE_APPLICATION_CREDENTIALS to your service_account.json path,
@@ -12,7 +16,6 @@ Credentials:
 """
 
 import argparse
-import json
 import logging
 import sys
 from collections import Counter, defaultdict
@@ -21,11 +24,22 @@ import calendar
 
 from dotenv import load_dotenv
 
-from config import BASELINE_START, BATCH_SIZE, GCP_LOCATION, GCP_PROJECT
-from dedup import dedup_reviews, make_review_id
-from llm import analyze_batch, generate_narrative
+from config import (
+    BASELINE_START, BATCH_SIZE, GCP_LOCATION, GCP_PROJECT, REPORTS_DIR, SPOOL_CONSUMER, SPOOL_DIR, THEME_BREAKDOWN_MODE,
+)
+from alerts import CalloutStream, plan_batches
+from cube import AggregateCube
+from dedup import dedup_with_ids
+from fastpath import classify_trivial, recalibrate
 from models import Review
-from sheets import append_history, read_analyzed_reviews, read_reviews, setup_formula_dashboard, write_current, write_dashboard, write_reviews, write_theme_breakdown
+from month_to_date import MonthToDate
+from ndjson_sink import NdjsonSink
+from near_dup import NearDupIndex
+from run_profile import span, write_profile
+
+# llm (google.genai) and sheets (gspread, google-auth) are imported inside the
+# functions that use them, so --help, setup-dashboard and runs with nothing new
+# to analyze don't pay for client libraries they never touch.
 
 load_dotenv()
 logging.basicConfig(
@@ -128,40 +142,9 @@ def _build_summary_stats(all_review_analyses: list[dict]) -> dict:
     Narrative fields (top_positive_drivers, top_negative_drivers) are left empty;
     callers should fill them from LLM output when available.
     """
-    loc_data: dict = defaultdict(lambda: {"count": 0, "stars": 0.0, "sentiment": 0.0, "themes": []})
-    theme_sentiments: dict[str, list[str]] = defaultdict(list)
-
-    for r in all_review_analyses:
-        loc = r.get("location", "Unknown")
-        loc_data[loc]["count"] += 1
-        loc_data[loc]["stars"] += float(r.get("star_rating", 0))
-        loc_data[loc]["sentiment"] += float(r.get("sentiment_score", 0))
-        loc_data[loc]["themes"].extend(r.get("themes", []))
-        for theme in r.get("themes", []):
-            theme_sentiments[theme].append(r.get("sentiment", "neutral"))
-
-    by_location: dict = {}
-    for loc, d in loc_data.items():
-        count = d["count"]
-        theme_counts = Counter(d["themes"])
-        by_location[loc] = {
-            "review_count": count,
-            "average_star_rating": round(d["stars"] / count, 2) if count else 0,
-            "average_sentiment_score": round(d["sentiment"] / count, 2) if count else 0,
-            "top_themes": [t for t, _ in theme_counts.most_common(5)],
-        }
-
-    all_theme_counts: Counter = Counter()
-    for d in loc_data.values():
-        all_theme_counts.update(d["themes"])
-
-    overall_top_themes = []
-    for theme, count in all_theme_counts.most_common():
-        sentiments = theme_sentiments[theme]
-        pos = sum(1 for s in sentiments if s == "positive")
-        neg = sum(1 for s in sentiments if s == "negative")
-        leaning = "positive" if pos > neg else "negative" if neg > pos else "mixed"
-        overall_top_themes.append({"theme": theme, "count": count, "sentiment_leaning": leaning})
+    cube = AggregateCube.from_analyses(all_review_analyses)
+    by_location = cube.location_stats()
+    overall_top_themes = cube.theme_stats()
 
     staff_counts: dict[tuple, int] = defaultdict(int)
     for r in all_review_analyses:
@@ -196,6 +179,49 @@ def _build_summary_stats(all_review_analyses: list[dict]) -> dict:
     }
 
 
+def _triage(
+    text_items: list[tuple[str, Review]], cache: dict[str, dict], index: NearDupIndex,
+) -> tuple[list[dict], list[dict], list[Review]]:
+    """Analyses that need no Gemini call — reused from an analyzed near-duplicate, or
+    from the fast path — plus the reviews that still do."""
+    # The index persists between runs, so this only signs cached reviews it hasn't seen
+    seeded = sum(index.add(rid, r, cache[rid]) for rid, r in text_items if rid in cache)
+    if seeded:
+        logger.info("Near-duplicate index: %d cached reviews added", seeded)
+    reused, pending = index.split([(rid, r) for rid, r in text_items if rid not in cache])
+    fast_analyses, new_reviews = classify_trivial(text_items, cache, pending)
+    return reused, fast_analyses, new_reviews
+
+
+def _update_cube(appended: list[dict], stored: dict[str, dict] | None = None) -> AggregateCube:
+    """Fold the analyses this run appended to Sentiment - Reviews into the persisted
+    aggregate cube and save it. The saved cells carry no review_ids, so nothing else
+    may be folded in. Given every stored analysis (`stored`, as backfill has) the cube
+    is rebuilt from scratch; with no saved cube yet it is bootstrapped once from every
+    partition."""
+    from sheets import read_analyzed_reviews, read_cube, write_cube
+
+    cube = read_cube() if stored is None else None
+    rebuilt = cube is None
+    if rebuilt:
+        cube = AggregateCube()
+        cube.add_many((read_analyzed_reviews() if stored is None else stored).values())
+    added = cube.add_many(appended)  # a bootstrap already read these back: no-op by review_id
+    if rebuilt or added:
+        write_cube(cube)
+    logger.info("Aggregate cube: %d reviews (%d folded in this run)", cube.review_count(), added)
+    return cube
+
+
+def _write_theme_breakdown(cube: AggregateCube) -> None:
+    from sheets import write_theme_breakdown
+
+    if THEME_BREAKDOWN_MODE == "formulas":
+        write_theme_breakdown()
+    else:
+        write_theme_breakdown(cube)
+
+
 def _month_periods(start: date, end: date) -> list[tuple[date, date]]:
     """Return (month_start, month_end) tuples from start's month through end's month."""
     periods = []
@@ -210,12 +236,16 @@ def _month_periods(start: date, end: date) -> list[tuple[date, date]]:
     return periods
 
 
-def run_backfill(dry_run: bool = False) -> None:
+def run_backfill(dry_run: bool = False, sink: NdjsonSink | None = None) -> None:
     """
     Read all reviews once, then loop month-by-month from BASELINE_START through
     the last complete calendar month. Appends one History row per month; writes
     a combined Sentiment - Reviews tab at the end. Never touches Sentiment - Current.
+    With a sink, each month's analyses stream out as its batches complete and the
+    month summaries follow at the end.
     """
+    from sheets import append_history, read_analyzed_reviews, read_reviews, write_reviews
+
     run_date = date.today()
     baseline_start = date.fromisoformat(BASELINE_START)
 
@@ -232,10 +262,14 @@ def run_backfill(dry_run: bool = False) -> None:
     all_raw = read_reviews(since=baseline_start)
     logger.info("Total raw reviews loaded: %d", len(all_raw))
 
-    cache = read_analyzed_reviews()
+    cache = read_analyzed_reviews(since=baseline_start)
     logger.info("Cache: %d previously analyzed reviews", len(cache))
 
     all_backfill_analyses: list[dict] = []
+    all_llm_analyses: list[dict] = []
+    all_text_reviews: dict[str, Review] = {}
+    index = NearDupIndex.load()
+    months: list[tuple] = []  # per month: (start, end, analyses, summary, text_count, empty_count, has_narrative)
 
     for period_start, period_end in periods:
         logger.info("--- Backfill month: %s → %s ---", period_start, period_end)
@@ -250,9 +284,12 @@ def run_backfill(dry_run: bool = False) -> None:
                     month_reviews_raw.append(r)
             except ValueError:
                 pass
-        reviews, dup_count = dedup_reviews(month_reviews_raw)
-        text_reviews = [r for r in reviews if r.text.strip()]
-        empty_reviews = [r for r in reviews if not r.text.strip()]
+        with span("dedup"):
+            deduped = dedup_with_ids(month_reviews_raw)
+        dup_count = deduped.dup_count
+        text_items = deduped.text_items()
+        text_reviews = [r for _, r in text_items]
+        empty_reviews = [r for r in deduped.reviews if not r.text.strip()]
         logger.info(
             "%s: %d text, %d empty, %d dupes",
             period_start.strftime("%Y-%m"), len(text_reviews), len(empty_reviews), dup_count,
@@ -262,33 +299,49 @@ def run_backfill(dry_run: bool = False) -> None:
             logger.warning("No text reviews for %s — skipping LLM, no history row written.", period_start.strftime("%Y-%m"))
             continue
 
-        review_lookup = {make_review_id(r): r for r in text_reviews}
+        review_lookup = dict(text_items)
 
-        new_reviews = [r for r in text_reviews if make_review_id(r) not in cache]
-        cached_analyses = [cache[make_review_id(r)] for r in text_reviews if make_review_id(r) in cache]
+        reused, fast_analyses, new_reviews = _triage(text_items, cache, index)
+        cached_analyses = [cache[rid] for rid, _ in text_items if rid in cache]
         logger.info(
-            "  %s: %d cached, %d new",
-            period_start.strftime("%Y-%m"), len(cached_analyses), len(new_reviews),
+            "  %s: %d cached, %d near-dup, %d fast path, %d new",
+            period_start.strftime("%Y-%m"), len(cached_analyses), len(reused), len(fast_analyses), len(new_reviews),
         )
+        month = period_start.strftime("%Y-%m")
+        if sink:
+            sink.reviews(cached_analyses + reused + fast_analyses, month=month)
 
-        new_analyses: list[dict] = []
+        llm_analyses: list[dict] = []
         summaries: list[dict] = []
 
+        if new_reviews:
+            from llm import analyze_batch
+
         for i in range(0, len(new_reviews), BATCH_SIZE):
             batch = new_reviews[i : i + BATCH_SIZE]
             batch_num = i // BATCH_SIZE + 1
             total_batches = (len(new_reviews) + BATCH_SIZE - 1) // BATCH_SIZE
             logger.info("  Batch %d/%d: %d reviews", batch_num, total_batches, len(batch))
-            result = analyze_batch(batch, GCP_PROJECT, GCP_LOCATION)
-            new_analyses.extend(result.get("reviews", []))
+            with span("llm.batch", reviews=len(batch)):
+                result = analyze_batch(batch, GCP_PROJECT, GCP_LOCATION)
+            llm_analyses.extend(result.get("reviews", []))
             summaries.append(result.get("summary", {}))
-
+            if sink:
+                sink.reviews(result.get("reviews", []), month=month)
+
+        settled = index.settle(llm_analyses, review_lookup)
+        if sink:
+            sink.reviews(settled, month=month)
+        all_llm_analyses.extend(llm_analyses)
+        all_text_reviews.update(review_lookup)
+        new_analyses = reused + fast_analyses + llm_analyses + settled
         month_analyses = cached_analyses + new_analyses
         final_summary = _build_summary_stats(month_analyses)
-        if summaries:
-            last = summaries[-1]
-            final_summary["top_positive_drivers"] = last.get("top_positive_drivers", "")
-            final_summary["top_negative_drivers"] = last.get("top_negative_drivers", "")
+        covered = len(summaries) == 1 and len(llm_analyses) == len(month_analyses)
+        if covered:
+            # One batch analyzed every review this month: its own narrative covers them all
+            final_summary["top_positive_drivers"] = summaries[0].get("top_positive_drivers", "")
+            final_summary["top_negative_drivers"] = summaries[0].get("top_negative_drivers", "")
 
         for callout in final_summary.get("urgent_callouts", []):
             rid = callout.get("dedupe_key", "")
@@ -296,33 +349,195 @@ def run_backfill(dry_run: bool = False) -> None:
             if review and review.publish_time:
                 callout["review_date"] = review.publish_time[:10]
 
-        if dry_run:
-            print(json.dumps({
-                "month": str(period_start)[:7],
-                "reviews": month_analyses,
-                "summary": final_summary,
-            }, indent=2))
-        else:
+        months.append((period_start, period_end, month_analyses, final_summary,
+                       len(text_reviews), len(empty_reviews), covered))
+        all_backfill_analyses.extend(month_analyses)
+
+    # Any month no single batch covered — fully cached, or split over several batches,
+    # each of which only saw its own slice — gets its drivers from all of its analyses,
+    # in one concurrent sweep (memoized, so re-running a backfill makes no narrative calls)
+    need_narrative = [m for m in months if not m[6]]
+    if need_narrative:
+        from llm import precompute_narratives
+
+        narratives = precompute_narratives([m[2] for m in need_narrative], GCP_PROJECT, GCP_LOCATION)
+        for m, narrative in zip(need_narrative, narratives):
+            m[3]["top_positive_drivers"] = narrative.get("top_positive_drivers", "")
+            m[3]["top_negative_drivers"] = narrative.get("top_negative_drivers", "")
+
+    # Reviews first: the History rows read the cube, which only counts stored reviews
+    cube = None
+    if not dry_run and all_backfill_analyses:
+        appended = write_reviews(all_backfill_analyses, run_date=run_date)
+        recalibrate(all_llm_analyses, all_text_reviews)
+        index.save()
+        cube = _update_cube(appended, stored=cache)  # cache spans every partition: rebuild
+        _write_theme_breakdown(cube)
+
+    for period_start, period_end, month_analyses, final_summary, text_count, empty_count, _ in months:
+        if sink:
+            sink.summary(final_summary, month=period_start.strftime("%Y-%m"))
+        if not dry_run:
             append_history(
                 final_summary,
                 period_start, period_end,
-                text_review_count=len(text_reviews),
-                empty_count=len(empty_reviews),
+                text_review_count=text_count,
+                empty_count=empty_count,
                 run_date=run_date,
+                cube=cube,
             )
 
-        all_backfill_analyses.extend(month_analyses)
-
     if not dry_run and all_backfill_analyses:
-        write_reviews(all_backfill_analyses, run_date=run_date)
-        write_theme_breakdown()
         logger.info("Backfill complete: %d total reviews written to Reviews tab.", len(all_backfill_analyses))
     elif dry_run:
         logger.info("Dry-run complete: %d total reviews analyzed.", len(all_backfill_analyses))
 
 
-def run(mode: str, dry_run: bool = False) -> None:
+def _spooled_review(rec: dict) -> Review:
+    try:
+        star = int(float(rec.get("rating") or 0))
+    except (TypeError, ValueError):
+        star = 0
+    return Review(
+        dedupe_key=str(rec.get("dedupe_key") or ""),
+        place=str(rec.get("place") or ""),
+        place_id=str(rec.get("place_id") or ""),
+        author=str(rec.get("author") or ""),
+        star_rating=star,
+        publish_time=str(rec.get("publishTime") or ""),
+        relative_time=str(rec.get("relativeTime") or ""),
+        text=str(rec.get("text") or "").strip(),
+        date_run=str(rec.get("date_run") or ""),
+    )
+
+
+def run_ingest(dry_run: bool = False, incremental: bool = False, sink: NdjsonSink | None = None) -> None:
+    """
+    Analyze only the reviews the weekly fetcher spooled since the last ingest,
+    instead of reading the whole raw tab back from Sheets. Analyses are appended
+    to Sentiment - Reviews (so the monthly run finds them cached) and folded into
+    the aggregate cube. The spool offset is committed only after that succeeded.
+
+    incremental=True (--mode incremental) also folds them into the persisted
+    month-to-date state and refreshes Current and Dashboard for the month so far.
+
+    A sink receives this ingest's new analyses as they complete (and, when
+    incremental, the month-to-date summary).
+    """
+    from review_spool import ReviewSpool
+
     run_date = date.today()
+    alerts = CalloutStream.for_run(REPORTS_DIR / run_date.isoformat(), dry_run)
+    spool = ReviewSpool(str(SPOOL_DIR))
+    records, position = spool.read_unread(SPOOL_CONSUMER)
+    logger.info("Spool: %d unread reviews", len(records))
+    if not records:
+        return
+
+    with span("dedup"):
+        spooled = [_spooled_review(r) for r in records]
+        deduped = dedup_with_ids(spooled)
+    text_items = deduped.text_items()
+    logger.info("After dedup: %d text reviews (%d duplicates removed)", len(text_items), deduped.dup_count)
+
+    from sheets import read_analyzed_reviews, write_current, write_dashboard, write_reviews
+
+    dates = sorted(r.publish_time[:10] for r in deduped.reviews if r.publish_time)
+    cache = read_analyzed_reviews(since=date.fromisoformat(dates[0]) if dates else None)
+    index = NearDupIndex.load()
+    reused, fast_analyses, new_reviews = _triage(text_items, cache, index)
+    cached_analyses = [cache[rid] for rid, _ in text_items if rid in cache]
+    logger.info(
+        "Cached: %d | Near-dup: %d | Fast path: %d | New (need LLM): %d",
+        len(cached_analyses), len(reused), len(fast_analyses), len(new_reviews),
+    )
+    if sink:
+        sink.reviews(reused + fast_analyses)
+
+    llm_analyses: list[dict] = []
+    if new_reviews:
+        from llm import analyze_batch
+
+    # Likely-urgent reviews go first so their callouts stream out while the rest is analyzed
+    for batch in plan_batches(new_reviews, BATCH_SIZE):
+        with span("llm.batch", reviews=len(batch)):
+            result = analyze_batch(batch, GCP_PROJECT, GCP_LOCATION)
+        llm_analyses.extend(result.get("reviews", []))
+        alerts.emit(result.get("reviews", []))
+        if sink:
+            sink.reviews(result.get("reviews", []))
+    settled = index.settle(llm_analyses, dict(text_items))
+    if sink:
+        sink.reviews(settled)
+    new_analyses = reused + fast_analyses + llm_analyses + settled
+
+    if incremental:
+        month = run_date.strftime("%Y-%m")
+        mtd = MonthToDate.load(month)
+        added = mtd.fold(cached_analyses + new_analyses)
+        mtd.empty_count += sum(
+            1 for r in deduped.reviews if not r.text.strip() and r.publish_time[:7] == month
+        )
+        # Duplicates share a publish day, so deduping this month's records alone counts this month's
+        mtd.dup_count += dedup_with_ids(
+            [r for r in spooled if r.publish_time[:7] == month]
+        ).dup_count
+        logger.info("Month-to-date %s: %d new, %d total", month, added, len(mtd.analyses))
+
+        # The narrative covers the whole month so far, not just this run's batches (memoized)
+        month_analyses = list(mtd.analyses.values())
+        if added or not mtd.narrative:
+            from llm import generate_narrative
+            mtd.narrative = generate_narrative(month_analyses, GCP_PROJECT, GCP_LOCATION)
+
+        final_summary = _build_summary_stats(month_analyses)
+        final_summary.update(mtd.narrative)
+        for callout in final_summary.get("urgent_callouts", []):
+            rid = callout.get("dedupe_key", "")
+            if "|" in rid:
+                callout["review_date"] = rid.split("|")[-1][:10]
+
+    if sink and incremental:
+        sink.summary(final_summary)
+    if dry_run:
+        return
+
+    appended: list[dict] = []
+    if new_analyses:
+        appended = write_reviews(new_analyses, run_date=run_date)
+        recalibrate(llm_analyses, dict(text_items))
+        index.save()
+    if appended or incremental:
+        cube = _update_cube(appended)
+        if appended:
+            _write_theme_breakdown(cube)
+    if incremental:
+        period_start = run_date.replace(day=1)
+        write_current(
+            month_analyses, final_summary,
+            period_start, run_date,
+            empty_count=mtd.empty_count,
+            dup_count=mtd.dup_count,
+            run_date=run_date,
+        )
+        write_dashboard(
+            month_analyses, final_summary,
+            period_start, run_date,
+            empty_count=mtd.empty_count,
+            dup_count=mtd.dup_count,
+            run_date=run_date,
+            cube=cube,
+        )
+        mtd.save()
+    spool.commit(SPOOL_CONSUMER, position)
+    logger.info("Ingest complete: %d reviews analyzed, spool offset now %s", len(new_analyses), position)
+
+
+def run(mode: str, dry_run: bool = False, sink: NdjsonSink | None = None) -> None:
+    from sheets import append_history, read_analyzed_reviews, read_reviews, write_current, write_dashboard, write_reviews
+
+    run_date = date.today()
+    alerts = CalloutStream.for_run(REPORTS_DIR / run_date.isoformat(), dry_run)
 
     if mode == "baseline":
         period_start = date.fromisoformat(BASELINE_START)
@@ -336,50 +551,67 @@ def run(mode: str, dry_run: bool = False) -> None:
 
     # --- Read & deduplicate ---
     raw = read_reviews(since=period_start, until=period_end)
-    reviews, dup_count = dedup_reviews(raw)
-    logger.info("After dedup: %d reviews (%d duplicates removed)", len(reviews), dup_count)
-
-    text_reviews = [r for r in reviews if r.text.strip()]
-    empty_reviews = [r for r in reviews if not r.text.strip()]
+    with span("dedup"):
+        deduped = dedup_with_ids(raw)
+    dup_count = deduped.dup_count
+    logger.info("After dedup: %d reviews (%d duplicates removed)", len(deduped.reviews), dup_count)
+
+    text_items = deduped.text_items()
+    text_reviews = [r for _, r in text_items]
+    empty_reviews = [r for r in deduped.reviews if not r.text.strip()]
     logger.info("Text: %d | Star-only (empty): %d", len(text_reviews), len(empty_reviews))
 
-    review_lookup = {make_review_id(r): r for r in text_reviews}
+    review_lookup = dict(text_items)
 
     if not text_reviews:
         logger.warning("No text reviews found for this period — nothing to analyze.")
         return
 
     # --- Load cached analyses, call LLM only for new reviews ---
-    cache = read_analyzed_reviews()
-    new_reviews = [r for r in text_reviews if make_review_id(r) not in cache]
-    cached_analyses = [cache[make_review_id(r)] for r in text_reviews if make_review_id(r) in cache]
-    logger.info("Cached: %d | New (need LLM): %d", len(cached_analyses), len(new_reviews))
+    from llm import analyze_batch, generate_narrative
+
+    cache = read_analyzed_reviews(since=period_start, until=period_end)
+    index = NearDupIndex.load()
+    reused, fast_analyses, new_reviews = _triage(text_items, cache, index)
+    cached_analyses = [cache[rid] for rid, _ in text_items if rid in cache]
+    logger.info(
+        "Cached: %d | Near-dup: %d | Fast path: %d | New (need LLM): %d",
+        len(cached_analyses), len(reused), len(fast_analyses), len(new_reviews),
+    )
+    if sink:
+        sink.reviews(cached_analyses + reused + fast_analyses)
 
-    new_analyses: list[dict] = []
-    llm_narrative = {"top_positive_drivers": "", "top_negative_drivers": ""}
+    llm_analyses: list[dict] = []
     summaries: list[dict] = []
 
-    for i in range(0, len(new_reviews), BATCH_SIZE):
-        batch = new_reviews[i : i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        total_batches = (len(new_reviews) + BATCH_SIZE - 1) // BATCH_SIZE
-        logger.info("Batch %d/%d: %d reviews", batch_num, total_batches, len(batch))
-        result = analyze_batch(batch, GCP_PROJECT, GCP_LOCATION)
-        new_analyses.extend(result.get("reviews", []))
+    # Likely-urgent reviews go first so their callouts stream out while the rest is analyzed
+    batches = plan_batches(new_reviews, BATCH_SIZE)
+    for batch_num, batch in enumerate(batches, 1):
+        logger.info("Batch %d/%d: %d reviews", batch_num, len(batches), len(batch))
+        with span("llm.batch", reviews=len(batch)):
+            result = analyze_batch(batch, GCP_PROJECT, GCP_LOCATION)
+        llm_analyses.extend(result.get("reviews", []))
         summaries.append(result.get("summary", {}))
-
-    if summaries:
-        last = summaries[-1]
-        llm_narrative = {
-            "top_positive_drivers": last.get("top_positive_drivers", ""),
-            "top_negative_drivers": last.get("top_negative_drivers", ""),
-        }
+        alerts.emit(result.get("reviews", []))
+        if sink:
+            sink.reviews(result.get("reviews", []))
+    settled = index.settle(llm_analyses, review_lookup)
+    if sink:
+        sink.reviews(settled)
+    new_analyses = reused + fast_analyses + llm_analyses + settled
 
     # --- Build final summary from all review-level data (deterministic) ---
     all_review_analyses = cached_analyses + new_analyses
 
-    # If all reviews were cached, no batch LLM call ran — generate narrative separately
-    if not summaries:
+    # A batch's narrative only covers that batch, and plan_batches sends the urgent reviews
+    # first, so the last batch is the least negative. Unless one batch saw every review,
+    # the narrative comes from all of the period's analyses (memoized).
+    if len(summaries) == 1 and len(llm_analyses) == len(all_review_analyses):
+        llm_narrative = {
+            "top_positive_drivers": summaries[0].get("top_positive_drivers", ""),
+            "top_negative_drivers": summaries[0].get("top_negative_drivers", ""),
+        }
+    else:
         llm_narrative = generate_narrative(all_review_analyses, GCP_PROJECT, GCP_LOCATION)
     final_summary = _build_summary_stats(all_review_analyses)
     final_summary["top_positive_drivers"] = llm_narrative["top_positive_drivers"]
@@ -393,10 +625,17 @@ def run(mode: str, dry_run: bool = False) -> None:
             callout["review_date"] = review.publish_time[:10]
 
     # --- Output ---
+    if sink:
+        sink.summary(final_summary)
     if dry_run:
-        print(json.dumps({"reviews": all_review_analyses, "summary": final_summary}, indent=2))
         return
 
+    # Reviews first: History and the Dashboard read the cube, which only counts stored reviews
+    appended = write_reviews(all_review_analyses, run_date=run_date)
+    recalibrate(llm_analyses, review_lookup)
+    index.save()
+    cube = _update_cube(appended)
+    _write_theme_breakdown(cube)
     write_current(
         all_review_analyses, final_summary,
         period_start, period_end,
@@ -410,15 +649,15 @@ def run(mode: str, dry_run: bool = False) -> None:
         text_review_count=len(text_reviews),
         empty_count=len(empty_reviews),
         run_date=run_date,
+        cube=cube,
     )
-    write_reviews(all_review_analyses, run_date=run_date)
-    write_theme_breakdown()
     write_dashboard(
         all_review_analyses, final_summary,
         period_start, period_end,
         empty_count=len(empty_reviews),
         dup_count=dup_count,
         run_date=run_date,
+        cube=cube,
     )
     logger.info("Done.")
 
@@ -426,25 +665,43 @@ def run(mode: str, dry_run: bool = False) -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Google Reviews Sentiment Analysis")
     parser.add_argument(
-        "--mode", choices=["baseline", "monthly", "backfill", "setup-dashboard"], required=True,
-        help="baseline = all reviews from Oct 2025; monthly = last calendar month; backfill = month-by-month Oct 2025 → last complete month; setup-dashboard = write formula-driven Dashboard tab",
+        "--mode", choices=["baseline", "monthly", "backfill", "ingest", "incremental", "compact", "setup-dashboard"], required=True,
+        help="baseline = all reviews from Oct 2025; monthly = last calendar month; backfill = month-by-month Oct 2025 → last complete month; ingest = reviews spooled by the weekly fetcher since the last ingest; incremental = ingest + month-to-date Current/Dashboard; compact = move aged rows from the raw/review tabs into quarter partitions; setup-dashboard = write formula-driven Dashboard tab",
     )
     parser.add_argument(
         "--dry-run", action="store_true",
-        help="Print JSON to stdout instead of writing to the Sheet",
+        help="Don't write to the Sheet; stream NDJSON records to --output (default stdout)",
+    )
+    parser.add_argument(
+        "--output", metavar="PATH",
+        help="Stream NDJSON records (one per review analysis, then summaries) to PATH, or - for stdout",
     )
     args = parser.parse_args()
+    output = args.output or ("-" if args.dry_run else None)
+    sink = NdjsonSink.open(output) if output else None
 
     try:
-        if args.mode == "backfill":
-            run_backfill(dry_run=args.dry_run)
-        elif args.mode == "setup-dashboard":
-            setup_formula_dashboard()
-        else:
-            run(args.mode, dry_run=args.dry_run)
+        with span(f"run.{args.mode}"):
+            if args.mode == "backfill":
+                run_backfill(dry_run=args.dry_run, sink=sink)
+            elif args.mode in ("ingest", "incremental"):
+                run_ingest(dry_run=args.dry_run, incremental=args.mode == "incremental", sink=sink)
+            elif args.mode == "compact":
+                from sheets import compact_partitions
+                logger.info("Compaction moved %d rows into quarter partitions", compact_partitions())
+            elif args.mode == "setup-dashboard":
+                from sheets import setup_formula_dashboard
+                setup_formula_dashboard()
+            else:
+                run(args.mode, dry_run=args.dry_run, sink=sink)
     except Exception:
         logger.exception("Analysis failed")
         sys.exit(1)
+    finally:
+        if sink:
+            sink.close()
+        path = write_profile(str(REPORTS_DIR / date.today().isoformat()), name="sentiment_run_profile")
+        logger.info("Run profile written to %s", path)
 
 
 if __name__ == "__main__":
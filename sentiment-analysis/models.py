@@ -1,8 +1,15 @@
+import sys
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Review:
+    """One row of the raw reviews tab.
+
+    Slotted and frozen so large baseline/backfill runs don't pay for a per-row
+    __dict__. place, place_id and date_run repeat across thousands of rows, so
+    they are interned and every Review for a location shares the same strings.
+    """
     dedupe_key: str
     place: str
     place_id: str
@@ -12,3 +19,8 @@ class Review:
     relative_time: str
     text: str
     date_run: str
+
+    def __post_init__(self) -> None:
+        # frozen=True blocks normal assignment — object.__setattr__ is the supported escape hatch
+        for field in ("place", "place_id", "date_run"):
+            object.__setattr__(self, field, sys.intern(getattr(self, field)))
@@ -0,0 +1,71 @@
+"""
+Persisted month-to-date state for --mode incremental.
+
+Each incremental run folds the reviews it just consumed from the spool into
+this file instead of re-reading the month from Sheets. The summary for Current
+and the Dashboard is then rebuilt from this month's analyses only, not from the
+whole history. When the calendar month rolls over, the state starts empty.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from config import REPORTS_DIR
+from cube import analysis_month
+
+logger = logging.getLogger(__name__)
+
+# Lives next to reports/summary_history.json so the weekly job commits it back.
+MTD_PATH = REPORTS_DIR / "sentiment_month_to_date.json"
+
+
+@dataclass
+class MonthToDate:
+    month: str  # YYYY-MM
+    analyses: dict[str, dict] = field(default_factory=dict)  # review_id -> analysis
+    empty_count: int = 0
+    dup_count: int = 0
+    narrative: dict[str, str] = field(default_factory=dict)
+
+    def fold(self, analyses: list[dict]) -> int:
+        """Add this month's analyses (others are ignored); returns how many were new."""
+        added = 0
+        for a in analyses:
+            rid = a.get("review_id", "")
+            if analysis_month(a) != self.month or rid in self.analyses:
+                continue
+            self.analyses[rid] = a
+            added += 1
+        return added
+
+    @classmethod
+    def load(cls, month: str, path: Path = MTD_PATH) -> "MonthToDate":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(month)
+        if data.get("month") != month:
+            logger.info("Month-to-date: starting %s (stored state was %s)", month, data.get("month"))
+            return cls(month)
+        return cls(
+            month,
+            analyses=data.get("analyses", {}),
+            empty_count=data.get("empty_count", 0),
+            dup_count=data.get("dup_count", 0),
+            narrative=data.get("narrative", {}),
+        )
+
+    def save(self, path: Path = MTD_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "month": self.month,
+            "empty_count": self.empty_count,
+            "dup_count": self.dup_count,
+            "narrative": self.narrative,
+            "analyses": self.analyses,
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+        logger.info("Saved month-to-date state: %s, %d reviews", self.month, len(self.analyses))
@@ -0,0 +1,69 @@
+"""
+Streaming NDJSON output for --dry-run and --output.
+
+Each record is one JSON object per line. Review analyses are written as their
+batch completes, and summaries follow once the run has built them:
+
+    {"record": "review", "review_id": "...", "location": "...", ...}
+    {"record": "summary", "total_reviews": 412, "by_location": {...}, ...}
+
+Backfill records also carry "month": "YYYY-MM". Keys are sorted, so two dry
+runs diff line by line, and output can be piped straight into jq:
+
+    python main.py --mode monthly --dry-run | jq -c 'select(.record == "summary")'
+    python main.py --mode backfill --dry-run --output reports/backfill.ndjson
+"""
+
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import TextIO
+
+from run_profile import count
+
+logger = logging.getLogger(__name__)
+
+
+class NdjsonSink:
+    def __init__(self, stream: TextIO, owns_stream: bool = False) -> None:
+        self.stream: TextIO | None = stream
+        self.owns_stream = owns_stream
+
+    @classmethod
+    def open(cls, target: str) -> "NdjsonSink":
+        """'-' for stdout, otherwise a file path (overwritten)."""
+        if target == "-":
+            return cls(sys.stdout)
+        path = Path(target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(path.open("w", encoding="utf-8"), owns_stream=True)
+
+    def write(self, records: list[dict]) -> None:
+        """Write and flush, so a downstream reader sees the records now."""
+        if self.stream is None:
+            return
+        try:
+            for record in records:
+                self.stream.write(json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":")) + "\n")
+            self.stream.flush()
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`). Finish the run without output, and point
+            # stdout at devnull so the interpreter's final flush doesn't raise again.
+            logger.warning("NDJSON output closed by the reader — not writing further records")
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            self.stream = None
+
+    def reviews(self, analyses: list[dict], **tags) -> None:
+        """One "review" record per analysis."""
+        self.write([{"record": "review", **tags, **a} for a in analyses])
+        count("output.review_records", len(analyses))
+
+    def summary(self, summary: dict, **tags) -> None:
+        self.write([{"record": "summary", **tags, **summary}])
+
+    def close(self) -> None:
+        if self.stream is not None and self.owns_stream:
+            self.stream.close()
+        self.stream = None
@@ -0,0 +1,256 @@
+"""
+MinHash/LSH index of analyzed review text, used to reuse analyses across
+near-duplicate reviews.
+
+dedup_with_ids() only drops exact repeats: the same author, place, day and first
+50 characters. Cross-posted reviews (one customer, several locations), templated
+reviews and edited reviews get past it. Each one would otherwise cost its own
+Gemini analysis. Here every analyzed review gets a MinHash signature over
+character shingles of its normalized text. Signatures are bucketed into LSH
+bands, so a lookup compares only a handful of candidates instead of the whole
+history. A new review whose estimated Jaccard similarity to an analyzed one
+reaches NEAR_DUP_THRESHOLD, and which has the same star rating, inherits that
+analysis's sentiment, score and themes. Everything else is the review's own:
+review_id, location, star rating and its text as the quote. Aspects and staff
+are left empty rather than borrowed from a review that may be about another
+location. A "near_duplicate_of" field names the source, and write_reviews
+stores it in its own column on Sentiment - Reviews.
+
+Anything that may need ops follow-up is never inherited, so its callout comes
+from its own Gemini analysis. Reviews with urgent signals (alerts.urgency) go to
+Gemini, and analyses flagged needs_ops_followup are never used as a source.
+
+Near-duplicates inside one run's new reviews are grouped too. The first review
+goes to Gemini, and the rest inherit from it once it has been analyzed (settle()).
+
+The index is saved to CACHE_DIR, and both workflows keep that file in the
+Actions cache between runs. An entry holds only the signature, the star rating
+and the fields a near-duplicate inherits. No review text is stored. Cached
+reviews that are missing from the index (e.g. after the Actions cache was
+evicted) are signed and added as a run reads them; indexed ones are skipped.
+Every inheritance is also recorded, with its similarity, in the index's audit
+log. The sheet column is the durable record:
+
+    python near_dup.py audit        # review_id <- source review_id (similarity)
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import struct
+import unicodedata
+from pathlib import Path
+
+from config import CACHE_DIR, NEAR_DUP_THRESHOLD
+from alerts import urgency  # after config, which puts lexicon's repo root on sys.path
+from models import Review
+from run_profile import count
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUP_INDEX_PATH = CACHE_DIR / "near_dup_index.json"
+
+SHINGLE_CHARS = 5
+NUM_PERM = 64
+BANDS, ROWS = 8, 8  # candidate threshold ≈ (1/BANDS) ** (1/ROWS) ≈ 0.77, just under NEAR_DUP_THRESHOLD
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures must be comparable across runs
+_rng = random.Random(20251001)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+# Fields copied from the source analysis; the rest are the review's own (see _inherit)
+_INHERITED_FIELDS = ("sentiment", "sentiment_score", "themes")
+# All an index entry keeps of its analysis: what _inherit copies plus what rules a source out
+_INDEXED_FIELDS = (*_INHERITED_FIELDS, "needs_ops_followup")
+
+
+def _normalize_text(text: str) -> str:
+    nfkd = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in nfkd if not unicodedata.combining(c)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", stripped))
+
+
+def signature(text: str) -> tuple[int, ...]:
+    norm = _normalize_text(text)
+    shingles = {norm[i : i + SHINGLE_CHARS] for i in range(max(1, len(norm) - SHINGLE_CHARS + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "big") for s in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH for a, b in _PERMS)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the two texts' shingle sets."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _encode_sig(sig: tuple[int, ...]) -> str:
+    return base64.b64encode(struct.pack(f"<{NUM_PERM}I", *sig)).decode("ascii")
+
+
+def _decode_sig(text: str) -> tuple[int, ...]:
+    return struct.unpack(f"<{NUM_PERM}I", base64.b64decode(text))
+
+
+def _slim(analysis: dict | None) -> dict | None:
+    return None if analysis is None else {k: analysis.get(k) for k in _INDEXED_FIELDS}
+
+
+class NearDupIndex:
+    def __init__(self) -> None:
+        # review_id -> {"sig", "stars", "analysis"}; analysis is None for this run's
+        # not-yet-analyzed group leaders
+        self.entries: dict[str, dict] = {}
+        self.buckets: dict[tuple, list[str]] = {}
+        self.audit: dict[str, dict] = {}  # inheriting review_id -> {"source", "similarity"}
+        self._followers: dict[str, tuple[str, Review, float]] = {}  # review_id -> (leader, review, similarity)
+        self._dirty = False
+
+    # ------------------------------------------------------------------ build
+
+    def _insert(self, rid: str, sig: tuple[int, ...], stars: int, analysis: dict | None) -> None:
+        self.entries[rid] = {"sig": sig, "stars": stars, "analysis": _slim(analysis)}
+        for band in range(BANDS):
+            self.buckets.setdefault((band, sig[band * ROWS : (band + 1) * ROWS]), []).append(rid)
+
+    def add(self, rid: str, review: Review, analysis: dict) -> bool:
+        """Index an analyzed review. Returns False, without signing it again, if it is
+        already indexed with an analysis."""
+        entry = self.entries.get(rid)
+        if entry is not None:
+            if entry["analysis"] is not None:
+                return False
+            entry["analysis"] = _slim(analysis)
+        else:
+            self._insert(rid, signature(review.text), review.star_rating, analysis)
+        self._dirty = True
+        return True
+
+    def _best_match(self, rid: str, sig: tuple[int, ...], stars: int) -> tuple[str, float] | None:
+        candidates = {
+            other
+            for band in range(BANDS)
+            for other in self.buckets.get((band, sig[band * ROWS : (band + 1) * ROWS]), ())
+            if other != rid
+        }
+        best = None
+        for other in candidates:
+            entry = self.entries[other]
+            if entry["stars"] != stars or (entry["analysis"] or {}).get("needs_ops_followup"):
+                continue
+            sim = similarity(sig, entry["sig"])
+            if sim >= NEAR_DUP_THRESHOLD and (best is None or sim > best[1]):
+                best = (other, sim)
+        return best
+
+    # ------------------------------------------------------------------ reuse
+
+    def _inherit(self, rid: str, review: Review, source: str, sim: float) -> dict:
+        analysis = {
+            "review_id": rid,
+            "location": review.place,
+            "star_rating": review.star_rating,
+            **{k: self.entries[source]["analysis"].get(k) for k in _INHERITED_FIELDS},
+            "positive_aspects": [],
+            "negative_aspects": [],
+            "staff_mentioned": [],
+            "representative_quote": review.text.strip() or None,
+            "needs_ops_followup": False,
+            "near_duplicate_of": source,
+        }
+        self.audit[rid] = {"source": source, "similarity": round(sim, 3)}
+        self._dirty = True
+        logger.info("Near-duplicate: %s reuses %s (similarity %.2f)", rid, source, sim)
+        return analysis
+
+    def split(self, pending: list[tuple[str, Review]]) -> tuple[list[dict], list[tuple[str, Review]]]:
+        """Inherit analyses for pending reviews that near-duplicate an analyzed one.
+        Returns (inherited analyses, reviews still to analyze). Pending reviews that
+        near-duplicate another pending one wait for it; see settle(). Likely-urgent
+        reviews always go to Gemini."""
+        inherited: list[dict] = []
+        to_analyze: list[tuple[str, Review]] = []
+        for rid, review in pending:
+            sig = signature(review.text)
+            match = None if urgency(review) else self._best_match(rid, sig, review.star_rating)
+            if match is None:
+                self._insert(rid, sig, review.star_rating, None)
+                to_analyze.append((rid, review))
+            elif self.entries[match[0]]["analysis"] is None:
+                self._followers[rid] = (match[0], review, match[1])
+            else:
+                inherited.append(self._inherit(rid, review, *match))
+        count("near_dup.reused", len(inherited))
+        if self._followers:
+            logger.info("Near-duplicates: %d new reviews wait on a review analyzed this run", len(self._followers))
+        return inherited, to_analyze
+
+    def settle(self, analyses: list[dict], reviews: dict[str, Review]) -> list[dict]:
+        """Index this run's fresh analyses; returns the analyses inherited by waiting near-duplicates.
+        A follower whose leader came back without an analysis, or flagged for ops
+        follow-up, is left for the next run."""
+        for a in analyses:
+            rid = a.get("review_id", "")
+            if rid in reviews:
+                self.add(rid, reviews[rid], a)
+        inherited = [
+            self._inherit(rid, review, leader, sim)
+            for rid, (leader, review, sim) in self._followers.items()
+            if self.entries[leader]["analysis"] is not None
+            and not self.entries[leader]["analysis"].get("needs_ops_followup")
+        ]
+        self._followers.clear()
+        count("near_dup.reused", len(inherited))
+        return inherited
+
+    # ------------------------------------------------------------------ persistence
+
+    @classmethod
+    def load(cls, path: Path = NEAR_DUP_INDEX_PATH) -> "NearDupIndex":
+        index = cls()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return index
+        for rid, e in data.get("entries", {}).items():
+            index._insert(rid, _decode_sig(e["sig"]), e["stars"], e["analysis"])
+        index.audit = data.get("audit", {})
+        logger.info("Near-duplicate index: %d analyzed reviews loaded", len(index.entries))
+        return index
+
+    def save(self, path: Path = NEAR_DUP_INDEX_PATH) -> None:
+        if not self._dirty:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "entries": {
+                rid: {"sig": _encode_sig(e["sig"]), "stars": e["stars"], "analysis": e["analysis"]}
+                for rid, e in self.entries.items() if e["analysis"] is not None
+            },
+            "audit": self.audit,
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+        self._dirty = False
+        logger.info("Saved near-duplicate index: %d reviews, %d reused", len(self.entries), len(self.audit))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate review index")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("audit", help="list reviews that reused another review's analysis")
+    args = parser.parse_args()
+
+    index = NearDupIndex.load()
+    if args.cmd == "audit":
+        for rid, a in sorted(index.audit.items()):
+            print(f"{rid} <- {a['source']} ({a['similarity']:.2f})")
+        print(f"{len(index.audit)} reused analyses, {len(index.entries)} indexed reviews")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Quarter partitions for the raw and analyzed review tabs.
+
+"Reviews (raw)" and "Sentiment - Reviews" are hot tabs. They hold rows published
+on or after hot_cutoff(), which is the start of the previous quarter. Older rows
+live in one tab per quarter, e.g. "Sentiment - Reviews 2025-Q4". Writers route
+old rows straight to their quarter, and `main.py --mode compact` moves rows
+that have aged out of the hot tab. Readers open only the hot tab plus the
+partitions that overlap the requested date range.
+"""
+
+import re
+from datetime import date
+
+_QUARTER_RE = re.compile(r"^(\d{4})-Q([1-4])$")
+
+
+def quarter_of(d: date) -> str:
+    return f"{d.year}-Q{(d.month - 1) // 3 + 1}"
+
+
+def quarter_start(quarter: str) -> date:
+    year, q = _QUARTER_RE.match(quarter).groups()
+    return date(int(year), 3 * (int(q) - 1) + 1, 1)
+
+
+def quarter_end(quarter: str) -> date:
+    start = quarter_start(quarter)
+    nxt = date(start.year + 1, 1, 1) if start.month == 10 else date(start.year, start.month + 3, 1)
+    return date.fromordinal(nxt.toordinal() - 1)
+
+
+def hot_cutoff(today: date | None = None) -> date:
+    """Rows published before this date belong in a quarter partition."""
+    start = quarter_start(quarter_of(today or date.today()))
+    prev_month = start.month - 3
+    return date(start.year - 1, prev_month + 12, 1) if prev_month < 1 else date(start.year, prev_month, 1)
+
+
+def partition_title(base: str, quarter: str) -> str:
+    return f"{base} {quarter}"
+
+
+def row_date(value) -> date | None:
+    """Date from an ISO date/timestamp cell or a review_id's "|YYYY-MM-DD" suffix."""
+    text = str(value or "").rsplit("|", 1)[-1][:10]
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def target_tab(base: str, d: date | None, cutoff: date) -> str:
+    """Hot tab for recent or undated rows, otherwise the row's quarter partition."""
+    if d is None or d >= cutoff:
+        return base
+    return partition_title(base, quarter_of(d))
+
+
+def tabs_for_range(titles: list[str], base: str, since: date | None, until: date | None) -> list[str]:
+    """The existing tabs (hot first, then partitions oldest→newest) that can hold rows in [since, until]."""
+    prefix = base + " "
+    quarters = sorted(
+        t[len(prefix):] for t in titles
+        if t.startswith(prefix) and _QUARTER_RE.match(t[len(prefix):])
+    )
+    picked = [base] if base in titles else []
+    for q in quarters:
+        if since and quarter_end(q) < since:
+            continue
+        if until and quarter_start(q) > until:
+            continue
+        picked.append(partition_title(base, q))
+    return picked
@@ -0,0 +1,132 @@
+"""
+The shape of a batch analysis response, declared once.
+
+REVIEW_SCHEMA and SUMMARY_SCHEMA are OpenAPI-subset schemas in the form
+google-genai accepts as GenerateContentConfig.response_schema. llm.py sends
+RESPONSE_SCHEMA with every batch call, so Gemini's output is constrained to
+it, and decodes the reply with conform() against the same declarations.
+
+conform() walks a parsed JSON value and its schema together. In that single
+pass it checks types, enums and bounds, coerces integral floats to int and ints
+to float, and copies only the declared keys, so every record that leaves it has
+exactly the fields and types below. Anything else raises SchemaError naming the
+offending path (e.g. "reviews[12].sentiment").
+
+The locked prompt describes summary.by_location as an object keyed by
+location. A response schema can't declare free-form keys, so the schema asks
+for a list of {location, ...} entries and the decoder turns it back into the
+mapping (see by_location_mapping()).
+"""
+
+SENTIMENTS = ("positive", "neutral", "negative", "mixed")
+
+
+class SchemaError(ValueError):
+    """The model's JSON parsed but does not match RESPONSE_SCHEMA."""
+
+
+def _obj(properties: dict, nullable: tuple[str, ...] = ()) -> dict:
+    for key in nullable:
+        properties[key] = {**properties[key], "nullable": True}
+    return {
+        "type": "OBJECT",
+        "properties": properties,
+        "required": list(properties),
+        "property_ordering": list(properties),
+    }
+
+
+def _arr(items: dict) -> dict:
+    return {"type": "ARRAY", "items": items}
+
+
+_STR = {"type": "STRING"}
+_INT = {"type": "INTEGER"}
+_NUM = {"type": "NUMBER"}
+_BOOL = {"type": "BOOLEAN"}
+
+# Themes stay free-form strings: the prompt allows a new theme when 3+ reviews share it.
+# llm.py flags anything outside APPROVED_THEMES.
+REVIEW_SCHEMA = _obj({
+    "review_id": _STR,
+    "location": _STR,
+    "star_rating": {"type": "INTEGER", "minimum": 1, "maximum": 5},
+    "sentiment": {"type": "STRING", "enum": list(SENTIMENTS)},
+    "sentiment_score": {"type": "NUMBER", "minimum": -1.0, "maximum": 1.0},
+    "themes": _arr(_STR),
+    "positive_aspects": _arr(_STR),
+    "negative_aspects": _arr(_STR),
+    "staff_mentioned": _arr(_STR),
+    "representative_quote": _STR,
+    "needs_ops_followup": _BOOL,
+}, nullable=("representative_quote",))
+
+SUMMARY_SCHEMA = _obj({
+    "total_reviews": _INT,
+    "by_location": _arr(_obj({
+        "location": _STR,
+        "review_count": _INT,
+        "average_star_rating": _NUM,
+        "average_sentiment_score": _NUM,
+        "top_themes": _arr(_STR),
+    })),
+    "overall_top_themes": _arr(_obj({"theme": _STR, "count": _INT, "sentiment_leaning": _STR})),
+    "top_positive_drivers": _STR,
+    "top_negative_drivers": _STR,
+    "staff_to_recognize": _arr(_obj({"name": _STR, "location": _STR, "mention_count": _INT})),
+    "urgent_callouts": _arr(_obj({"location": _STR, "dedupe_key": _STR, "description": _STR})),
+})
+
+RESPONSE_SCHEMA = _obj({"reviews": _arr(REVIEW_SCHEMA), "summary": SUMMARY_SCHEMA})
+
+
+def conform(value, schema: dict, path: str = "$"):
+    """`value` checked and coerced against `schema`; raises SchemaError on the first mismatch."""
+    if value is None:
+        if schema.get("nullable"):
+            return None
+        raise SchemaError(f"{path}: null where {schema['type'].lower()} expected")
+
+    kind = schema["type"]
+    if kind == "OBJECT":
+        if not isinstance(value, dict):
+            raise SchemaError(f"{path}: expected object, got {type(value).__name__}")
+        out = {}
+        for key, sub in schema["properties"].items():
+            if key not in value:
+                raise SchemaError(f"{path}.{key}: missing")
+            out[key] = conform(value[key], sub, f"{path}.{key}")
+        return out
+    if kind == "ARRAY":
+        if not isinstance(value, list):
+            raise SchemaError(f"{path}: expected array, got {type(value).__name__}")
+        items = schema["items"]
+        return [conform(v, items, f"{path}[{i}]") for i, v in enumerate(value)]
+    if kind == "STRING":
+        if not isinstance(value, str):
+            raise SchemaError(f"{path}: expected string, got {type(value).__name__}")
+        if "enum" in schema and value not in schema["enum"]:
+            raise SchemaError(f"{path}: {value!r} not one of {schema['enum']}")
+        return value
+    if kind == "BOOLEAN":
+        if not isinstance(value, bool):
+            raise SchemaError(f"{path}: expected boolean, got {type(value).__name__}")
+        return value
+
+    # INTEGER / NUMBER — JSON booleans are Python ints, so rule them out explicitly
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise SchemaError(f"{path}: expected {kind.lower()}, got {type(value).__name__}")
+    if kind == "INTEGER":
+        if isinstance(value, float) and not value.is_integer():
+            raise SchemaError(f"{path}: expected integer, got {value}")
+        value = int(value)
+    else:
+        value = float(value)
+    if value < schema.get("minimum", value) or value > schema.get("maximum", value):
+        raise SchemaError(f"{path}: {value} outside [{schema.get('minimum')}, {schema.get('maximum')}]")
+    return value
+
+
+def by_location_mapping(entries: list[dict]) -> dict:
+    """summary.by_location as the rest of the pipeline expects it: location -> stats."""
+    return {e["location"]: {k: v for k, v in e.items() if k != "location"} for e in entries}
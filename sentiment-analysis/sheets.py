@@ -5,17 +5,23 @@ import gspread
 
 from auth import sheets_credentials
 from config import (
+    AGGREGATE_CUBE_TAB,
     APPROVED_THEMES,
     DASHBOARD_TAB,
     LOCATION_HOTSPOT_MIN,
     SHEET_ID,
     RAW_REVIEWS_TAB,
+    RAW_SHEET_IDS,
     SENTIMENT_CURRENT_TAB,
     SENTIMENT_HISTORY_TAB,
     SENTIMENT_REVIEWS_TAB,
     THEME_BREAKDOWN_TAB,
 )
+from cube import REVIEW_TOTAL, AggregateCube
+from partitions import hot_cutoff, partition_title, quarter_of, row_date, target_tab, tabs_for_range
 from models import Review
+from run_profile import count, traced
+from sheets_governor import SheetWrites, authorize  # repo root, on sys.path via config
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +33,12 @@ _HISTORY_HEADERS = [
 
 
 def _client() -> gspread.Client:
-    return gspread.authorize(sheets_credentials())
+    # Every request is paced against the Sheets per-minute quotas and 429s are retried
+    return authorize(sheets_credentials())
+
+
+def _tabs_by_title(sheet: gspread.Spreadsheet) -> dict[str, gspread.Worksheet]:
+    return {ws.title: ws for ws in sheet.worksheets()}
 
 
 def _open_or_create(sheet: gspread.Spreadsheet, name: str, rows: int = 1000, cols: int = 20) -> gspread.Worksheet:
@@ -42,11 +53,19 @@ def _open_or_create(sheet: gspread.Spreadsheet, name: str, rows: int = 1000, col
 # READ
 # ---------------------------------------------------------------------------
 
+@traced("sheets.read_reviews")
 def read_reviews(since: date | None = None, until: date | None = None) -> list[Review]:
-    """Read all reviews from the raw tab, optionally filtered to since <= publishTime <= until."""
+    """Read reviews from the raw tabs of every shard workbook, optionally filtered
+    to since <= publishTime <= until. Only the hot tab and the quarter partitions
+    overlapping the range are opened."""
     gc = _client()
-    ws = gc.open_by_key(SHEET_ID).worksheet(RAW_REVIEWS_TAB)
-    rows = ws.get_all_records()
+    rows = []
+    for sheet_id in RAW_SHEET_IDS:
+        tabs = _tabs_by_title(gc.open_by_key(sheet_id))
+        for title in tabs_for_range(list(tabs), RAW_REVIEWS_TAB, since, until):
+            rows.extend(tabs[title].get_all_records())
+            count("sheets.reads")
+    count("sheets.rows_read", len(rows))
 
     reviews: list[Review] = []
     for row in rows:
@@ -87,6 +106,7 @@ def read_reviews(since: date | None = None, until: date | None = None) -> list[R
 # WRITE — Sentiment - Current
 # ---------------------------------------------------------------------------
 
+@traced("sheets.write_current")
 def write_current(
     review_analyses: list[dict],
     summary: dict,
@@ -174,8 +194,8 @@ def write_current(
     rows.append(["THEME BREAKDOWN BY LOCATION"])
     rows.append(["Location", "Theme", "Review Count"])
     for loc in sorted(theme_by_loc):
-        for theme, count in theme_by_loc[loc].most_common():
-            rows.append([loc, theme, count])
+        for theme, mentions in theme_by_loc[loc].most_common():
+            rows.append([loc, theme, mentions])
     rows.append([])
 
     # --- Staff to recognize ---
@@ -205,6 +225,8 @@ def write_current(
             break
 
     ws.update("A1", rows)
+    count("sheets.writes")
+    count("sheets.rows_written", len(rows))
     logger.info(f"Wrote {len(rows)} rows to '{SENTIMENT_CURRENT_TAB}'")
 
 
@@ -212,6 +234,7 @@ def write_current(
 # WRITE — Sentiment - History (append-only)
 # ---------------------------------------------------------------------------
 
+@traced("sheets.append_history")
 def append_history(
     summary: dict,
     period_start: date,
@@ -219,23 +242,29 @@ def append_history(
     text_review_count: int,
     empty_count: int,
     run_date: date | None = None,
+    cube: AggregateCube | None = None,
 ) -> None:
-    """Append one Overall row + one row per location to the history tab."""
+    """Append one Overall row + one row per location to the history tab. Given the
+    persisted aggregate cube, counts, averages and themes come from its cells for the
+    period's months instead of the summary."""
     if run_date is None:
         run_date = date.today()
 
     gc = _client()
     sheet = gc.open_by_key(SHEET_ID)
     ws = _open_or_create(sheet, SENTIMENT_HISTORY_TAB)
+    writes = SheetWrites(sheet)
 
     # Write headers if sheet is empty or first row doesn't match (e.g. old snake_case headers)
     existing = ws.get_all_values()
+    count("sheets.reads")
+    count("sheets.rows_read", len(existing))
     if not existing or existing[0] != _HISTORY_HEADERS:
         if not existing:
-            ws.append_row(_HISTORY_HEADERS)
+            writes.append(SENTIMENT_HISTORY_TAB, [_HISTORY_HEADERS])
             existing = [_HISTORY_HEADERS]
         else:
-            ws.update("A1", [_HISTORY_HEADERS])
+            writes.update(SENTIMENT_HISTORY_TAB, "A1", [_HISTORY_HEADERS])
             existing[0] = _HISTORY_HEADERS
 
     # Skip if this period already has an Overall row — prevents duplicates on backfill reruns
@@ -251,15 +280,20 @@ def append_history(
                 if len(row) > max(ps_i, pe_i, sc_i)
             ):
                 logger.info("History already has %s → %s — skipping.", period_start, period_end)
+                writes.flush()
                 return
         except ValueError:
             pass  # column not found, proceed normally
 
     by_loc: dict = summary.get("by_location", {})
     total = summary.get("total_reviews", 0)
+    all_themes: list[dict] = summary.get("overall_top_themes", [])
+    if cube is not None:
+        start, end = period_start.strftime("%Y-%m"), period_end.strftime("%Y-%m")
+        by_loc, all_themes = cube.location_stats(start, end), cube.theme_stats(start, end)
+        total = cube.review_count(start, end)
     urgent_count = len(summary.get("urgent_callouts", []))
 
-    all_themes: list[dict] = summary.get("overall_top_themes", [])
     top_positive = ", ".join(
         t["theme"] for t in all_themes if t.get("sentiment_leaning") in ("positive", "mixed")
     )[:3 * 25]  # rough cap
@@ -278,11 +312,11 @@ def append_history(
         avg_star = avg_sentiment = 0
 
     # Overall row
-    ws.append_row([
+    writes.append(SENTIMENT_HISTORY_TAB, [[
         str(run_date), str(period_start), str(period_end), "Overall",
         total, avg_star, avg_sentiment,
         top_positive, top_negative, urgent_count,
-    ])
+    ]])
 
     # Per-location rows
     urgent_by_loc: dict[str, int] = {}
@@ -292,14 +326,16 @@ def append_history(
 
     for loc, data in sorted(by_loc.items()):
         loc_themes = ", ".join(data.get("top_themes", [])[:3])
-        ws.append_row([
+        writes.append(SENTIMENT_HISTORY_TAB, [[
             str(run_date), str(period_start), str(period_end), loc,
             data.get("review_count", 0),
             round(data.get("average_star_rating", 0), 2),
             round(data.get("average_sentiment_score", 0), 2),
             loc_themes, "", urgent_by_loc.get(loc, 0),
-        ])
+        ]])
 
+    # Header, Overall and per-location rows are adjacent appends — one request
+    writes.flush()
     logger.info(f"Appended history: Overall + {len(by_loc)} locations")
 
 
@@ -312,69 +348,108 @@ _REVIEWS_HEADERS = [
     "sentiment", "sentiment_score",
     "themes", "positive_aspects", "negative_aspects",
     "staff_mentioned", "representative_quote", "needs_ops_followup",
+    "near_duplicate_of", "fast_path",
 ]
 
 
-def write_reviews(review_analyses: list[dict], run_date: date | None = None) -> None:
+@traced("sheets.write_reviews")
+def write_reviews(review_analyses: list[dict], run_date: date | None = None) -> list[dict]:
     """Append new review analyses to the Sentiment - Reviews tab, skipping any
-    review_id already present. Safe to call repeatedly — idempotent per review_id."""
+    review_id already present. Safe to call repeatedly — idempotent per review_id.
+    Returns the analyses actually appended."""
     if run_date is None:
         run_date = date.today()
 
     gc = _client()
     sheet = gc.open_by_key(SHEET_ID)
-    ws = _open_or_create(sheet, SENTIMENT_REVIEWS_TAB, rows=2000, cols=len(_REVIEWS_HEADERS))
+    tabs = _tabs_by_title(sheet)
 
-    # Write header if tab is empty
-    existing = ws.get_all_values()
-    if not existing:
-        ws.append_row(_REVIEWS_HEADERS)
-        existing_ids: set[str] = set()
-    else:
-        existing_ids = {row[0] for row in existing[1:] if row}
-
-    new_rows: list[list] = []
+    # Route each row to the hot tab or its quarter partition
+    cutoff = hot_cutoff(run_date)
+    by_tab: dict[str, list[dict]] = {}
     for r in review_analyses:
-        rid = r.get("review_id", "")
-        if rid in existing_ids:
+        by_tab.setdefault(target_tab(SENTIMENT_REVIEWS_TAB, row_date(r.get("review_id", "")), cutoff), []).append(r)
+
+    # review_ids already stored: the hot tab (rows not compacted yet) plus each target partition.
+    # Only the id column and the header row are read, not whole tabs.
+    existing_ids: set[str] = set()
+    headers: dict[str, list[str]] = {}
+    for title in dict.fromkeys([SENTIMENT_REVIEWS_TAB, *by_tab]):
+        if title in tabs:
+            ids, header = tabs[title].batch_get(["A:A", "1:1"])
+            count("sheets.reads")
+            count("sheets.rows_read", len(ids))
+            existing_ids.update(row[0] for row in ids[1:] if row)
+            if ids:
+                headers[title] = header[0] if header else []
+
+    appended: list[dict] = []
+    for title, analyses in by_tab.items():
+        new_rows: list[list] = []
+        new_analyses: list[dict] = []
+        for r in analyses:
+            rid = r.get("review_id", "")
+            if rid in existing_ids:
+                continue
+            existing_ids.add(rid)
+            new_analyses.append(r)
+            publish_date = rid.split("|")[-1] if "|" in rid else ""
+            new_rows.append([
+                rid,
+                r.get("location", ""),
+                r.get("star_rating", ""),
+                publish_date,
+                r.get("sentiment", ""),
+                r.get("sentiment_score", ""),
+                ", ".join(r.get("themes", [])),
+                " | ".join(r.get("positive_aspects", [])),
+                " | ".join(r.get("negative_aspects", [])),
+                ", ".join(r.get("staff_mentioned", [])),
+                r.get("representative_quote", "") or "",
+                r.get("needs_ops_followup", False),
+                r.get("near_duplicate_of", ""),
+                r.get("fast_path", False),
+            ])
+        if not new_rows:
             continue
-        publish_date = rid.split("|")[-1] if "|" in rid else ""
-        new_rows.append([
-            rid,
-            r.get("location", ""),
-            r.get("star_rating", ""),
-            publish_date,
-            r.get("sentiment", ""),
-            r.get("sentiment_score", ""),
-            ", ".join(r.get("themes", [])),
-            " | ".join(r.get("positive_aspects", [])),
-            " | ".join(r.get("negative_aspects", [])),
-            ", ".join(r.get("staff_mentioned", [])),
-            r.get("representative_quote", "") or "",
-            r.get("needs_ops_followup", False),
-        ])
-
-    if new_rows:
+        ws = tabs.get(title) or _open_or_create(sheet, title, rows=2000, cols=len(_REVIEWS_HEADERS))
+        if title not in headers:
+            new_rows.insert(0, _REVIEWS_HEADERS)
+        elif len(headers[title]) < len(_REVIEWS_HEADERS):
+            # Tab predates a newer column (e.g. fast_path): extend its header first
+            ws.update([_REVIEWS_HEADERS], "A1")
+            count("sheets.writes")
         ws.append_rows(new_rows)
+        count("sheets.writes")
+        count("sheets.rows_written", len(new_rows))
+        appended.extend(new_analyses)
+
+    if appended:
         logger.info("Appended %d new reviews to '%s' (%d already existed).",
-                    len(new_rows), SENTIMENT_REVIEWS_TAB, len(review_analyses) - len(new_rows))
+                    len(appended), SENTIMENT_REVIEWS_TAB, len(review_analyses) - len(appended))
     else:
         logger.info("No new reviews to append to '%s' — all %d already present.",
                     SENTIMENT_REVIEWS_TAB, len(review_analyses))
+    return appended
 
 
-def read_analyzed_reviews() -> dict[str, dict]:
-    """Load previously stored per-review analyses from Sentiment - Reviews tab.
+@traced("sheets.read_analyzed_reviews")
+def read_analyzed_reviews(since: date | None = None, until: date | None = None) -> dict[str, dict]:
+    """Load previously stored per-review analyses from Sentiment - Reviews (the hot
+    tab plus the quarter partitions overlapping [since, until]; all of them by default).
     Returns {review_id: analysis_dict} so callers can skip re-analyzing known reviews."""
     gc = _client()
-    sheet = gc.open_by_key(SHEET_ID)
-    try:
-        ws = sheet.worksheet(SENTIMENT_REVIEWS_TAB)
-    except gspread.WorksheetNotFound:
+    tabs = _tabs_by_title(gc.open_by_key(SHEET_ID))
+    titles = tabs_for_range(list(tabs), SENTIMENT_REVIEWS_TAB, since, until)
+    if not titles:
         logger.info("No '%s' tab found — starting with empty cache.", SENTIMENT_REVIEWS_TAB)
         return {}
 
-    rows = ws.get_all_records()
+    rows = []
+    for title in titles:
+        rows.extend(tabs[title].get_all_records())
+        count("sheets.reads")
+    count("sheets.rows_read", len(rows))
     cache: dict[str, dict] = {}
     for row in rows:
         rid = str(row.get("review_id", "")).strip()
@@ -383,6 +458,9 @@ def read_analyzed_reviews() -> dict[str, dict]:
         needs_followup = row.get("needs_ops_followup", False)
         if isinstance(needs_followup, str):
             needs_followup = needs_followup.strip().lower() == "true"
+        fast_path = row.get("fast_path", False)
+        if isinstance(fast_path, str):
+            fast_path = fast_path.strip().lower() == "true"
         cache[rid] = {
             "review_id": rid,
             "location": str(row.get("location", "")),
@@ -396,27 +474,130 @@ def read_analyzed_reviews() -> dict[str, dict]:
             "representative_quote": str(row.get("representative_quote", "")) or None,
             "needs_ops_followup": needs_followup,
         }
+        if fast_path:
+            cache[rid]["fast_path"] = True
 
     logger.info("Loaded %d cached review analyses from '%s'", len(cache), SENTIMENT_REVIEWS_TAB)
     return cache
 
 
 # ---------------------------------------------------------------------------
-# WRITE — Theme Sentiment Breakdown (formula-based, auto-updates from Reviews tab)
+# COMPACTION — move aged rows out of the hot tabs into quarter partitions
+# ---------------------------------------------------------------------------
+
+def _compact_tab(
+    sheet: gspread.Spreadsheet, base: str, key_col: str, date_col: str, cutoff: date,
+    date_format_col_a: bool = False,
+) -> int:
+    tabs = _tabs_by_title(sheet)
+    ws = tabs.get(base)
+    if ws is None:
+        return 0
+    # Unformatted values so numbers, booleans and date serials keep their types in the partitions
+    values = ws.get_all_values(value_render_option="UNFORMATTED_VALUE")
+    count("sheets.reads")
+    count("sheets.rows_read", len(values))
+    if len(values) < 2:
+        return 0
+
+    header, rows = values[0], values[1:]
+    key_i = header.index(key_col) if key_col in header else 0
+    date_i = header.index(date_col) if date_col in header else None
+
+    keep: list[list] = []
+    moved: dict[str, list[list]] = {}
+    moved_rows: list[int] = []  # 0-based sheet row indexes; the header is row 0
+    for i, row in enumerate(rows, 1):
+        d = row_date(row[date_i]) if date_i is not None and date_i < len(row) else None
+        if d is None and key_i < len(row):
+            d = row_date(row[key_i])  # review_id carries the publish date as a suffix
+        if d is not None and d < cutoff:
+            moved.setdefault(quarter_of(d), []).append(row)
+            moved_rows.append(i)
+        else:
+            keep.append(row)
+    if not moved:
+        logger.info("'%s': nothing older than %s to compact", base, cutoff)
+        return 0
+
+    # Partitions first, then the hot tab — an interrupted run leaves duplicates, never gaps
+    for quarter, qrows in sorted(moved.items()):
+        title = partition_title(base, quarter)
+        part = tabs.get(title)
+        if part is None:
+            part = sheet.add_worksheet(title, rows=len(qrows) + 1, cols=len(header))
+            existing: set = set()
+            qrows = [header] + qrows
+            if date_format_col_a:
+                part.format("A2:A", {"numberFormat": {"type": "DATE", "pattern": "yyyy-mm-dd"}})
+        else:
+            existing = set(part.col_values(key_i + 1))
+            count("sheets.reads")
+            qrows = [r for r in qrows if key_i >= len(r) or r[key_i] not in existing]
+        if qrows:
+            part.append_rows(qrows, value_input_option="RAW")
+            count("sheets.writes")
+            count("sheets.rows_written", len(qrows))
+
+    # Then delete the moved rows from the hot tab in one batchUpdate, which Sheets applies
+    # all-or-nothing: kept rows are never rewritten, rows appended since the read stay put,
+    # and the deleted rows give their cells back (the spreadsheet-wide cap is on grid size).
+    # Ranges go bottom-up so earlier deletions don't shift later ones.
+    ranges: list[list[int]] = []
+    for i in moved_rows:
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i, i + 1])
+    sheet.batch_update({"requests": [
+        {"deleteDimension": {"range": {
+            "sheetId": ws.id, "dimension": "ROWS", "startIndex": start, "endIndex": end,
+        }}}
+        for start, end in reversed(ranges)
+    ]})
+    count("sheets.writes")
+    n_moved = sum(len(v) for v in moved.values())
+    logger.info("'%s': moved %d rows into %d partition(s), %d stay hot", base, n_moved, len(moved), len(keep))
+    return n_moved
+
+
+@traced("sheets.compact_partitions")
+def compact_partitions(today: date | None = None) -> int:
+    """Move rows published before hot_cutoff() out of the raw tab of every shard
+    workbook and out of Sentiment - Reviews. Returns the number of rows moved."""
+    cutoff = hot_cutoff(today)
+    gc = _client()
+    moved = 0
+    for sheet_id in RAW_SHEET_IDS:
+        moved += _compact_tab(gc.open_by_key(sheet_id), RAW_REVIEWS_TAB, "dedupe_key", "publishTime", cutoff,
+                              date_format_col_a=True)
+    moved += _compact_tab(gc.open_by_key(SHEET_ID), SENTIMENT_REVIEWS_TAB, "review_id", "publish_date", cutoff)
+    return moved
+
+
+# ---------------------------------------------------------------------------
+# WRITE — Theme Sentiment Breakdown (live COUNTIFS or materialized counts)
 # ---------------------------------------------------------------------------
 
-def write_theme_breakdown() -> None:
+@traced("sheets.write_theme_breakdown")
+def write_theme_breakdown(cube: AggregateCube | None = None) -> None:
     """
-    Write a formula-based tab that shows positive/negative/neutral/mixed counts
-    per theme, pulling live from the Sentiment - Reviews tab via COUNTIFS.
+    Write a tab that shows positive/negative/neutral/mixed counts per theme.
     Cell B1 is a month filter (type YYYY-MM to scope to one month, leave blank for all time).
-    Formulas are visible in each cell so the source is fully transparent.
+
+    With no cube, every cell is a COUNTIFS pulling live from the Sentiment - Reviews
+    tab, so the source is fully transparent. Given the aggregate cube of all stored
+    analyses, counts are written as plain values — see _write_theme_breakdown_values.
     """
     gc = _client()
     sheet = gc.open_by_key(SHEET_ID)
     ws = _open_or_create(sheet, THEME_BREAKDOWN_TAB, rows=22, cols=7)
     ws.clear()
 
+    if cube is not None:
+        _write_theme_breakdown_values(ws, cube)
+        return
+
     # Column positions in Sentiment - Reviews
     # A=review_id, B=location, C=star_rating, D=publish_date,
     # E=sentiment, F=sentiment_score, G=themes
@@ -461,6 +642,93 @@ def write_theme_breakdown() -> None:
     logger.info(f"Wrote theme sentiment breakdown formulas to '{THEME_BREAKDOWN_TAB}'")
 
 
+_BREAKDOWN_SENTIMENTS = ["positive", "negative", "neutral", "mixed"]
+
+
+def _write_theme_breakdown_values(ws: gspread.Worksheet, cube: AggregateCube) -> None:
+    """
+    Materialized breakdown: a month × theme slice table in columns I:M holds
+    precomputed counts, and the main table resolves the B1 month filter with a
+    VLOOKUP into it instead of wildcard COUNTIFS over the Reviews tab.
+    """
+    slices = cube.theme_slices(_BREAKDOWN_SENTIMENTS)
+    slice_rows: list[list] = [["Slice (month|theme)", *[s.capitalize() for s in _BREAKDOWN_SENTIMENTS]]]
+    for key in sorted(slices):
+        slice_rows.append([key, *slices[key]])
+
+    slice_key = 'IF($B$1="","ALL",TEXT($B$1,"YYYY-MM"))&"|"&$A{row}'
+    rows: list[list] = [
+        ["Filter by month (YYYY-MM, leave blank for all time):", "", "", "", "", "", ""],
+        ["", "", "", "", "", "", ""],
+        ["Theme", "Positive", "Negative", "Neutral", "Mixed", "Total Mentioning", "% Neg or Mixed"],
+    ]
+    for i, theme in enumerate(APPROVED_THEMES):
+        row_num = i + 4
+        key = slice_key.format(row=row_num)
+        rows.append([
+            theme,
+            *[f"=IFERROR(VLOOKUP({key},$I:$M,{col},FALSE),0)" for col in range(2, 6)],
+            f"=SUM(B{row_num}:E{row_num})",
+            f'=IF(F{row_num}=0,"",TEXT((C{row_num}+E{row_num})/F{row_num},"0%"))',
+        ])
+
+    # values.update doesn't grow the grid — size it for the slice table first
+    ws.resize(rows=max(len(rows), len(slice_rows) + 2), cols=13)
+    ws.batch_update(
+        [
+            {"range": "A1", "values": rows},
+            {"range": "I3", "values": slice_rows},
+        ],
+        value_input_option="USER_ENTERED",
+    )
+    logger.info(
+        "Wrote materialized theme breakdown (%d slices from %d reviews) to '%s'",
+        len(slice_rows) - 1, cube.review_count(), THEME_BREAKDOWN_TAB,
+    )
+
+
+# ---------------------------------------------------------------------------
+# AGGREGATE CUBE — persisted cells in a hidden tab (both workflows can write it)
+# ---------------------------------------------------------------------------
+
+@traced("sheets.read_cube")
+def read_cube() -> AggregateCube | None:
+    """The persisted aggregate cube, or None if it has never been saved."""
+    gc = _client()
+    ws = _tabs_by_title(gc.open_by_key(SHEET_ID)).get(AGGREGATE_CUBE_TAB)
+    if ws is None:
+        return None
+    rows = ws.get_all_values(value_render_option="UNFORMATTED_VALUE")
+    count("sheets.reads")
+    count("sheets.rows_read", len(rows))
+    return AggregateCube.from_rows(rows)
+
+
+@traced("sheets.write_cube")
+def write_cube(cube: AggregateCube) -> None:
+    """Save the cube's cells to the hidden aggregate cube tab. Rows are overwritten in
+    place, with any left over from a larger cube blanked, rather than cleared first —
+    a failed write leaves the previous cube readable."""
+    gc = _client()
+    sheet = gc.open_by_key(SHEET_ID)
+    rows = cube.to_rows()
+    ws = _tabs_by_title(sheet).get(AGGREGATE_CUBE_TAB)
+    if ws is None:
+        ws = sheet.add_worksheet(AGGREGATE_CUBE_TAB, rows=len(rows), cols=len(rows[0]))
+        sheet.batch_update({"requests": [{"updateSheetProperties": {
+            "properties": {"sheetId": ws.id, "hidden": True}, "fields": "hidden",
+        }}]})
+        count("sheets.writes", 2)
+    elif ws.row_count < len(rows):
+        ws.resize(rows=len(rows))  # values.update doesn't grow the grid
+        count("sheets.writes")
+    padding = [[""] * len(rows[0])] * (ws.row_count - len(rows))
+    ws.update(rows + padding, "A1", value_input_option="RAW")
+    count("sheets.writes")
+    count("sheets.rows_written", len(rows))
+    logger.info("Saved aggregate cube (%d cells) to '%s'", len(rows) - 1, AGGREGATE_CUBE_TAB)
+
+
 # ---------------------------------------------------------------------------
 # WRITE — Formula Dashboard (one-time setup; formulas auto-update from Reviews tab)
 # ---------------------------------------------------------------------------
@@ -484,6 +752,7 @@ _THEME_SHORT = {
 _HOTSPOT_THEMES = [th for th in APPROVED_THEMES if th not in ("general_positive", "general_negative")]
 
 
+@traced("sheets.setup_formula_dashboard")
 def setup_formula_dashboard() -> None:
     """
     Write a formula-driven Dashboard tab. Run once to set up — formulas auto-update
@@ -841,6 +1110,7 @@ def setup_formula_dashboard() -> None:
 # WRITE — Dashboard (exec-ready, formatted, PDF target)
 # ---------------------------------------------------------------------------
 
+@traced("sheets.write_dashboard")
 def write_dashboard(
     review_analyses: list[dict],
     summary: dict,
@@ -849,8 +1119,12 @@ def write_dashboard(
     empty_count: int,
     dup_count: int,
     run_date: date | None = None,
+    cube: AggregateCube | None = None,
 ) -> None:
-    """Write a formatted exec-ready Dashboard tab. This is the PDF export target."""
+    """Write a formatted exec-ready Dashboard tab. This is the PDF export target.
+    Given the persisted aggregate cube, the sentiment split, theme table and hotspot
+    counts come from its cells for the period's months; quotes still come from
+    review_analyses."""
     from collections import Counter, defaultdict
 
     if run_date is None:
@@ -887,41 +1161,54 @@ def write_dashboard(
     else:
         avg_star = avg_sentiment = 0
 
-    sc = Counter(r.get("sentiment", "") for r in review_analyses)
-    n = len(review_analyses) or 1
-    pct_pos    = f"{round(sc['positive'] / n * 100)}%"
-    pct_neu    = f"{round((sc['neutral'] + sc['mixed']) / n * 100)}%"
-    pct_neg_ov = f"{round(sc['negative'] / n * 100)}%"
-
     theme_pos: Counter = Counter()
     theme_neg: Counter = Counter()
     theme_total: Counter = Counter()
+    loc_theme_neg: Counter = Counter()  # (location, theme) -> strictly negative reviews
+    quotes: dict[tuple[str, str], str] = {}
     for r in review_analyses:
-        s = r.get("sentiment", "")
-        for t in r.get("themes", []):
-            theme_total[t] += 1
-            if s == "positive":
-                theme_pos[t] += 1
-            elif s in ("negative", "mixed"):
-                theme_neg[t] += 1
-
-    # Location hotspots: (location, theme) with >= LOCATION_HOTSPOT_MIN neg/mixed reviews
-    loc_theme_neg: dict = defaultdict(list)
-    for r in review_analyses:
-        if r.get("sentiment") == "negative":  # strictly negative only — mixed/positive don't count
-            loc = r.get("location", "")
+        if r.get("sentiment") == "negative":
+            for t in r.get("themes", []):
+                if r.get("representative_quote"):
+                    quotes.setdefault((r.get("location", ""), t), r["representative_quote"])
+
+    if cube is not None:
+        counts = cube.sentiment_counts(period_start.strftime("%Y-%m"), period_end.strftime("%Y-%m"))
+        sc = sum((c for (_, t), c in counts.items() if t == REVIEW_TOTAL), Counter())
+        n = sum(sc.values()) or 1
+        for (loc, t), c in counts.items():
+            if t == REVIEW_TOTAL:
+                continue
+            theme_total[t] += sum(c.values())
+            theme_pos[t] += c["positive"]
+            theme_neg[t] += c["negative"] + c["mixed"]
+            loc_theme_neg[(loc, t)] += c["negative"]
+    else:
+        sc = Counter(r.get("sentiment", "") for r in review_analyses)
+        n = len(review_analyses) or 1
+        for r in review_analyses:
+            s = r.get("sentiment", "")
             for t in r.get("themes", []):
-                loc_theme_neg[(loc, t)].append(r)
+                theme_total[t] += 1
+                if s == "positive":
+                    theme_pos[t] += 1
+                elif s in ("negative", "mixed"):
+                    theme_neg[t] += 1
+                if s == "negative":  # strictly negative only — mixed/positive don't count
+                    loc_theme_neg[(r.get("location", ""), t)] += 1
+    pct_pos    = f"{round(sc['positive'] / n * 100)}%"
+    pct_neu    = f"{round((sc['neutral'] + sc['mixed']) / n * 100)}%"
+    pct_neg_ov = f"{round(sc['negative'] / n * 100)}%"
 
+    # Location hotspots: (location, theme) with >= LOCATION_HOTSPOT_MIN negative reviews
     _HOTSPOT_VALID = set(APPROVED_THEMES) - {"general_negative", "general_positive"}
     hotspots = []
-    for (loc, theme), reviews in loc_theme_neg.items():
-        if len(reviews) >= LOCATION_HOTSPOT_MIN and theme in _HOTSPOT_VALID:
-            qr = next((r for r in reviews if r.get("representative_quote")), reviews[0])
-            q = (qr.get("representative_quote") or "")[:120]
+    for (loc, theme), neg_count in loc_theme_neg.items():
+        if neg_count >= LOCATION_HOTSPOT_MIN and theme in _HOTSPOT_VALID:
+            q = quotes.get((loc, theme), "")[:120]
             hotspots.append({
                 "location": loc, "theme": theme,
-                "count": len(reviews),
+                "count": neg_count,
                 "quote": f'"{q}"' if q else "",
             })
     hotspots.sort(key=lambda x: x["count"], reverse=True)
@@ -963,9 +1250,9 @@ def write_dashboard(
     marks["themes_hdr"] = rn(); push("TOP THEMES")
     marks["themes_col"] = rn(); push("Theme", "Reviews Mentioning", "Positive", "Negative / Mixed", "% Neg or Mixed", "")
     marks["themes_data_start"] = rn()
-    for theme, count in sorted(theme_total.items(), key=lambda x: x[1], reverse=True):
+    for theme, mentions in sorted(theme_total.items(), key=lambda x: x[1], reverse=True):
         pos = theme_pos[theme]; neg = theme_neg[theme]
-        push(theme, count, pos, neg, f"{round(neg / count * 100)}%" if count else "")
+        push(theme, mentions, pos, neg, f"{round(neg / mentions * 100)}%" if mentions else "")
     marks["themes_data_end"] = rn() - 1
     push()
 
@@ -1033,6 +1320,8 @@ def write_dashboard(
     # ── Write values ──────────────────────────────────────────────────────
     # RAW prevents Sheets from converting "6%" → 0.06 or "2026-04-03" → serial number
     ws.update("A1", rows, value_input_option="RAW")
+    count("sheets.writes")
+    count("sheets.rows_written", len(rows))
 
     # ── Batch formatting ──────────────────────────────────────────────────
     sid = ws.id
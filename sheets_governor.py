@@ -0,0 +1,179 @@
+"""
+Quota governor for all Google Sheets traffic from the weekly fetcher (reviews.py)
+and the sentiment pipeline (sentiment-analysis/sheets.py).
+
+The Sheets API allows a fixed number of read and write requests per minute per
+user, and the service account counts as one user. Bursts used to trip 429s, and
+gspread then failed the run. Both entry points now build their client with
+authorize() below. The client's GovernedHTTPClient sends every request through
+one QuotaGovernor per process, which:
+
+  * paces reads and writes separately against a sliding one-minute window
+    (SHEETS_READS_PER_MINUTE / SHEETS_WRITES_PER_MINUTE, default 60 each);
+  * retries 429, 408 and 5xx responses with exponential backoff and jitter,
+    honouring Retry-After when the API sends one.
+
+SheetWrites is a write-behind buffer for one spreadsheet. Queued appends and
+range updates go out on flush(). A run of adjacent appends to the same tab
+becomes one values.append, and a run of adjacent range updates becomes one
+values.batchUpdate.
+
+fake_sheets.py is an in-memory Sheets service with the same quotas. Run
+`python fake_sheets.py` to exercise the governor and the coalescing against it.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import gspread
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from gspread.utils import absolute_range_name
+
+from run_profile import count
+
+READS_PER_MINUTE = int(os.getenv("SHEETS_READS_PER_MINUTE", "60"))
+WRITES_PER_MINUTE = int(os.getenv("SHEETS_WRITES_PER_MINUTE", "60"))
+MAX_ATTEMPTS = 8
+BASE_DELAY_S = 2.0
+MAX_DELAY_S = 64.0
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# POST endpoints that only read
+_READ_POSTS = (":batchGetByDataFilter", ":getByDataFilter")
+
+
+class RateWindow:
+    """At most `limit` acquisitions in any `window_s` seconds."""
+
+    def __init__(self, limit, window_s=60.0, clock=time.monotonic, sleep=time.sleep):
+        self.limit = limit
+        self.window_s = window_s
+        self.clock = clock
+        self.sleep = sleep
+        self.stamps = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot, sleeping until one frees up. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                while self.stamps and now - self.stamps[0] >= self.window_s:
+                    self.stamps.popleft()
+                if len(self.stamps) < self.limit:
+                    self.stamps.append(now)
+                    return waited
+                delay = self.window_s - (now - self.stamps[0])
+            self.sleep(delay)
+            waited += delay
+
+
+class QuotaGovernor:
+    def __init__(self, reads_per_minute=READS_PER_MINUTE, writes_per_minute=WRITES_PER_MINUTE,
+                 clock=time.monotonic, sleep=time.sleep, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY_S):
+        self.windows = {
+            "read": RateWindow(reads_per_minute, clock=clock, sleep=sleep),
+            "write": RateWindow(writes_per_minute, clock=clock, sleep=sleep),
+        }
+        self.sleep = sleep
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+
+    def acquire(self, kind):
+        waited = self.windows[kind].acquire()
+        count(f"sheets.{kind}_requests")
+        if waited:
+            count("sheets.throttled_s", waited)
+
+    def backoff(self, attempt, retry_after=None):
+        if retry_after:
+            delay = float(retry_after)
+        else:
+            delay = min(MAX_DELAY_S, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+        count("sheets.retries")
+        self.sleep(delay)
+
+
+# One governor per process — every client built by authorize() shares it.
+GOVERNOR = QuotaGovernor()
+
+
+def request_kind(method, endpoint):
+    if method.lower() == "get" or endpoint.endswith(_READ_POSTS):
+        return "read"
+    return "write"
+
+
+class GovernedHTTPClient(HTTPClient):
+    """gspread HTTP client that paces every request through `governor` and retries quota errors."""
+
+    governor = GOVERNOR
+
+    def request(self, method, endpoint, *args, **kwargs):
+        kind = request_kind(method, endpoint)
+        for attempt in range(1, self.governor.max_attempts + 1):
+            self.governor.acquire(kind)
+            try:
+                return super().request(method, endpoint, *args, **kwargs)
+            except APIError as e:
+                if e.code not in RETRYABLE_STATUS or attempt == self.governor.max_attempts:
+                    raise
+                if e.code == 429:
+                    count("sheets.rate_limited")
+                self.governor.backoff(attempt, e.response.headers.get("Retry-After"))
+
+
+def authorize(credentials, session=None, http_client=GovernedHTTPClient):
+    """gspread.authorize() with the governed HTTP client."""
+    if session is not None:
+        return gspread.Client(auth=credentials, session=session, http_client=http_client)
+    return gspread.authorize(credentials, http_client=http_client)
+
+
+class SheetWrites:
+    """Write-behind buffer for one spreadsheet; see the module docstring for how it coalesces."""
+
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.pending = []  # (op, tab title, range or None, rows, value_input_option)
+
+    def append(self, title, rows, value_input_option="RAW"):
+        self.pending.append(("append", title, None, [list(r) for r in rows], value_input_option))
+
+    def update(self, title, range_name, rows, value_input_option="RAW"):
+        self.pending.append(("update", title, range_name, [list(r) for r in rows], value_input_option))
+
+    def _groups(self):
+        groups = []
+        for op, title, range_name, rows, vio in self.pending:
+            last = groups[-1] if groups else None
+            if op == "append" and last and last[0] == "append" and last[1] == title and last[2] == vio:
+                last[3].extend(rows)
+            elif op == "update" and last and last[0] == "update" and last[2] == vio:
+                last[3].append({"range": absolute_range_name(title, range_name), "values": rows})
+            elif op == "append":
+                groups.append(["append", title, vio, list(rows)])
+            else:
+                groups.append(["update", title, vio, [{"range": absolute_range_name(title, range_name), "values": rows}]])
+        return groups
+
+    def flush(self):
+        """Send everything queued; returns the number of API requests made."""
+        groups = self._groups()
+        self.pending = []
+        for op, title, vio, payload in groups:
+            if op == "append":
+                self.spreadsheet.values_append(
+                    absolute_range_name(title), {"valueInputOption": vio}, {"values": payload},
+                )
+                count("sheets.rows_written", len(payload))
+            else:
+                self.spreadsheet.values_batch_update({"valueInputOption": vio, "data": payload})
+                count("sheets.rows_written", sum(len(d["values"]) for d in payload))
+            count("sheets.writes")
+        return len(groups)
@@ -0,0 +1,219 @@
+"""
+Batched, retrying Slack delivery for incoming webhooks.
+
+Messages are queued during a run (add()) and delivered once at the end (flush()):
+per-location messages are packed into as few Block Kit payloads as Slack's
+limits allow, payloads are sent on a small thread pool, 429s honour Retry-After,
+and 5xx/network errors are retried with exponential backoff. A slow or failing
+Slack API costs at most the flush at the very end of the run.
+
+LocalWebhook is an in-process stand-in for a Slack incoming webhook (records
+payloads, can inject 429/500s). `python slack_queue.py` exercises the queue
+against it and then asserts packing, Retry-After, 5xx backoff and give-up
+behaviour (check()).
+"""
+
+import json
+import threading
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+from run_profile import count, traced
+
+# Slack limits: 50 blocks per message, 3000 chars per section text. The byte cap
+# keeps payloads well under what incoming webhooks accept.
+MAX_BLOCKS = 50
+MAX_SECTION_CHARS = 3000
+MAX_PAYLOAD_BYTES = 35_000
+
+
+def _section(text: str) -> dict:
+    if len(text) > MAX_SECTION_CHARS:
+        text = text[: MAX_SECTION_CHARS - 1] + "…"
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+class SlackQueue:
+    def __init__(self, webhook_url, max_workers=2, max_attempts=5, timeout=15, base_delay=1.0, sleep=time.sleep):
+        self.webhook_url = webhook_url
+        self.sleep = sleep
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.messages = []  # list of (fallback_text, blocks)
+
+    def add(self, text, blocks=None):
+        """Queue one message. Without blocks, the text becomes a single mrkdwn section."""
+        self.messages.append((text, blocks or [_section(text)]))
+
+    def pack(self):
+        """Group queued messages into payloads, keeping message order and each message whole."""
+        payloads, blocks, texts, size = [], [], [], 0
+        for text, msg_blocks in self.messages:
+            msg_blocks = msg_blocks + [{"type": "divider"}]
+            msg_size = len(json.dumps(msg_blocks, ensure_ascii=False).encode("utf-8")) + len(text)
+            if blocks and (len(blocks) + len(msg_blocks) > MAX_BLOCKS or size + msg_size > MAX_PAYLOAD_BYTES):
+                payloads.append({"text": "\n\n".join(texts)[:MAX_SECTION_CHARS], "blocks": blocks})
+                blocks, texts, size = [], [], 0
+            blocks = blocks + msg_blocks[:MAX_BLOCKS]
+            texts.append(text)
+            size += msg_size
+        if blocks:
+            payloads.append({"text": "\n\n".join(texts)[:MAX_SECTION_CHARS], "blocks": blocks})
+        return payloads
+
+    def _post(self, payload):
+        import urllib.request  # loaded at flush time, not when reviews.py starts
+
+        body = json.dumps(payload).encode("utf-8")
+        for attempt in range(1, self.max_attempts + 1):
+            req = urllib.request.Request(
+                self.webhook_url, data=body, headers={"Content-Type": "application/json"}
+            )
+            try:
+                with urllib.request.urlopen(req, timeout=self.timeout):
+                    count("slack.posts")
+                    count("slack.bytes", len(body))
+                    return True
+            except urllib.error.HTTPError as e:
+                if e.code == 429:
+                    delay = float(e.headers.get("Retry-After") or self.base_delay)
+                    count("slack.rate_limited")
+                elif e.code >= 500:
+                    delay = self.base_delay * 2 ** (attempt - 1)
+                else:
+                    print(f"Slack post failed ({e.code}): {e.read()[:200]!r}")
+                    return False
+            except (urllib.error.URLError, TimeoutError) as e:
+                delay = self.base_delay * 2 ** (attempt - 1)
+                print(f"Slack post error (attempt {attempt}/{self.max_attempts}): {e}")
+            if attempt < self.max_attempts:
+                count("slack.retries")
+                self.sleep(delay)
+        print(f"Slack post gave up after {self.max_attempts} attempts")
+        return False
+
+    @traced("slack.flush")
+    def flush(self):
+        """Send everything queued. Returns (payloads_sent, payloads_failed)."""
+        if not self.webhook_url or not self.messages:
+            return 0, 0
+        payloads = self.pack()
+        self.messages = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="slack") as pool:
+            results = list(pool.map(self._post, payloads))
+        sent = sum(results)
+        return sent, len(results) - sent
+
+
+class LocalWebhook:
+    """Local stand-in for a Slack incoming webhook.
+
+        with LocalWebhook(fail_first=2, status=429) as hook:
+            q = SlackQueue(hook.url); q.add("hi"); q.flush()
+            hook.payloads  # what "Slack" received
+    """
+
+    def __init__(self, fail_first=0, status=429, retry_after=0, latency=0.0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.payloads = []
+        self.requests = 0
+        self.fail_first = fail_first
+        self.status = status
+        self.retry_after = retry_after
+        self.latency = latency
+        self._lock = threading.Lock()
+        hook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                time.sleep(hook.latency)
+                with hook._lock:
+                    hook.requests += 1
+                    fail = hook.requests <= hook.fail_first
+                    if not fail:
+                        hook.payloads.append(json.loads(body))
+                if fail:
+                    self.send_response(hook.status)
+                    if hook.status == 429:
+                        self.send_header("Retry-After", str(hook.retry_after))
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def check():
+    """Assertions for SlackQueue against LocalWebhook; delays are recorded instead of slept."""
+    def queue(url, **kw):
+        delays = []
+        return SlackQueue(url, sleep=delays.append, **kw), delays
+
+    # Packing: 50-block cap, byte cap, message order, each message whole
+    q, _ = queue("unused")
+    for i in range(40):
+        q.add(f"short {i}")
+    payloads = q.pack()
+    assert [len(p["blocks"]) for p in payloads] == [50, 30], [len(p["blocks"]) for p in payloads]
+    q, _ = queue("unused")
+    for i in range(30):
+        q.add(f"long {i} " + "x" * 2500)
+    payloads = q.pack()
+    assert len(payloads) > 1 and all(len(json.dumps(p).encode()) <= MAX_PAYLOAD_BYTES for p in payloads)
+    sent_order = [b["text"]["text"].split()[1] for p in payloads for b in p["blocks"] if b["type"] == "section"]
+    assert sent_order == [str(i) for i in range(30)], sent_order
+
+    # 429 honours Retry-After
+    with LocalWebhook(fail_first=2, status=429, retry_after=3) as hook:
+        q, delays = queue(hook.url)
+        q.add("hi")
+        assert q.flush() == (1, 0) and hook.requests == 3 and delays == [3.0, 3.0], (hook.requests, delays)
+        assert hook.payloads[0]["text"] == "hi"
+
+    # 5xx backs off exponentially
+    with LocalWebhook(fail_first=3, status=503) as hook:
+        q, delays = queue(hook.url, base_delay=0.5)
+        q.add("hi")
+        assert q.flush() == (1, 0) and delays == [0.5, 1.0, 2.0], delays
+
+    # gives up after max_attempts; other 4xx are not retried
+    with LocalWebhook(fail_first=10, status=500) as hook:
+        q, delays = queue(hook.url, max_attempts=3)
+        q.add("hi")
+        assert q.flush() == (0, 1) and hook.requests == 3 and len(delays) == 2
+    with LocalWebhook(fail_first=1, status=400) as hook:
+        q, delays = queue(hook.url)
+        q.add("hi")
+        assert q.flush() == (0, 1) and hook.requests == 1 and not delays
+    print("slack_queue checks passed")
+
+
+if __name__ == "__main__":
+    with LocalWebhook(fail_first=2, status=429) as hook:
+        q = SlackQueue(hook.url, base_delay=0.01)
+        for i in range(40):
+            q.add(f"*📍 Location {i}*\n⭐ 4.{i % 10} ({100 + i} reviews)\n" + "• [5★] a week ago — Great wash!\n" * 5)
+        started = time.perf_counter()
+        sent, failed = q.flush()
+        print(f"{sent} payload(s) sent, {failed} failed, {hook.requests} HTTP requests, "
+              f"{sum(len(p['blocks']) for p in hook.payloads)} blocks, {time.perf_counter() - started:.2f}s")
+    check()
@@ -0,0 +1,215 @@
+"""
+Consolidated, indexed archive of every weekly reports/<date>/summary.csv.
+
+All runs live in one columnar file, reports/summary_history.json. Rows are
+sorted by (place, date), so each place is one contiguous slice, and the index
+maps place_id to that [start, end) slice. A trend query is a dict lookup plus
+a bisect on the date column. There is no globbing and no re-parsing of
+hundreds of CSVs.
+
+    python summary_archive.py backfill                 # import existing reports/*/summary.csv
+    python summary_archive.py trend Layton --weeks 52  # rating / count / sentiment trend
+"""
+
+import argparse
+import bisect
+import csv
+import datetime
+import glob
+import json
+import os
+
+ARCHIVE_PATH = os.path.join("reports", "summary_history.json")
+
+# Column order of the archived row tuples
+_FIELDS = ["place_id", "date", "rating", "review_count", "new_reviews_week", "sentiment_label", "sentiment_score"]
+
+
+def _num(value, cast):
+    try:
+        return cast(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class SummaryArchive:
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        self.names = {}   # place_id -> display name
+        self.rows = {}    # (place_id, date) -> row tuple in _FIELDS order
+        self.columns = {f: [] for f in _FIELDS}
+        self.index = {}   # place_id -> [start, end) into the columns
+        self._load()
+
+    # ---------- storage ----------
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        places = data["places"]
+        labels = data["labels"]
+        cols = data["columns"]
+        self.names = dict(zip(places, data["names"]))
+        self.columns = {
+            "place_id": [places[i] for i in cols["place"]],
+            "date": cols["date"],
+            "rating": cols["rating"],
+            "review_count": cols["review_count"],
+            "new_reviews_week": cols["new_reviews_week"],
+            "sentiment_label": [labels[i] if i is not None else None for i in cols["label"]],
+            "sentiment_score": cols["score"],
+        }
+        self.index = {pid: tuple(se) for pid, se in data["index"].items()}
+        for i in range(len(self.columns["date"])):
+            row = tuple(self.columns[f][i] for f in _FIELDS)
+            self.rows[(row[0], row[1])] = row
+
+    def _rebuild(self):
+        ordered = [self.rows[k] for k in sorted(self.rows)]
+        self.columns = {f: [r[i] for r in ordered] for i, f in enumerate(_FIELDS)}
+        self.index = {}
+        for i, pid in enumerate(self.columns["place_id"]):
+            start, _ = self.index.get(pid, (i, i))
+            self.index[pid] = (start, i + 1)
+
+    def save(self):
+        places = sorted(self.index)
+        place_ix = {p: i for i, p in enumerate(places)}
+        labels = sorted({l for l in self.columns["sentiment_label"] if l})
+        label_ix = {l: i for i, l in enumerate(labels)}
+        data = {
+            "version": 1,
+            "places": places,
+            "names": [self.names.get(p, p) for p in places],
+            "labels": labels,
+            "columns": {
+                "place": [place_ix[p] for p in self.columns["place_id"]],
+                "date": self.columns["date"],
+                "rating": self.columns["rating"],
+                "review_count": self.columns["review_count"],
+                "new_reviews_week": self.columns["new_reviews_week"],
+                "label": [label_ix.get(l) for l in self.columns["sentiment_label"]],
+                "score": self.columns["sentiment_score"],
+            },
+            "index": {p: list(self.index[p]) for p in places},
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    # ---------- ingest ----------
+    def add_rows(self, summary_rows):
+        """Add (or replace, on a same-day rerun) summary rows as written to summary.csv."""
+        added = self._ingest(summary_rows)
+        self._rebuild()
+        return added
+
+    def _ingest(self, summary_rows):
+        """add_rows() without rebuilding the columns; returns how many rows were taken."""
+        added = 0
+        for r in summary_rows:
+            pid = r.get("place_id") or ""
+            date = str(r.get("date") or "")
+            if not pid or not date:
+                continue
+            self.names[pid] = r.get("place") or self.names.get(pid, pid)
+            self.rows[(pid, date)] = (
+                pid, date,
+                _num(r.get("rating"), float),
+                _num(r.get("review_count"), int),
+                _num(r.get("new_reviews_week"), int),
+                r.get("sentiment_label") or None,
+                _num(r.get("sentiment_score"), float),
+            )
+            added += 1
+        return added
+
+    def _unarchived_rows(self, reports_dir, skip_dates=()):
+        """Rows of every reports/<date>/summary.csv whose date isn't archived (or in skip_dates)."""
+        skip = set(self.columns["date"]) | set(skip_dates)
+        rows = []
+        for path in sorted(glob.glob(os.path.join(reports_dir, "*", "summary.csv"))):
+            if os.path.basename(os.path.dirname(path)) in skip:
+                continue
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                rows.extend(csv.DictReader(f))
+        return rows
+
+    def backfill(self, reports_dir="reports"):
+        """Import every reports/<date>/summary.csv whose date isn't archived yet."""
+        rows = self._unarchived_rows(reports_dir)
+        return self.add_rows(rows) if rows else 0
+
+    # ---------- queries ----------
+    def place_id(self, place):
+        """Accept a place_id or a (case-insensitive) display name."""
+        if place in self.index:
+            return place
+        for pid, name in self.names.items():
+            if name.lower() == place.lower():
+                return pid
+        return None
+
+    def trend(self, place, since=None, until=None, weeks=None):
+        """Rows for one place, oldest first: [{date, rating, review_count, new_reviews_week,
+        sentiment_label, sentiment_score}]. weeks=N means since N weeks before the latest row."""
+        pid = self.place_id(place)
+        if pid is None:
+            return []
+        start, end = self.index[pid]
+        dates = self.columns["date"]
+        if weeks and not since and end > start:
+            latest = datetime.date.fromisoformat(dates[end - 1])
+            since = (latest - datetime.timedelta(weeks=weeks)).isoformat()
+        lo = bisect.bisect_left(dates, since, start, end) if since else start
+        hi = bisect.bisect_right(dates, until, lo, end) if until else end
+        return [
+            {f: self.columns[f][i] for f in _FIELDS[1:]}
+            for i in range(lo, hi)
+        ]
+
+
+def archive_run(summary_rows, reports_dir="reports"):
+    """Fold one run's summary rows into the archive (backfilling old runs on first use).
+    Returns how many rows came from older runs' summary.csv files."""
+    archive = SummaryArchive(os.path.join(reports_dir, "summary_history.json"))
+    # This run's summary.csv is already on disk; its rows come from summary_rows instead
+    run_dates = {str(r.get("date") or "") for r in summary_rows}
+    backfilled = archive._ingest(archive._unarchived_rows(reports_dir, skip_dates=run_dates))
+    archive._ingest(summary_rows)
+    archive._rebuild()
+    archive.save()
+    return backfilled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weekly summary archive")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("backfill", help="import existing reports/*/summary.csv")
+    t = sub.add_parser("trend", help="print one location's trend")
+    t.add_argument("place", help="place_id or location name")
+    t.add_argument("--weeks", type=int, default=52)
+    args = parser.parse_args()
+
+    archive = SummaryArchive()
+    if args.cmd == "backfill":
+        n = archive.backfill()
+        archive.save()
+        print(f"✅ Archived {n} row(s) into {archive.path}")
+        return
+    rows = archive.trend(args.place, weeks=args.weeks)
+    if not rows:
+        print(f"No archived rows for '{args.place}'")
+        return
+    print("date        rating  reviews  new  sentiment")
+    for r in rows:
+        print(f"{r['date']}  {r['rating']!s:>6}  {r['review_count']!s:>7}  {r['new_reviews_week']!s:>3}  "
+              f"{r['sentiment_label']} ({r['sentiment_score']})")
+
+
+if __name__ == "__main__":
+    main()